@@ -3,9 +3,9 @@ PregnancyBridge Modules Package
 Core components for maternal risk assessment
 """
 
-from .ocr_utils import preprocess_image, perform_ocr
+from .ocr_utils import preprocess_image, perform_ocr, batch_prepare
 from .clinical_parser import extract_clinical_fields
-from .risk_engine import assess_risk, RISK_GREEN, RISK_YELLOW, RISK_RED
+from .risk_engine import assess_risk, assess_risk_batch, RISK_GREEN, RISK_YELLOW, RISK_RED
 from .history_compare import compare_with_previous, detect_high_risk_patterns
 from .summary_writer import (
     generate_referral_summary,
@@ -18,8 +18,10 @@ from .data_loader import load_patient_history, save_patient_history
 __all__ = [
     'preprocess_image',
     'perform_ocr',
+    'batch_prepare',
     'extract_clinical_fields',
     'assess_risk',
+    'assess_risk_batch',
     'compare_with_previous',
     'detect_high_risk_patterns',
     'generate_referral_summary',
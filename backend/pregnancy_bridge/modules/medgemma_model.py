@@ -7,6 +7,7 @@ Version: 1.0.0
 CRITICAL: Used ONLY for explanations - NEVER for risk decisions
 """
 
+import copy
 import logging
 from typing import Optional, Dict
 
@@ -21,6 +22,109 @@ except ImportError:
     TRANSFORMERS_AVAILABLE = False
     logger.warning("Transformers not available - fallback mode only")
 
+# Try importing hyperscan for single-pass fallback keyword triage
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+# Fallback triage keywords, in priority order (lower id wins)
+_FALLBACK_KEYWORDS = ("preeclampsia", "anemia", "proteinuria")
+
+_FALLBACK_DB = None
+if HYPERSCAN_AVAILABLE:
+    try:
+        _FALLBACK_DB = hyperscan.Database()
+        _FALLBACK_DB.compile(
+            expressions=[k.encode() for k in _FALLBACK_KEYWORDS],
+            ids=list(range(len(_FALLBACK_KEYWORDS))),
+            flags=[hyperscan.HS_FLAG_CASELESS] * len(_FALLBACK_KEYWORDS)
+        )
+    except Exception as e:
+        logger.warning(f"Hyperscan database compile failed: {e}")
+        _FALLBACK_DB = None
+
+
+# Canned rule-based explanations used when the model is unavailable
+_FALLBACK_PREECLAMPSIA = """1. Clinical Concerns:
+The combination of elevated blood pressure with neurological symptoms (headache, blurred vision) 
+indicates possible preeclampsia with severe features. These neurological manifestations suggest 
+CNS involvement and increased risk of eclamptic seizures.
+
+2. Why Escalation is Necessary:
+Progressive hypertension with proteinuria and neurological symptoms meets criteria for severe 
+preeclampsia. Immediate evaluation is required to prevent maternal stroke, seizure, organ damage, 
+and potential fetal compromise from placental insufficiency.
+
+3. Complications Prevented:
+- Maternal: Eclamptic seizures, stroke, HELLP syndrome, renal failure, pulmonary edema
+- Fetal: Growth restriction, placental abruption, preterm delivery complications"""
+
+_FALLBACK_ANEMIA = """1. Clinical Concerns:
+Progressive decline in hemoglobin with respiratory symptoms (breathlessness, dizziness) suggests 
+severe anemia causing cardiopulmonary decompensation. The patient may be approaching the threshold 
+where oxygen delivery to vital organs is compromised.
+
+2. Why Escalation is Necessary:
+Severe anemia (Hb <9 g/dL) in pregnancy, especially with symptoms, requires urgent intervention. 
+Breathlessness indicates cardiovascular strain, and dizziness suggests cerebral hypoperfusion. 
+Risk of cardiac failure and poor fetal outcomes increases significantly.
+
+3. Complications Prevented:
+- Maternal: Cardiac failure, severe fatigue, increased operative risk, postpartum hemorrhage complications
+- Fetal: Preterm delivery, low birth weight, perinatal mortality"""
+
+_FALLBACK_PROTEINURIA = """1. Clinical Concerns:
+Progressive proteinuria with multiple symptom categories indicates multi-system involvement 
+consistent with evolving preeclampsia. Visual symptoms suggest posterior circulation involvement, 
+while GI symptoms may indicate hepatic involvement (HELLP syndrome consideration).
+
+2. Why Escalation is Necessary:
+Persistent and worsening proteinuria represents renal endothelial damage. Combined with symptoms 
+across multiple organ systems, this pattern requires immediate comprehensive evaluation to determine 
+disease severity and delivery timing.
+
+3. Complications Prevented:
+- Maternal: Progression to severe preeclampsia/eclampsia, HELLP syndrome, renal failure
+- Fetal: Uteroplacental insufficiency, IUGR, stillbirth"""
+
+_FALLBACK_DEFAULT = """1. Clinical Concerns:
+Temporal analysis reveals progressive deterioration across multiple parameters with concerning 
+symptoms. This pattern indicates evolving maternal risk that requires immediate specialist evaluation.
+
+2. Why Escalation is Necessary:
+Single-visit assessment may miss progressive trends. Temporal reasoning combined with symptom 
+correlation reveals escalating risk patterns requiring urgent intervention to prevent complications.
+
+3. Complications Prevented:
+Early escalation enables timely intervention, preventing progression to severe maternal morbidity 
+and adverse fetal outcomes. Specialist evaluation can guide optimal timing and mode of delivery."""
+
+_FALLBACK_EXPLANATIONS = {
+    "preeclampsia": _FALLBACK_PREECLAMPSIA,
+    "anemia": _FALLBACK_ANEMIA,
+    "proteinuria": _FALLBACK_PROTEINURIA,
+}
+
+
+def _match_fallback_keyword(prompt: str) -> Optional[str]:
+    """Return the highest-priority fallback keyword found in the prompt"""
+    if _FALLBACK_DB is not None:
+        hits = []
+        
+        def on_match(match_id, start, end, flags, context):
+            hits.append(match_id)
+        
+        _FALLBACK_DB.scan(prompt.encode("utf-8"), match_event_handler=on_match)
+        return _FALLBACK_KEYWORDS[min(hits)] if hits else None
+    
+    prompt_lower = prompt.lower()
+    for keyword in _FALLBACK_KEYWORDS:
+        if keyword in prompt_lower:
+            return keyword
+    return None
+
 
 class MedGemmaModel:
     """
@@ -32,7 +136,8 @@ class MedGemmaModel:
     def __init__(self, 
                  model_name: str = "google/medgemma-2b",
                  device: str = "auto",
-                 load_in_4bit: bool = True):
+                 load_in_4bit: bool = True,
+                 cpu_threads: Optional[int] = None):
         """
         Initialize MedGemma AI model.
         
@@ -40,11 +145,17 @@ class MedGemmaModel:
             model_name: Model identifier
             device: 'cuda', 'cpu', or 'auto'
             load_in_4bit: Use 4-bit quantization (recommended)
+            cpu_threads: Intra-op thread count for CPU inference
+                (None leaves torch's process-wide setting untouched)
         """
         self.model_name = model_name
         self.device = self._determine_device(device)
+        if cpu_threads and self.device == "cpu" and TRANSFORMERS_AVAILABLE:
+            self._configure_cpu_threads(cpu_threads)
         self.model = None
         self.tokenizer = None
+        self._copy_stream = None
+        self._gen_cfg = None
         
         if TRANSFORMERS_AVAILABLE:
             try:
@@ -64,21 +175,43 @@ class MedGemmaModel:
             return "cpu"
         return device
     
+    def _configure_cpu_threads(self, num_threads: int):
+        """Set torch's intra-op thread count (process-wide) for CPU inference"""
+        torch.set_num_threads(num_threads)
+        if torch.get_num_interop_threads() != 1:
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                # Only settable before any inter-op parallel work has started
+                logger.debug("Inter-op thread count already fixed; leaving it")
+        logger.info(f"CPU inference using {num_threads} threads")
+    
     def _load_model(self, load_in_4bit: bool):
         """Load model and tokenizer"""
         logger.info(f"Loading {self.model_name}...")
         
-        # Load tokenizer
+        # Load tokenizer (force the Rust-backed fast variant)
         self.tokenizer = AutoTokenizer.from_pretrained(
             self.model_name,
-            trust_remote_code=True
+            trust_remote_code=True,
+            use_fast=True
         )
+        if not getattr(self.tokenizer, "is_fast", False):
+            logger.warning("Fast tokenizer unavailable - using slow Python tokenizer")
+        
+        # Half precision on GPU: prefer bf16 (Ampere+), fall back to fp16
+        if self.device == "cuda":
+            dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        else:
+            dtype = torch.float32
         
         # Model loading kwargs
         model_kwargs = {
             "trust_remote_code": True,
-            "torch_dtype": torch.float16 if self.device == "cuda" else torch.float32
+            "torch_dtype": dtype
         }
+        if self.device == "cpu":
+            model_kwargs["attn_implementation"] = "sdpa"
         
         # 4-bit quantization for memory efficiency
         if load_in_4bit and self.device == "cuda":
@@ -86,14 +219,14 @@ class MedGemmaModel:
                 from transformers import BitsAndBytesConfig
                 quantization_config = BitsAndBytesConfig(
                     load_in_4bit=True,
-                    bnb_4bit_compute_dtype=torch.float16,
+                    bnb_4bit_compute_dtype=dtype,
                     bnb_4bit_use_double_quant=True,
                     bnb_4bit_quant_type="nf4"
                 )
                 model_kwargs["quantization_config"] = quantization_config
                 logger.info("Using 4-bit quantization")
             except ImportError:
-                logger.warning("bitsandbytes not available, loading in fp16")
+                logger.warning(f"bitsandbytes not available, loading in {dtype}")
         
         # Load model
         self.model = AutoModelForCausalLM.from_pretrained(
@@ -105,6 +238,50 @@ class MedGemmaModel:
             self.model = self.model.to(self.device)
         
         self.model.eval()
+        
+        # Default generation settings, built once and reused per call.
+        # Start from the model's own config so eos/bos ids are kept.
+        gen_cfg = copy.deepcopy(self.model.generation_config)
+        gen_cfg.max_new_tokens = 400
+        gen_cfg.temperature = 0.3
+        gen_cfg.top_p = 0.9
+        gen_cfg.do_sample = True
+        gen_cfg.pad_token_id = self.tokenizer.eos_token_id
+        self._gen_cfg = gen_cfg
+    
+    def _tokenize(self, prompts):
+        """
+        Tokenize one prompt or a batch of prompts in a single backend call.
+        
+        Lists are padded to the longest prompt so the Rust tokenizer
+        handles the whole batch at once.
+        """
+        inputs = self.tokenizer(
+            prompts,
+            return_tensors="pt",
+            padding="longest" if isinstance(prompts, list) else False,
+            truncation=True,
+            max_length=2048
+        )
+        if self.device != "cuda":
+            return {k: v.to(self.device) for k, v in inputs.items()}
+        
+        # Pinned host memory lets the H2D copy run asynchronously on a
+        # side stream; the compute stream waits on it before generate
+        if self._copy_stream is None:
+            self._copy_stream = torch.cuda.Stream()
+        with torch.cuda.stream(self._copy_stream):
+            inputs = {
+                k: v.pin_memory().to(self.device, non_blocking=True)
+                for k, v in inputs.items()
+            }
+        compute_stream = torch.cuda.current_stream()
+        compute_stream.wait_stream(self._copy_stream)
+        # Tensors allocated on the side stream are used on the compute
+        # stream; record it so the allocator does not reuse them early
+        for v in inputs.values():
+            v.record_stream(compute_stream)
+        return inputs
     
     def generate_explanation(self,
                             prompt: str,
@@ -127,24 +304,18 @@ class MedGemmaModel:
         
         try:
             # Tokenize
-            inputs = self.tokenizer(
-                prompt,
-                return_tensors="pt",
-                truncation=True,
-                max_length=2048
-            )
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            inputs = self._tokenize(prompt)
+            
+            # Generate (clone the cached config only for non-default settings)
+            gen_cfg = self._gen_cfg
+            if (max_tokens != gen_cfg.max_new_tokens
+                    or temperature != gen_cfg.temperature):
+                gen_cfg = copy.deepcopy(gen_cfg)
+                gen_cfg.max_new_tokens = max_tokens
+                gen_cfg.temperature = temperature
             
-            # Generate
             with torch.no_grad():
-                outputs = self.model.generate(
-                    **inputs,
-                    max_new_tokens=max_tokens,
-                    temperature=temperature,
-                    top_p=0.9,
-                    do_sample=True,
-                    pad_token_id=self.tokenizer.eos_token_id
-                )
+                outputs = self.model.generate(**inputs, generation_config=gen_cfg)
             
             # Decode
             generated = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
@@ -163,65 +334,8 @@ class MedGemmaModel:
     
     def _fallback_explanation(self, prompt: str) -> str:
         """Rule-based fallback when model unavailable"""
-        prompt_lower = prompt.lower()
-        
-        if "preeclampsia" in prompt_lower:
-            return """1. Clinical Concerns:
-The combination of elevated blood pressure with neurological symptoms (headache, blurred vision) 
-indicates possible preeclampsia with severe features. These neurological manifestations suggest 
-CNS involvement and increased risk of eclamptic seizures.
-
-2. Why Escalation is Necessary:
-Progressive hypertension with proteinuria and neurological symptoms meets criteria for severe 
-preeclampsia. Immediate evaluation is required to prevent maternal stroke, seizure, organ damage, 
-and potential fetal compromise from placental insufficiency.
-
-3. Complications Prevented:
-- Maternal: Eclamptic seizures, stroke, HELLP syndrome, renal failure, pulmonary edema
-- Fetal: Growth restriction, placental abruption, preterm delivery complications"""
-        
-        elif "anemia" in prompt_lower:
-            return """1. Clinical Concerns:
-Progressive decline in hemoglobin with respiratory symptoms (breathlessness, dizziness) suggests 
-severe anemia causing cardiopulmonary decompensation. The patient may be approaching the threshold 
-where oxygen delivery to vital organs is compromised.
-
-2. Why Escalation is Necessary:
-Severe anemia (Hb <9 g/dL) in pregnancy, especially with symptoms, requires urgent intervention. 
-Breathlessness indicates cardiovascular strain, and dizziness suggests cerebral hypoperfusion. 
-Risk of cardiac failure and poor fetal outcomes increases significantly.
-
-3. Complications Prevented:
-- Maternal: Cardiac failure, severe fatigue, increased operative risk, postpartum hemorrhage complications
-- Fetal: Preterm delivery, low birth weight, perinatal mortality"""
-        
-        elif "proteinuria" in prompt_lower:
-            return """1. Clinical Concerns:
-Progressive proteinuria with multiple symptom categories indicates multi-system involvement 
-consistent with evolving preeclampsia. Visual symptoms suggest posterior circulation involvement, 
-while GI symptoms may indicate hepatic involvement (HELLP syndrome consideration).
-
-2. Why Escalation is Necessary:
-Persistent and worsening proteinuria represents renal endothelial damage. Combined with symptoms 
-across multiple organ systems, this pattern requires immediate comprehensive evaluation to determine 
-disease severity and delivery timing.
-
-3. Complications Prevented:
-- Maternal: Progression to severe preeclampsia/eclampsia, HELLP syndrome, renal failure
-- Fetal: Uteroplacental insufficiency, IUGR, stillbirth"""
-        
-        else:
-            return """1. Clinical Concerns:
-Temporal analysis reveals progressive deterioration across multiple parameters with concerning 
-symptoms. This pattern indicates evolving maternal risk that requires immediate specialist evaluation.
-
-2. Why Escalation is Necessary:
-Single-visit assessment may miss progressive trends. Temporal reasoning combined with symptom 
-correlation reveals escalating risk patterns requiring urgent intervention to prevent complications.
-
-3. Complications Prevented:
-Early escalation enables timely intervention, preventing progression to severe maternal morbidity 
-and adverse fetal outcomes. Specialist evaluation can guide optimal timing and mode of delivery."""
+        keyword = _match_fallback_keyword(prompt)
+        return _FALLBACK_EXPLANATIONS.get(keyword, _FALLBACK_DEFAULT)
     
     def is_available(self) -> bool:
         """Check if AI model is loaded and available"""
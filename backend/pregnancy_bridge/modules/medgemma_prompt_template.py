@@ -6,6 +6,7 @@ Version: 2.0.0
 Date: 2026-02-04
 """
 
+from string import Formatter
 from typing import Dict, List, Optional
 import logging
 
@@ -48,6 +49,47 @@ If you cannot produce valid JSON, return the deterministic fallback action: {{"a
 OUTPUT: JSON only.
 """
 
+def _split_template(template: str) -> tuple:
+    """
+    Pre-parse a str.format template into (literal, field_name) pairs.
+    
+    Brace escapes are resolved here once, so rendering is plain
+    concatenation with no format-spec parsing per call.
+    """
+    return tuple(
+        (literal, field_name)
+        for literal, field_name, _, _ in Formatter().parse(template)
+    )
+
+
+_MISSING_DATA_PARTS = _split_template(MISSING_DATA_PROMPT)
+
+
+def render_missing_data_prompt(evidence_summary: str,
+                               available_tests: str,
+                               context: str) -> str:
+    """
+    Render MISSING_DATA_PROMPT; equivalent to MISSING_DATA_PROMPT.format(...).
+    
+    Args:
+        evidence_summary: JSON-encoded evidence list
+        available_tests: JSON-encoded test codes
+        context: JSON-encoded context dict
+        
+    Returns:
+        Formatted prompt string
+    """
+    values = {
+        'evidence_summary': evidence_summary,
+        'available_tests': available_tests,
+        'context': context
+    }
+    return ''.join([
+        literal + (values[field_name] if field_name is not None else '')
+        for literal, field_name in _MISSING_DATA_PARTS
+    ])
+
+
 FALLBACK_EXPLANATION_TEMPLATE = """Explanation (fallback): Evidence: {evidence_summary}. Rule-based decision: {risk_category}. Reason: {rule_reason}. If urgent, refer to facility. Explanation autogenerated by fallback."""
 
 
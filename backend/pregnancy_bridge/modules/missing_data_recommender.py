@@ -8,6 +8,8 @@ from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+_VALID_PRIORITIES = frozenset(('urgent', 'near-term', 'follow-up'))
+
 
 def recommend_next_actions(
     evidence_summary: List[str],
@@ -31,14 +33,14 @@ def recommend_next_actions(
             - why: str (short clinical reason)
             - practical_note: str (one-line field advice)
     """
-    from pregnancy_bridge.modules.medgemma_prompt_template import MISSING_DATA_PROMPT
+    from pregnancy_bridge.modules.medgemma_prompt_template import render_missing_data_prompt
     
     # Format prompt
     evidence_str = json.dumps(evidence_summary)
     available_tests_str = json.dumps(available_tests)
     context_str = json.dumps(context)
     
-    prompt = MISSING_DATA_PROMPT.format(
+    prompt = render_missing_data_prompt(
         evidence_summary=evidence_str,
         available_tests=available_tests_str,
         context=context_str
@@ -141,6 +143,23 @@ def recommend_next_actions_with_deterministic(
     return deterministic_recs
 
 
+def _decode_recommendations(json_text: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Decode a JSON array of recommendations.
+    
+    Only the JSON syntax is checked here; the schema is checked in one
+    place, _validate_recommendations.
+    
+    Raises:
+        ValueError: If the text is not valid JSON
+        RecursionError: If the JSON nests too deeply to decode
+    """
+    recommendations = json.loads(json_text)
+    if isinstance(recommendations, list):
+        return recommendations
+    return None
+
+
 def _parse_recommendations_json(text: str) -> Optional[List[Dict[str, Any]]]:
     """
     Try to parse JSON recommendations from model output.
@@ -153,10 +172,10 @@ def _parse_recommendations_json(text: str) -> Optional[List[Dict[str, Any]]]:
     """
     try:
         # Try direct JSON parse
-        recommendations = json.loads(text)
-        if isinstance(recommendations, list):
+        recommendations = _decode_recommendations(text)
+        if recommendations is not None:
             return recommendations
-    except json.JSONDecodeError:
+    except (ValueError, RecursionError):
         pass
     
     # Try to find JSON array in text
@@ -165,10 +184,8 @@ def _parse_recommendations_json(text: str) -> Optional[List[Dict[str, Any]]]:
         end_idx = text.rfind(']')
         if start_idx >= 0 and end_idx > start_idx:
             json_str = text[start_idx:end_idx+1]
-            recommendations = json.loads(json_str)
-            if isinstance(recommendations, list):
-                return recommendations
-    except:
+            return _decode_recommendations(json_str)
+    except (ValueError, RecursionError):
         pass
     
     return None
@@ -178,6 +195,9 @@ def _validate_recommendations(recommendations: List[Dict[str, Any]]) -> bool:
     """
     Validate that recommendations have required structure.
     
+    Required fields are pulled out into parallel columns once, then each
+    column is checked in a single pass.
+    
     Args:
         recommendations: List of recommendation dicts
     
@@ -187,26 +207,19 @@ def _validate_recommendations(recommendations: List[Dict[str, Any]]) -> bool:
     if not isinstance(recommendations, list) or len(recommendations) == 0:
         return False
     
-    required_keys = ['action', 'priority', 'why']
-    valid_priorities = ['urgent', 'near-term', 'follow-up']
+    if not all(isinstance(rec, dict) for rec in recommendations):
+        return False
     
-    for rec in recommendations:
-        if not isinstance(rec, dict):
-            return False
-        
-        # Check required keys present
-        if not all(key in rec for key in required_keys):
-            return False
-        
-        # Check priority value valid
-        if rec['priority'] not in valid_priorities:
-            return False
-        
-        # Check all values are strings
-        if not all(isinstance(rec[key], str) for key in required_keys):
-            return False
+    actions, priorities, whys = zip(*(
+        (rec.get('action'), rec.get('priority'), rec.get('why'))
+        for rec in recommendations
+    ))
+    
+    # Missing keys surface as None and fail the str check
+    if not all(isinstance(value, str) for value in actions + priorities + whys):
+        return False
     
-    return True
+    return _VALID_PRIORITIES.issuperset(priorities)
 
 
 def _get_fallback_recommendations() -> List[Dict[str, Any]]:
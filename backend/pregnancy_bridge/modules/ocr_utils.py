@@ -15,108 +15,169 @@ FIXES in this version:
 
 Interface preserved:
   perform_ocr(image_path) → str              (unchanged)
-  preprocess_image(image_path) → PIL.Image   (enhanced)
+  batch_prepare(image_paths) → list[(image, file_hash)]    (threaded batch)
+  preprocess_image(image_path) → ndarray | PIL.Image   (enhanced)
   extract_lab_values(text) → dict            (NEW — used by clinical_parser)
 """
 
+import os
 import re
+import atexit
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
-import pytesseract
+import PIL
 from PIL import Image, ImageEnhance, ImageFilter
 
 logger = logging.getLogger(__name__)
 
-pytesseract.pytesseract.tesseract_cmd = (
-    r"C:\Users\gurra\AppData\Local\Programs\Tesseract-OCR\tesseract.exe"
-)
+# Pillow-SIMD (versioned like "9.5.0.post1") has AVX2 resize/filter kernels,
+# which speeds up the Lanczos upscale and the PIL-only fallback 4–6×.
+# Install with: pip uninstall pillow && pip install pillow-simd
+_PIL_SIMD = ".post" in PIL.__version__
+
+TESSERACT_CMD = r"C:\Users\gurra\AppData\Local\Programs\Tesseract-OCR\tesseract.exe"
+
+# ── Heavy imports are deferred to first use ───────────────────────────────────
+# OpenCV/NumPy and the Tesseract bindings add noticeable cold-start time and
+# memory, and many importers of this package never run OCR.
+cv2 = None
+np = None
+_CV2_AVAILABLE = None         # None = not yet probed
+
+# Structuring elements, built once when OpenCV is first loaded
+_TOPHAT_ROW_KERNEL = None
+_TOPHAT_COL_KERNEL = None
+
+pytesseract = None
+_tesserocr = None
+_TESSEROCR_AVAILABLE = None   # None = not yet probed
+_TESS_API = None
+_TESS_LOCK = threading.Lock()  # PyTessBaseAPI is not thread-safe
+
+
+def _load_cv2() -> bool:
+    """Import OpenCV + NumPy on first use; returns _CV2_AVAILABLE."""
+    global cv2, np, _CV2_AVAILABLE
+    global _TOPHAT_ROW_KERNEL, _TOPHAT_COL_KERNEL
+    if _CV2_AVAILABLE is None:
+        # OpenCV is optional — graceful fallback to PIL-only if not installed
+        try:
+            import cv2
+            import numpy as np
+            _TOPHAT_ROW_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 1))
+            _TOPHAT_COL_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 25))
+            _CV2_AVAILABLE = True
+        except ImportError:
+            _CV2_AVAILABLE = False
+            logger.warning(
+                "opencv-python not installed. Watermark suppression disabled. "
+                "Run: pip install opencv-python"
+            )
+    return _CV2_AVAILABLE
 
-# ── OpenCV import (optional — graceful fallback to PIL-only if not installed) ──
-try:
-    import cv2
-    import numpy as np
-    _CV2_AVAILABLE = True
-except ImportError:
-    _CV2_AVAILABLE = False
-    logger.warning(
-        "opencv-python not installed. Watermark suppression disabled. "
-        "Run: pip install opencv-python"
-    )
+
+def _load_tesseract() -> bool:
+    """
+    Import the OCR backend on first use; returns _TESSEROCR_AVAILABLE.
+
+    pytesseract spawns a tesseract process per call, reloading the LSTM
+    model every time. tesserocr (optional) keeps one API instance alive
+    and reuses it; pytesseract is only imported when it is missing.
+    """
+    global pytesseract, _tesserocr, _TESSEROCR_AVAILABLE
+    if _TESSEROCR_AVAILABLE is None:
+        try:
+            import tesserocr as _tesserocr
+            _TESSEROCR_AVAILABLE = True
+        except ImportError:
+            _TESSEROCR_AVAILABLE = False
+    if not _TESSEROCR_AVAILABLE and pytesseract is None:
+        import pytesseract
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+    return _TESSEROCR_AVAILABLE
 
 
 # ══════════════════════════════════════════════════════════════════════════════
 # IMAGE PREPROCESSING
 # ══════════════════════════════════════════════════════════════════════════════
 
-def preprocess_image(image_path: str) -> Optional[Image.Image]:
+# Short-side pixel count roughly matching ~300 DPI for an A4/letter report
+OCR_TARGET_SHORT_SIDE = 1500
+
+
+def _target_size(width: int, height: int) -> Optional[tuple]:
+    """Upscaled (width, height) for OCR, or None if no resize is needed."""
+    scale = min(2.0, max(1.0, OCR_TARGET_SHORT_SIDE / min(width, height)))
+    if scale <= 1.05:
+        return None
+    return int(width * scale), int(height * scale)
+
+
+def preprocess_image(image_path: str):
     """
     Preprocess lab report image for maximum OCR accuracy.
 
     Pipeline:
-      1. Upscale ×2 (Tesseract needs ≥300 DPI equivalent)
-      2. Grayscale
+      1. Grayscale
+      2. Upscale up to ×2, only when the short side is below ~1500 px
+         (Tesseract needs ≥300 DPI equivalent)
       3. If OpenCV available:
            a. Top-hat transform — removes light watermark ink
            b. Adaptive threshold (Gaussian) — binarises to black/white
               This crushes grey watermark text to white while keeping
               dark printed text black.
+           c. Crop to the bounding box of all ink, plus a margin
+         The image is decoded straight to a grayscale ndarray and never
+         round-trips through PIL — pytesseract accepts ndarrays directly.
       4. If OpenCV NOT available:
            PIL contrast enhance only (original behaviour, no regression)
+
+    Returns:
+      numpy.ndarray (OpenCV path) or PIL.Image (fallback), None on failure
     """
     if not Path(image_path).exists():
         logger.error(f"Image not found: {image_path}")
         return None
 
     try:
-        img = Image.open(image_path)
+        if _load_cv2():
+            # Step 1: Decode directly to grayscale (imdecode handles
+            # non-ASCII Windows paths that cv2.imread cannot open)
+            img_np = cv2.imdecode(
+                np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_GRAYSCALE
+            )
+            if img_np is not None:
+                return _preprocess_cv2(img_np)
+            logger.debug("OpenCV could not decode image, using PIL path")
 
-        # Step 1: Upscale before any processing (improves Tesseract accuracy)
-        width, height = img.size
-        img = img.resize((width * 2, height * 2), Image.Resampling.LANCZOS)
+        img = Image.open(image_path)
 
-        # Step 2: Grayscale
+        # Step 1: Grayscale
         img = img.convert('L')
 
         if _CV2_AVAILABLE:
-            # Step 3a: Convert PIL → numpy for OpenCV processing
-            img_np = np.array(img)
-
-            # Step 3b: Top-hat morphological filter
-            # Removes bright (light-grey) watermark patterns from background
-            # kernel size 25×25 works well for typical pathology report watermarks
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 25))
-            tophat = cv2.morphologyEx(img_np, cv2.MORPH_TOPHAT, kernel)
-            img_np = cv2.add(img_np, tophat)
-
-            # Step 3c: Adaptive Gaussian threshold
-            # blockSize=15, C=8 — tuned for lab report text on white/grey bg
-            # Converts grey watermark ink → white (255), dark text → black (0)
-            img_np = cv2.adaptiveThreshold(
-                img_np,
-                maxValue=255,
-                adaptiveMethod=cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                thresholdType=cv2.THRESH_BINARY,
-                blockSize=15,
-                C=8,
-            )
-
-            # Step 3d: Light dilation to reconnect broken digit strokes
-            # (OCR digit '3' vs '2' confusion is partly from broken strokes)
-            dilate_kernel = np.ones((2, 2), np.uint8)
-            img_np = cv2.dilate(img_np, dilate_kernel, iterations=1)
-
-            # Convert back to PIL
-            img = Image.fromarray(img_np)
-            logger.debug("Preprocessing: OpenCV adaptive threshold applied")
-
-        else:
-            # Fallback: PIL-only path
-            # Do NOT use contrast.enhance(2.0) — it amplifies watermarks
-            # Use a gentle sharpen only
-            img = img.filter(ImageFilter.SHARPEN)
-            logger.debug("Preprocessing: PIL-only fallback (no watermark suppression)")
+            return _preprocess_cv2(np.array(img))
+
+        # Step 2: Upscale before any processing (improves Tesseract accuracy)
+        # High-resolution scans are already in Tesseract's range — upscaling
+        # them only quadruples the pixels every later stage has to touch
+        size = _target_size(*img.size)
+        if size is not None:
+            img = img.resize(size, Image.Resampling.LANCZOS)
+
+        # Fallback: PIL-only path
+        # Do NOT use contrast.enhance(2.0) — it amplifies watermarks
+        # Use a gentle sharpen only
+        img = img.filter(ImageFilter.SHARPEN)
+        logger.debug(
+            "Preprocessing: PIL-only fallback (no watermark suppression%s)",
+            "" if _PIL_SIMD else "; pillow-simd not installed"
+        )
 
         return img
 
@@ -125,6 +186,134 @@ def preprocess_image(image_path: str) -> Optional[Image.Image]:
         return None
 
 
+def _preprocess_cv2(img_np):
+    """OpenCV half of preprocess_image — operates on a grayscale ndarray."""
+    # Step 2: Upscale (Lanczos, same as the PIL path)
+    height, width = img_np.shape[:2]
+    size = _target_size(width, height)
+    if size is not None:
+        img_np = cv2.resize(img_np, size, interpolation=cv2.INTER_LANCZOS4)
+
+    # Step 3a: Top-hat morphological filter
+    # Removes bright (light-grey) watermark patterns from background
+    # kernel size 25×25 works well for typical pathology report watermarks
+    # A rectangular element is separable, so the 25×25 opening is run
+    # as 25×1 + 1×25 passes (50 ops/pixel instead of 625) — same result
+    opened = cv2.erode(cv2.erode(img_np, _TOPHAT_ROW_KERNEL), _TOPHAT_COL_KERNEL)
+    opened = cv2.dilate(cv2.dilate(opened, _TOPHAT_ROW_KERNEL), _TOPHAT_COL_KERNEL)
+    tophat = cv2.subtract(img_np, opened)
+    img_np = cv2.add(img_np, tophat)
+
+    # Step 3b: Adaptive Gaussian threshold
+    # blockSize=15, C=8 — tuned for lab report text on white/grey bg
+    # Converts grey watermark ink → white (255), dark text → black (0)
+    img_np = cv2.adaptiveThreshold(
+        img_np,
+        maxValue=255,
+        adaptiveMethod=cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        thresholdType=cv2.THRESH_BINARY,
+        blockSize=15,
+        C=8,
+    )
+
+    # Step 3c: 3×3 median to clean up speckle left by the threshold
+    # (OCR digit '3' vs '2' confusion is partly from noisy strokes).
+    # Unlike the previous 2×2 dilation it does not grow watermark remnants
+    img_np = cv2.medianBlur(img_np, 3)
+
+    # Step 3d: Crop away the blank border around the inked area so
+    # Tesseract skips empty margins
+    img_np = _crop_to_ink(img_np)
+
+    logger.debug("Preprocessing: OpenCV adaptive threshold applied")
+    return img_np
+
+
+# White border kept around the inked area when cropping
+ROI_MARGIN_PX = 10
+
+
+def _crop_to_ink(img_np):
+    """
+    Crop a binarised page (dark text on white) to the bounding box of all
+    of its ink, plus a margin.
+
+    Every dark pixel left after the median filter is inside the box, so no
+    text line is ever cut off; only blank borders are removed. A page with
+    no ink is returned unchanged.
+    """
+    points = cv2.findNonZero(cv2.bitwise_not(img_np))
+    if points is None:
+        return img_np
+
+    x, y, w, h = cv2.boundingRect(points)
+    y0 = max(0, y - ROI_MARGIN_PX)
+    y1 = min(img_np.shape[0], y + h + ROI_MARGIN_PX)
+    x0 = max(0, x - ROI_MARGIN_PX)
+    x1 = min(img_np.shape[1], x + w + ROI_MARGIN_PX)
+    return img_np[y0:y1, x0:x1]
+
+
+# PSM 6 is only retried when PSM 4 output falls below these
+OCR_MIN_CHARS = 20
+OCR_MIN_MEAN_CONF = 40.0
+
+_OCR_WHITELIST = (
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz/.,:-+() "
+)
+
+
+def _get_tess_api():
+    """Create the shared tesserocr API on first use (loads the model once)."""
+    global _TESS_API
+    if _TESS_API is None:
+        _TESS_API = _tesserocr.PyTessBaseAPI(oem=_tesserocr.OEM.DEFAULT)
+        atexit.register(_TESS_API.End)
+    return _TESS_API
+
+
+def _run_tesseract(img, psm: int, whitelist: str = "") -> tuple:
+    """
+    Recognize text with tesserocr if installed, else pytesseract.
+
+    Returns:
+      (text, mean_word_confidence) — confidence is 0–100, or 0.0 when no
+      words were recognized
+    """
+    if _load_tesseract():
+        if not isinstance(img, Image.Image):
+            img = Image.fromarray(img)
+        with _TESS_LOCK:
+            api = _get_tess_api()
+            api.SetPageSegMode(psm)
+            api.SetVariable("tessedit_char_whitelist", whitelist)
+            api.SetImage(img)
+            return api.GetUTF8Text(), float(api.MeanTextConf())
+
+    config = f'--psm {psm} --oem 3'
+    if whitelist:
+        config += f' -c tessedit_char_whitelist={whitelist}'
+
+    # image_to_data costs the same single tesseract run as image_to_string
+    # but also returns per-word confidences
+    data = pytesseract.image_to_data(
+        img, config=config, output_type=pytesseract.Output.DICT
+    )
+    lines = {}
+    confs = []
+    for i, word in enumerate(data["text"]):
+        conf = float(data["conf"][i])
+        if conf < 0 or not word.strip():
+            continue
+        confs.append(conf)
+        key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(key, []).append(word)
+
+    text = "\n".join(" ".join(words) for words in lines.values())
+    mean_conf = sum(confs) / len(confs) if confs else 0.0
+    return text, mean_conf
+
+
 def perform_ocr(image_path: str) -> str:
     """
     Run Tesseract OCR on a lab report image.
@@ -132,7 +321,9 @@ def perform_ocr(image_path: str) -> str:
     PSM mode:
       --psm 4  = "Assume a single column of text of variable sizes"
       Better than --psm 6 for multi-column lab report tables.
-      Falls back to --psm 6 if psm 4 gives empty output.
+      Falls back to --psm 6 only if psm 4 output is too short or its mean
+      word confidence is low; the psm 6 text is kept only if it scores
+      higher.
     """
     img = preprocess_image(image_path)
     if img is None:
@@ -140,15 +331,17 @@ def perform_ocr(image_path: str) -> str:
 
     try:
         # PSM 4 — best for columnar lab reports
-        text = pytesseract.image_to_string(
-            img,
-            config='--psm 4 --oem 3 -c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz/.,:-+() '
-        )
+        text, mean_conf = _run_tesseract(img, psm=4, whitelist=_OCR_WHITELIST)
 
-        if not text.strip():
-            # Fallback to PSM 6 if PSM 4 gives nothing
-            logger.warning("PSM 4 gave empty output, retrying with PSM 6")
-            text = pytesseract.image_to_string(img, config='--psm 6')
+        if len(text.strip()) < OCR_MIN_CHARS or mean_conf < OCR_MIN_MEAN_CONF:
+            # Fallback to PSM 6 if PSM 4 gives little or low-confidence output
+            logger.warning(
+                f"PSM 4 gave weak output ({len(text.strip())} chars, "
+                f"conf {mean_conf:.0f}), retrying with PSM 6"
+            )
+            fallback_text, fallback_conf = _run_tesseract(img, psm=6)
+            if not text.strip() or fallback_conf > mean_conf:
+                text = fallback_text
 
         logger.debug(f"OCR extracted {len(text)} characters")
         return text
@@ -158,6 +351,30 @@ def perform_ocr(image_path: str) -> str:
         return ""
 
 
+def batch_prepare(image_paths: List[str]) -> List[tuple]:
+    """
+    Preprocess and file-hash a batch of report images concurrently.
+
+    OpenCV and OpenSSL hashing both release the GIL, so a thread pool
+    overlaps disk I/O, hashing and image processing across uploads.
+
+    Returns:
+      [(preprocessed_image | None, sha256_hex | None), ...] in input order
+    """
+    from pregnancy_bridge.modules.provenance_tracker import get_provenance_tracker
+
+    if not image_paths:
+        return []
+
+    tracker = get_provenance_tracker()
+    _load_cv2()  # probe once up front rather than racing inside workers
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        images = [pool.submit(preprocess_image, path) for path in image_paths]
+        hashes = [pool.submit(tracker.compute_file_hash, path) for path in image_paths]
+        return [(img.result(), digest.result()) for img, digest in zip(images, hashes)]
+
+
 # ══════════════════════════════════════════════════════════════════════════════
 # LAB VALUE EXTRACTION + UNIT NORMALIZATION + SANITY BOUNDS
 # ══════════════════════════════════════════════════════════════════════════════
@@ -196,6 +413,42 @@ PLATELET_UNIT_MULTIPLIERS = {
     "thou/ul":   1_000.0,
 }
 
+# Lookup order: longest key first, so "x10^3/ul" and "k/ul" resolve to their
+# own multiplier instead of the "/ul" they contain
+_PLT_UNIT_KEYS = tuple(sorted(PLATELET_UNIT_MULTIPLIERS, key=len, reverse=True))
+
+# ── Compiled lab-value patterns (built once at import) ───────────────────────
+# Hb: "Hemoglobin", "Hb", "HGB", "Haemoglobin" + optional junk + number
+# Handles: 13.00, 13.0, 130, 7 0, 12.1
+_HB_PATTERN = re.compile(
+    r'(?:h[ae]m(?:o|0)gl[o0]bin|(?<!\w)hb(?!\w)|hgb)[^\d]{0,30}?'
+    r'(\d{1,3}(?:[.\s]\d{1,2})?)',
+    re.IGNORECASE
+)
+_HB_SPACE_DECIMAL = re.compile(r'(\d)\s+(\d)')
+
+# Platelets: "Platelet", "PLT", "Thrombocytes" + number + optional unit
+_PLT_PATTERN = re.compile(
+    r'(?:platelet[s]?(?:\s+count)?|plt|thrombocyte[s]?)[^\d]{0,30}?'
+    r'(\d(?:[\d,.]|\s(?=\d)(?!10\^))*)'       # number (may have commas/spaces)
+    r'\s*'
+    r'((?:/|x|×)?(?:cumm|mm3|mm³|ul|µl|lakh|thou|k/ul|10\^3[/\s]?ul|cells[/\s]?ul)?)',
+    re.IGNORECASE
+)
+# Deletes commas and every char regex \s matches (the highest Unicode
+# whitespace code point is U+3000)
+_PLT_STRIP = str.maketrans('', '', ',' + ''.join(
+    c for c in map(chr, range(0x3001)) if c.isspace()
+))
+
+# Leading keywords of both patterns, so one scan can locate candidates for
+# either lab; the full pattern is then anchored at each keyword position
+_LAB_TOKEN = re.compile(
+    r'(?P<hb>h[ae]m(?:o|0)gl[o0]bin|(?<!\w)hb(?!\w)|hgb)'
+    r'|(?P<plt>platelet|plt|thrombocyte)',
+    re.IGNORECASE
+)
+
 
 def _parse_hb(text: str) -> dict:
     """
@@ -214,6 +467,11 @@ def _parse_hb(text: str) -> dict:
         "flags": list[str]          # clinical flags
       }
     """
+    return _hb_from_match(_HB_PATTERN.search(text))
+
+
+def _hb_from_match(match: Optional[re.Match]) -> dict:
+    """Build the _parse_hb result from an _HB_PATTERN match (or None)."""
     result = {
         "raw_ocr_string": None,
         "value": None,
@@ -221,15 +479,6 @@ def _parse_hb(text: str) -> dict:
         "flags": [],
     }
 
-    # Pattern: "Hemoglobin", "Hb", "HGB", "Haemoglobin" + optional junk + number
-    # Handles: 13.00, 13.0, 130, 7 0, 12.1
-    pattern = re.compile(
-        r'(?:h[ae]m(?:o|0)gl[o0]bin|(?<!\w)hb(?!\w)|hgb)[^\d]{0,30}?'
-        r'(\d{1,3}(?:[.\s]\d{1,2})?)',
-        re.IGNORECASE
-    )
-
-    match = pattern.search(text)
     if not match:
         return result
 
@@ -237,7 +486,7 @@ def _parse_hb(text: str) -> dict:
     result["raw_ocr_string"] = raw
 
     # Normalize spaces acting as decimal points: "7 0" → "7.0"
-    normalized = re.sub(r'(\d)\s+(\d)', r'\1.\2', raw)
+    normalized = _HB_SPACE_DECIMAL.sub(r'\1.\2', raw)
 
     try:
         value = float(normalized)
@@ -300,6 +549,23 @@ def _parse_platelets(text: str) -> dict:
         "flags": list[str]
       }
     """
+    return _platelets_from_match(_PLT_PATTERN.search(text))
+
+
+@lru_cache(maxsize=64)
+def _platelet_unit_multiplier(raw_unit: str) -> Optional[float]:
+    """
+    Multiplier of the longest PLATELET_UNIT_MULTIPLIERS key contained in
+    raw_unit, or None. Cached: reports only ever use a handful of units.
+    """
+    for unit_key in _PLT_UNIT_KEYS:
+        if unit_key in raw_unit:
+            return PLATELET_UNIT_MULTIPLIERS[unit_key]
+    return None
+
+
+def _platelets_from_match(match: Optional[re.Match]) -> dict:
+    """Build the _parse_platelets result from a _PLT_PATTERN match (or None)."""
     result = {
         "raw_ocr_string": None,
         "raw_unit": None,
@@ -309,16 +575,6 @@ def _parse_platelets(text: str) -> dict:
         "flags": [],
     }
 
-    # Pattern: "Platelet", "PLT", "Thrombocytes" + number + optional unit
-    pattern = re.compile(
-        r'(?:platelet[s]?(?:\s+count)?|plt|thrombocyte[s]?)[^\d]{0,30}?'
-        r'([\d,.\s]+?)'                          # number (may have commas)
-        r'\s*'
-        r'((?:/|x|×)?(?:cumm|mm3|mm³|ul|µl|lakh|thou|k/ul|10\^3[/\s]?ul|cells[/\s]?ul)?)',
-        re.IGNORECASE
-    )
-
-    match = pattern.search(text)
     if not match:
         return result
 
@@ -329,7 +585,7 @@ def _parse_platelets(text: str) -> dict:
     result["raw_unit"] = raw_unit
 
     # Clean number: remove commas and spaces
-    clean_num = re.sub(r'[,\s]', '', raw_num)
+    clean_num = raw_num.translate(_PLT_STRIP)
 
     try:
         raw_value = float(clean_num)
@@ -339,11 +595,7 @@ def _parse_platelets(text: str) -> dict:
         return result
 
     # Identify unit multiplier
-    multiplier = None
-    for unit_key, mult in PLATELET_UNIT_MULTIPLIERS.items():
-        if unit_key in raw_unit:
-            multiplier = mult
-            break
+    multiplier = _platelet_unit_multiplier(raw_unit)
 
     # If no unit found, infer from value magnitude
     if multiplier is None:
@@ -392,11 +644,31 @@ def _parse_platelets(text: str) -> dict:
         )
 
     result["value_per_ul"] = value_per_ul
-    result["value_lakh"] = round(value_per_ul / 100_000, 2)
+    # Integer round-half-up to 0.01 lakh (value_per_ul is a non-negative int)
+    result["value_lakh"] = ((value_per_ul + 500) // 1000) / 100.0
 
     return result
 
 
+def _scan_lab_matches(text: str) -> tuple:
+    """
+    Find the first Hb and platelet matches in a single pass over the text.
+
+    Equivalent to running _HB_PATTERN.search and _PLT_PATTERN.search
+    separately, but stops as soon as both labs are resolved.
+    """
+    hb_match = plt_match = None
+    for token in _LAB_TOKEN.finditer(text):
+        if token.lastgroup == "hb":
+            if hb_match is None:
+                hb_match = _HB_PATTERN.match(text, token.start())
+        elif plt_match is None:
+            plt_match = _PLT_PATTERN.match(text, token.start())
+        if hb_match and plt_match:
+            break
+    return hb_match, plt_match
+
+
 def extract_lab_values(text: str) -> dict:
     """
     Main entry point for lab value extraction from OCR text.
@@ -425,11 +697,14 @@ def extract_lab_values(text: str) -> dict:
         "has_critical_flags": bool          # True if any CRITICAL flag present
     }
     """
-    hb_result = _parse_hb(text)
-    plt_result = _parse_platelets(text)
+    hb_match, plt_match = _scan_lab_matches(text)
+    hb_result = _hb_from_match(hb_match)
+    plt_result = _platelets_from_match(plt_match)
 
     all_flags = hb_result["flags"] + plt_result["flags"]
-    has_critical = any("CRITICAL" in f for f in all_flags)
+    # Clinical flags are always prefixed, so a prefix test suffices and
+    # any() stops at the first hit
+    has_critical = any(f.startswith("CRITICAL") for f in all_flags)
 
     return {
         "hemoglobin": hb_result,
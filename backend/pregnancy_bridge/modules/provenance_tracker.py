@@ -8,12 +8,53 @@ Date: 2026-02-04
 
 import hashlib
 import logging
+import mmap
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, Optional
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Pre-bound for the per-record timestamp in create_provenance_record
+_UTC = timezone.utc
+_fromtimestamp = datetime.fromtimestamp
+
+
+def _utc_timestamp_pair():
+    """Current time as (epoch nanoseconds, matching ISO-8601 UTC string)."""
+    ns = time.time_ns()
+    seconds, remainder_ns = divmod(ns, 1_000_000_000)
+    iso = _fromtimestamp(seconds, _UTC).replace(microsecond=remainder_ns // 1000).isoformat()
+    return ns, iso
+
+
+def _sha256_file(path: Path) -> str:
+    """
+    SHA-256 of a file, handing the whole byte range to OpenSSL at once.
+    
+    hashlib.file_digest (3.11+) streams through a large native buffer;
+    older interpreters hash an mmap of the file instead of 4 KiB chunks.
+    """
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        
+        if path.stat().st_size == 0:
+            return hashlib.sha256().hexdigest()  # mmap rejects empty files
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha256(mm).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def _hash_by_stat(path: str, ino: int, mtime_ns: int, ctime_ns: int, size: int) -> str:
+    """
+    Memoized file hash. The stat fields are part of the key only so that a
+    replaced or modified file misses the cache and is rehashed.
+    """
+    return _sha256_file(Path(path))
+
 
 class ProvenanceTracker:
     """
@@ -33,8 +74,18 @@ class ProvenanceTracker:
     
     RISK_AUTHORITY = "rule_engine"  # Fixed as per requirement
     
-    def __init__(self):
-        """Initialize provenance tracker."""
+    def __init__(self, cache_file_hashes: bool = False):
+        """
+        Initialize provenance tracker.
+        
+        Args:
+            cache_file_hashes: Reuse a file's hash while its inode, size,
+                mtime and ctime are unchanged. Off by default, since an
+                integrity check should read the bytes: ctime cannot be set
+                from userspace, but a rewrite within one timestamp tick
+                would still report the old digest.
+        """
+        self.cache_file_hashes = cache_file_hashes
         logger.info("ProvenanceTracker v2.0 initialized")
     
     def compute_file_hash(self, file_path: Optional[str]) -> Optional[str]:
@@ -56,14 +107,12 @@ class ProvenanceTracker:
                 logger.warning(f"File not found for hashing: {file_path}")
                 return None
             
-            sha256_hash = hashlib.sha256()
-            
-            with open(path, 'rb') as f:
-                # Read in chunks to handle large files
-                for chunk in iter(lambda: f.read(4096), b''):
-                    sha256_hash.update(chunk)
-            
-            digest = sha256_hash.hexdigest()
+            if self.cache_file_hashes:
+                st = path.stat()
+                digest = _hash_by_stat(str(path.resolve()), st.st_ino,
+                                       st.st_mtime_ns, st.st_ctime_ns, st.st_size)
+            else:
+                digest = _sha256_file(path)
             logger.debug(f"Computed hash for {path.name}: {digest[:16]}...")
             return digest
             
@@ -111,10 +160,12 @@ class ProvenanceTracker:
         Returns:
             Provenance dictionary matching schema v2
         """
+        timestamp_ns, timestamp_utc = _utc_timestamp_pair()
         provenance = {
             'risk_authority': self.RISK_AUTHORITY,
             'explanation_source': explanation_source,
-            'timestamp_utc': datetime.now(timezone.utc).isoformat(),
+            'timestamp_utc': timestamp_utc,
+            'timestamp_ns': timestamp_ns,  # integer sort/range key for audit stores
             'explanation_generated': explanation_generated
         }
         
@@ -204,6 +255,12 @@ class ProvenanceTracker:
             logger.error(f"Invalid timestamp format: {e}")
             return False
         
+        # Optional epoch-nanosecond companion field
+        timestamp_ns = provenance.get('timestamp_ns')
+        if timestamp_ns is not None and type(timestamp_ns) is not int:
+            logger.error(f"Invalid timestamp_ns: {timestamp_ns!r}")
+            return False
+        
         logger.debug("Provenance record validation passed")
         return True
     
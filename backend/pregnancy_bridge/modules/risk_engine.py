@@ -1,86 +1,241 @@
-from typing import Dict, Optional, List
+from bisect import bisect_right
+from collections import namedtuple
+from functools import lru_cache
+from typing import Dict, Optional, Sequence
 
 
 RISK_GREEN = "green"
 RISK_YELLOW = "yellow"
 RISK_RED = "red"
 
+_NO_FINDING = (0, (), ())
+_EDEMA_OUTCOME = (
+    1,
+    ("Edema present",),
+    ("Monitor for progression, assess BP and proteinuria",),
+)
+
+# Threshold tables: bisect_right(thresholds, value) indexes the outcome
+# tuples, which hold (score, factor template, recommendations).
+_HB_MISSING = (0, (), ("Hemoglobin not recorded - measure at next visit",))
+_HB_THRESHOLDS = (7.0, 9.0, 11.0)
+_HB_OUTCOMES = (
+    (
+        3,
+        "Severe anemia (Hb {hb} g/dL)",
+        (
+            "URGENT: Immediate referral for transfusion evaluation",
+            "Start oral/IV iron + folate supplementation"
+        )
+    ),
+    (
+        2,
+        "Moderate anemia (Hb {hb} g/dL)",
+        (
+            "Start iron + folate supplementation immediately",
+            "Recheck Hb in 4 weeks"
+        )
+    ),
+    (1, "Mild anemia (Hb {hb} g/dL)", ("Oral iron supplementation advised",)),
+    (0, None, ()),
+)
+
+_BP_MISSING = (0, (), ("Blood pressure not recorded - measure at every visit",))
+_SYSTOLIC_THRESHOLDS = (130, 140, 160)
+_DIASTOLIC_THRESHOLDS = (80, 90, 110)
+_BP_OUTCOMES = (
+    (0, None, ()),
+    (
+        1,
+        "Elevated BP (BP {systolic}/{diastolic})",
+        (
+            "Repeat BP measurement in 1 week",
+            "Lifestyle counseling: reduce salt, adequate rest"
+        )
+    ),
+    (
+        2,
+        "Stage 2 hypertension (BP {systolic}/{diastolic})",
+        (
+            "Assess for pre-eclampsia symptoms",
+            "Monitor BP weekly, consider antihypertensive therapy"
+        )
+    ),
+    (
+        3,
+        "Severe hypertension (BP {systolic}/{diastolic})",
+        (
+            "URGENT: Risk of eclampsia - immediate hospital referral",
+            "Check for proteinuria, headache, visual changes, right upper quadrant pain"
+        )
+    ),
+)
+
+_GA_THRESHOLDS = (28, 34, 37)
+_GA_TERM = 3
+_GA_BAND_RECS = (
+    ("Early pregnancy - ensure adequate nutrition, rest, and iron supplementation",),
+    (),
+    ("Late preterm - monitor for preterm labor signs",),
+)
+
+# Symptom flags are folded into one int per call so each check is a bit test
+_BIT_HEADACHE = 1 << 0
+_BIT_VISUAL_CHANGES = 1 << 1
+_BIT_BLURRED_VISION = 1 << 2
+_BIT_NAUSEA = 1 << 3
+_BIT_VOMITING = 1 << 4
+_BIT_SWELLING = 1 << 5
+_BIT_EDEMA = 1 << 6
+_BIT_ABDOMINAL_PAIN = 1 << 7
+_BIT_EPIGASTRIC_PAIN = 1 << 8
+_SYMPTOM_BITS = {
+    "headache": _BIT_HEADACHE,
+    "visual_changes": _BIT_VISUAL_CHANGES,
+    "blurred_vision": _BIT_BLURRED_VISION,
+    "nausea": _BIT_NAUSEA,
+    "vomiting": _BIT_VOMITING,
+    "swelling": _BIT_SWELLING,
+    "edema": _BIT_EDEMA,
+    "abdominal_pain": _BIT_ABDOMINAL_PAIN,
+    "epigastric_pain": _BIT_EPIGASTRIC_PAIN,
+}
+_PREECLAMPSIA_SYMPTOM_GROUPS = (
+    (_BIT_HEADACHE, "headache"),
+    (_BIT_VISUAL_CHANGES | _BIT_BLURRED_VISION, "visual changes"),
+    (_BIT_NAUSEA | _BIT_VOMITING, "nausea/vomiting"),
+    (_BIT_SWELLING | _BIT_EDEMA, "swelling"),
+    (_BIT_ABDOMINAL_PAIN | _BIT_EPIGASTRIC_PAIN, "abdominal pain"),
+)
+_TRIAD_MASK = _BIT_HEADACHE | _BIT_VISUAL_CHANGES | _BIT_SWELLING
+
+_SYMPTOM_FACTOR_TEMPLATE = "Pre-eclampsia symptoms: {symptoms}"
+_SYMPTOM_SCREEN_RECS = ("Screen for pre-eclampsia (BP, proteinuria, liver/kidney function)",)
+_PREECLAMPSIA_LIKELY = (
+    3,
+    ("PRE-ECLAMPSIA LIKELY: Hypertension + Proteinuria",),
+    (
+        "URGENT: Immediate referral to hospital for pre-eclampsia workup",
+        "Consider magnesium sulfate prophylaxis, monitor for eclampsia"
+    )
+)
+_PREECLAMPSIA_RISK = (
+    2,
+    ("Pre-eclampsia risk: Hypertension + Symptoms",),
+    ("Urgent urine protein test, refer if positive",)
+)
+# Indexed by "measured below expected" (False -> above, True -> below)
+_FH_OUTCOMES = (
+    (
+        "Fundal height above expected (FH {fundal_height}cm at {ga}wks)",
+        ("Consider ultrasound for polyhydramnios or macrosomia",)
+    ),
+    (
+        "Fundal height below expected (FH {fundal_height}cm at {ga}wks)",
+        ("Consider ultrasound for IUGR (intrauterine growth restriction)",)
+    ),
+)
+_COMBINED_ANEMIA_HYPERTENSION = (
+    1,
+    ("Combined anemia + hypertension increases maternal morbidity",),
+    ("Hospital delivery with high-risk obstetric care recommended",)
+)
+
+# Only these trend fields influence scoring; they form part of the cache key
+_TREND_KEYS = (
+    'hb_drop',
+    'hb_drop_magnitude',
+    'bp_rising',
+    'bp_rise_magnitude',
+    'proteinuria_worsening',
+    'proteinuria_persistent',
+)
+
+_SEVERE_PROTEINURIA_MARKERS = ('3+', '4+', '3plus', '4plus')
+_PROTEINURIA_MARKERS = ('1+', '2+', 'trace')
+# Exact dipstick readings resolve with one lookup instead of a substring scan
+_PROTEINURIA_GRADES = {
+    **dict.fromkeys(_SEVERE_PROTEINURIA_MARKERS, 3),
+    **dict.fromkeys(_PROTEINURIA_MARKERS, 1),
+    'negative': 0,
+    'nil': 0,
+}
+# Grade -> (factor template, recommendations)
+_PROTEINURIA_OUTCOMES = {
+    3: (
+        "Severe proteinuria ({proteinuria})",
+        ("High risk for pre-eclampsia - immediate evaluation",)
+    ),
+    1: (
+        "Proteinuria detected ({proteinuria})",
+        ("Recheck urine protein, monitor for pre-eclampsia",)
+    ),
+}
+
 
 def assess_risk(
     data: Dict[str, any],
     symptoms: Optional[Dict[str, bool]] = None,
     trend_summary: Optional[Dict] = None
 ) -> Dict[str, any]:
-    if symptoms is None:
-        symptoms = {}
+    symptoms_mask = _symptom_mask(symptoms) if symptoms else 0
+    trend_items = tuple(
+        (key, trend_summary[key]) for key in _TREND_KEYS if key in trend_summary
+    ) if trend_summary else ()
+    
+    risk_level, risk_score, risk_factors, recommendations, summary = _assess_risk_cached(
+        data.get('hemoglobin'),
+        data.get('bp_systolic'),
+        data.get('bp_diastolic'),
+        data.get('gestational_age'),
+        data.get('proteinuria'),
+        data.get('fundal_height'),
+        bool(data.get('edema')),
+        symptoms_mask,
+        trend_items
+    )
     
-    if trend_summary is None:
-        trend_summary = {}
+    # The cached outcome is shared; hand each caller its own lists
+    return {
+        "risk_level": risk_level,
+        "risk_score": risk_score,
+        "risk_factors": list(risk_factors),
+        "recommendations": list(recommendations),
+        "summary": summary
+    }
+
+
+# Visits are re-assessed repeatedly with identical vitals (UI re-renders,
+# several endpoints per visit). typed=True keeps 7 and 7.0 apart because the
+# raw values are echoed into the factor text.
+@lru_cache(maxsize=1024, typed=True)
+def _assess_risk_cached(
+    hb: Optional[float],
+    bp_sys: Optional[int],
+    bp_dia: Optional[int],
+    ga: Optional[int],
+    proteinuria: Optional[str],
+    fundal_height: Optional[int],
+    edema: bool,
+    symptoms_mask: int,
+    trend_items: tuple
+) -> tuple:
+    visit = _Visit(
+        hb, bp_sys, bp_dia, ga, proteinuria, fundal_height, edema,
+        symptoms_mask, dict(trend_items)
+    )
     
     risk_score = 0
     risk_factors = []
     recommendations = []
     
-    hb = data.get('hemoglobin')
-    bp_sys = data.get('bp_systolic')
-    bp_dia = data.get('bp_diastolic')
-    ga = data.get('gestational_age')
-    proteinuria = data.get('proteinuria')
-    weight = data.get('weight')
-    fundal_height = data.get('fundal_height')
-    edema = data.get('edema')
-    
-    hb_score, hb_factors, hb_recs = _assess_hemoglobin(hb)
-    risk_score += hb_score
-    risk_factors.extend(hb_factors)
-    recommendations.extend(hb_recs)
-    
-    bp_score, bp_factors, bp_recs = _assess_blood_pressure(bp_sys, bp_dia)
-    risk_score += bp_score
-    risk_factors.extend(bp_factors)
-    recommendations.extend(bp_recs)
-    
-    protein_score, protein_factors, protein_recs = _assess_proteinuria(proteinuria)
-    risk_score += protein_score
-    risk_factors.extend(protein_factors)
-    recommendations.extend(protein_recs)
-    
-    if edema:
-        risk_factors.append("Edema present")
-        recommendations.append("Monitor for progression, assess BP and proteinuria")
-        risk_score += 1
-    
-    symptom_score, symptom_factors, symptom_recs = _assess_symptoms(symptoms)
-    risk_score += symptom_score
-    risk_factors.extend(symptom_factors)
-    recommendations.extend(symptom_recs)
-    
-    preeclampsia_score, preeclampsia_factors, preeclampsia_recs = _assess_preeclampsia_triad(
-        bp_sys, proteinuria, symptoms
-    )
-    risk_score += preeclampsia_score
-    risk_factors.extend(preeclampsia_factors)
-    recommendations.extend(preeclampsia_recs)
-    
-    ga_score, ga_factors, ga_recs = _assess_gestational_context(ga, hb, bp_sys)
-    risk_score += ga_score
-    risk_factors.extend(ga_factors)
-    recommendations.extend(ga_recs)
-    
-    fh_score, fh_factors, fh_recs = _assess_fundal_height(fundal_height, ga)
-    risk_score += fh_score
-    risk_factors.extend(fh_factors)
-    recommendations.extend(fh_recs)
-    
-    combined_score, combined_factors, combined_recs = _assess_combined_risks(hb, bp_sys)
-    risk_score += combined_score
-    risk_factors.extend(combined_factors)
-    recommendations.extend(combined_recs)
-    
-    trend_score, trend_factors, trend_recs = _assess_trends(trend_summary)
-    risk_score += trend_score
-    risk_factors.extend(trend_factors)
-    recommendations.extend(trend_recs)
+    for _, guard, assess in _RISK_RULES:
+        if guard is not None and not guard(visit):
+            continue
+        score, factors, recs = assess(visit)
+        risk_score += score
+        risk_factors.extend(factors)
+        recommendations.extend(recs)
     
     if risk_score >= 3:
         risk_level = RISK_RED
@@ -99,26 +254,70 @@ def assess_risk(
         recommendations.append("Continue routine ANC visits as scheduled")
         recommendations.append("Maintain balanced diet, adequate rest, and prenatal vitamins")
     
-    return {
-        "risk_level": risk_level,
-        "risk_score": risk_score,
-        "risk_factors": risk_factors,
-        "recommendations": recommendations,
-        "summary": summary
-    }
+    return risk_level, risk_score, tuple(risk_factors), tuple(recommendations), summary
 
 
-def _assess_trends(trend_summary: Dict) -> tuple[int, List[str], List[str]]:
+def assess_risk_batch(hb, bp_systolic, bp_diastolic, gestational_age=None, fundal_height=None):
+    """
+    Vectorised risk scoring for population reports over numeric vitals.
+    
+    Accepts equal-length sequences; None/NaN marks a missing value. Scores
+    match assess_risk for visits with no proteinuria, edema, symptoms or
+    trends. For the narrative of flagged rows, call assess_risk on
+    np.flatnonzero(result['risk_score']).
+    
+    Returns:
+        {'risk_score': int ndarray, 'risk_level': str ndarray}
+    """
+    import numpy as np
+    
+    hb = np.asarray(hb, dtype=float)
+    sys_bp = np.asarray(bp_systolic, dtype=float)
+    dia_bp = np.asarray(bp_diastolic, dtype=float)
+    ga = np.full(hb.shape, np.nan) if gestational_age is None else np.asarray(gestational_age, dtype=float)
+    fh = np.full(hb.shape, np.nan) if fundal_height is None else np.asarray(fundal_height, dtype=float)
+    
+    # NaN compares False everywhere, matching the "missing -> no score" rule;
+    # the != 0 tests mirror the truthiness checks in the scalar assessors.
+    hb_set = (hb != 0) & ~np.isnan(hb)
+    sys_set = (sys_bp != 0) & ~np.isnan(sys_bp)
+    bp_recorded = ~np.isnan(sys_bp) & ~np.isnan(dia_bp)
+    sys_hypertensive = sys_set & (sys_bp >= 140)
+    
+    score = np.select([hb < 7.0, hb < 9.0, hb < 11.0], [3, 2, 1], 0)
+    score += bp_recorded * np.select(
+        [
+            (sys_bp >= 160) | (dia_bp >= 110),
+            (sys_bp >= 140) | (dia_bp >= 90),
+            (sys_bp >= 130) | (dia_bp >= 80),
+        ],
+        [3, 2, 1],
+        0
+    )
+    at_term = ga >= 37
+    score += at_term & hb_set & (hb < 10.0)
+    score += at_term & sys_hypertensive
+    score += (fh != 0) & (ga != 0) & (np.abs(fh - ga) > 3)
+    score += hb_set & (hb < 9.0) & sys_hypertensive
+    
+    risk_level = np.select([score >= 3, score >= 1], [RISK_RED, RISK_YELLOW], RISK_GREEN)
+    return {"risk_score": score, "risk_level": risk_level}
+
+
+def _assess_trends(trend_summary: Dict) -> tuple[int, Sequence[str], Sequence[str]]:
     if not trend_summary:
-        return 0, [], []
+        return _NO_FINDING
+    
+    hb_drop = trend_summary.get('hb_drop')
+    bp_rising = trend_summary.get('bp_rising')
+    proteinuria_persistent = trend_summary.get('proteinuria_persistent')
     
     score = 0
     factors = []
     recs = []
     
-    if trend_summary.get('hb_drop'):
-        magnitude = trend_summary.get('hb_drop_magnitude', 0)
-        if magnitude >= 2.0:
+    if hb_drop:
+        if trend_summary.get('hb_drop_magnitude', 0) >= 2.0:
             factors.append("CRITICAL: Severe Hb decline across visits")
             recs.append("URGENT: Transfusion evaluation required")
             recs.append("Investigate cause: bleeding, poor compliance, malabsorption")
@@ -128,7 +327,7 @@ def _assess_trends(trend_summary: Dict) -> tuple[int, List[str], List[str]]:
             recs.append("Intensify iron therapy, assess compliance")
             score += 2
     
-    if trend_summary.get('bp_rising'):
+    if bp_rising:
         magnitude = trend_summary.get('bp_rise_magnitude', 0)
         if magnitude >= 20:
             factors.append("CRITICAL: Acute BP surge - Eclampsia imminent")
@@ -147,17 +346,17 @@ def _assess_trends(trend_summary: Dict) -> tuple[int, List[str], List[str]]:
         recs.append("Urgent nephrology consultation")
         recs.append("Check serum creatinine, uric acid")
         score += 2
-    elif trend_summary.get('proteinuria_persistent'):
+    elif proteinuria_persistent:
         factors.append("Persistent proteinuria across visits")
         recs.append("Monitor kidney function, consider specialist referral")
         score += 1
     
-    if trend_summary.get('hb_drop') and trend_summary.get('bp_rising'):
+    if hb_drop and bp_rising:
         factors.append("CRITICAL PATTERN: Combined anemia progression + BP elevation")
         recs.append("High-risk obstetric unit required for delivery")
         score += 2
     
-    if trend_summary.get('bp_rising') and trend_summary.get('proteinuria_persistent'):
+    if bp_rising and proteinuria_persistent:
         factors.append("CRITICAL PATTERN: Evolving pre-eclampsia with kidney involvement")
         recs.append("Hospital admission for fetal monitoring and maternal stabilization")
         score += 2
@@ -165,211 +364,169 @@ def _assess_trends(trend_summary: Dict) -> tuple[int, List[str], List[str]]:
     return score, factors, recs
 
 
-def _assess_hemoglobin(hb: Optional[float]) -> tuple[int, List[str], List[str]]:
+def _assess_hemoglobin(hb: Optional[float]) -> tuple[int, Sequence[str], Sequence[str]]:
     if hb is None:
-        return 0, [], ["Hemoglobin not recorded - measure at next visit"]
-    
-    if hb < 7.0:
-        return (
-            3,
-            [f"Severe anemia (Hb {hb} g/dL)"],
-            [
-                "URGENT: Immediate referral for transfusion evaluation",
-                "Start oral/IV iron + folate supplementation"
-            ]
-        )
-    elif hb < 9.0:
-        return (
-            2,
-            [f"Moderate anemia (Hb {hb} g/dL)"],
-            [
-                "Start iron + folate supplementation immediately",
-                "Recheck Hb in 4 weeks"
-            ]
-        )
-    elif hb < 11.0:
-        return (
-            1,
-            [f"Mild anemia (Hb {hb} g/dL)"],
-            ["Oral iron supplementation advised"]
-        )
+        return _HB_MISSING
     
-    return 0, [], []
+    score, factor, recs = _HB_OUTCOMES[bisect_right(_HB_THRESHOLDS, hb)]
+    if not score:
+        return _NO_FINDING
+    return score, (factor.format(hb=hb),), recs
 
 
-def _assess_blood_pressure(systolic: Optional[int], diastolic: Optional[int]) -> tuple[int, List[str], List[str]]:
+def _assess_blood_pressure(systolic: Optional[int], diastolic: Optional[int]) -> tuple[int, Sequence[str], Sequence[str]]:
     if systolic is None or diastolic is None:
-        return 0, [], ["Blood pressure not recorded - measure at every visit"]
-    
-    if systolic >= 160 or diastolic >= 110:
-        return (
-            3,
-            [f"Severe hypertension (BP {systolic}/{diastolic})"],
-            [
-                "URGENT: Risk of eclampsia - immediate hospital referral",
-                "Check for proteinuria, headache, visual changes, right upper quadrant pain"
-            ]
-        )
-    elif systolic >= 140 or diastolic >= 90:
-        return (
-            2,
-            [f"Stage 2 hypertension (BP {systolic}/{diastolic})"],
-            [
-                "Assess for pre-eclampsia symptoms",
-                "Monitor BP weekly, consider antihypertensive therapy"
-            ]
-        )
-    elif systolic >= 130 or diastolic >= 80:
-        return (
-            1,
-            [f"Elevated BP (BP {systolic}/{diastolic})"],
-            [
-                "Repeat BP measurement in 1 week",
-                "Lifestyle counseling: reduce salt, adequate rest"
-            ]
-        )
+        return _BP_MISSING
     
-    return 0, [], []
+    # Whichever reading crosses the higher band decides the outcome
+    level = max(
+        bisect_right(_SYSTOLIC_THRESHOLDS, systolic),
+        bisect_right(_DIASTOLIC_THRESHOLDS, diastolic)
+    )
+    score, factor, recs = _BP_OUTCOMES[level]
+    if not score:
+        return _NO_FINDING
+    return score, (factor.format(systolic=systolic, diastolic=diastolic),), recs
+
 
+def _proteinuria_grade(proteinuria: str) -> int:
+    level = proteinuria.lower()
+    grade = _PROTEINURIA_GRADES.get(level.strip())
+    if grade is not None:
+        return grade
+    # Free-text dipstick readings ("pos 3+", "2+ protein") fall back to a scan
+    if any(x in level for x in _SEVERE_PROTEINURIA_MARKERS):
+        return 3
+    if any(x in level for x in _PROTEINURIA_MARKERS):
+        return 1
+    return 0
 
-def _assess_proteinuria(proteinuria: Optional[str]) -> tuple[int, List[str], List[str]]:
+
+def _assess_proteinuria(proteinuria: Optional[str]) -> tuple[int, Sequence[str], Sequence[str]]:
     if not proteinuria:
-        return 0, [], []
-    
-    protein_level = proteinuria.lower()
+        return _NO_FINDING
     
-    if any(x in protein_level for x in ['3+', '4+', '3plus', '4plus']):
-        return (
-            3,
-            [f"Severe proteinuria ({proteinuria})"],
-            ["High risk for pre-eclampsia - immediate evaluation"]
-        )
-    elif any(x in protein_level for x in ['1+', '2+', 'trace']):
-        return (
-            1,
-            [f"Proteinuria detected ({proteinuria})"],
-            ["Recheck urine protein, monitor for pre-eclampsia"]
-        )
+    grade = _proteinuria_grade(proteinuria)
+    if not grade:
+        return _NO_FINDING
     
-    return 0, [], []
+    factor, recs = _PROTEINURIA_OUTCOMES[grade]
+    return grade, (factor.format(proteinuria=proteinuria),), recs
 
 
-def _assess_symptoms(symptoms: Dict[str, bool]) -> tuple[int, List[str], List[str]]:
-    preeclampsia_symptoms = []
-    
-    if symptoms.get("headache"):
-        preeclampsia_symptoms.append("headache")
-    if symptoms.get("visual_changes") or symptoms.get("blurred_vision"):
-        preeclampsia_symptoms.append("visual changes")
-    if symptoms.get("nausea") or symptoms.get("vomiting"):
-        preeclampsia_symptoms.append("nausea/vomiting")
-    if symptoms.get("swelling") or symptoms.get("edema"):
-        preeclampsia_symptoms.append("swelling")
-    if symptoms.get("abdominal_pain") or symptoms.get("epigastric_pain"):
-        preeclampsia_symptoms.append("abdominal pain")
+def _symptom_mask(symptoms: Dict[str, bool]) -> int:
+    mask = 0
+    for name, present in symptoms.items():
+        if present:
+            mask |= _SYMPTOM_BITS.get(name, 0)
+    return mask
+
+
+# At most 2**9 masks exist, so each symptom summary is formatted only once
+@lru_cache(maxsize=None)
+def _assess_symptoms(symptoms_mask: int) -> tuple[int, Sequence[str], Sequence[str]]:
+    preeclampsia_symptoms = [
+        label for bits, label in _PREECLAMPSIA_SYMPTOM_GROUPS
+        if symptoms_mask & bits
+    ]
     
     if not preeclampsia_symptoms:
-        return 0, [], []
+        return _NO_FINDING
     
     return (
         1,
-        [f"Pre-eclampsia symptoms: {', '.join(preeclampsia_symptoms)}"],
-        ["Screen for pre-eclampsia (BP, proteinuria, liver/kidney function)"]
+        (_SYMPTOM_FACTOR_TEMPLATE.format(symptoms=', '.join(preeclampsia_symptoms)),),
+        _SYMPTOM_SCREEN_RECS
     )
 
 
 def _assess_preeclampsia_triad(
     bp_systolic: Optional[int],
     proteinuria: Optional[str],
-    symptoms: Dict[str, bool]
-) -> tuple[int, List[str], List[str]]:
+    symptoms_mask: int
+) -> tuple[int, Sequence[str], Sequence[str]]:
     has_hypertension = bp_systolic and bp_systolic >= 140
     has_proteinuria = proteinuria and proteinuria not in ['negative', 'nil', 'trace']
     
-    symptom_count = sum([
-        symptoms.get("headache", False),
-        symptoms.get("visual_changes", False),
-        symptoms.get("swelling", False)
-    ])
-    has_symptoms = symptom_count >= 2
+    has_symptoms = (symptoms_mask & _TRIAD_MASK).bit_count() >= 2
     
     if has_hypertension and has_proteinuria:
-        return (
-            3,
-            ["PRE-ECLAMPSIA LIKELY: Hypertension + Proteinuria"],
-            [
-                "URGENT: Immediate referral to hospital for pre-eclampsia workup",
-                "Consider magnesium sulfate prophylaxis, monitor for eclampsia"
-            ]
-        )
+        return _PREECLAMPSIA_LIKELY
     elif has_hypertension and has_symptoms:
-        return (
-            2,
-            ["Pre-eclampsia risk: Hypertension + Symptoms"],
-            ["Urgent urine protein test, refer if positive"]
-        )
+        return _PREECLAMPSIA_RISK
     
-    return 0, [], []
+    return _NO_FINDING
 
 
 def _assess_gestational_context(
     ga: Optional[int],
     hb: Optional[float],
     bp_systolic: Optional[int]
-) -> tuple[int, List[str], List[str]]:
+) -> tuple[int, Sequence[str], Sequence[str]]:
     if ga is None:
-        return 0, [], []
+        return _NO_FINDING
+    
+    band = bisect_right(_GA_THRESHOLDS, ga)
+    if band != _GA_TERM:
+        return 0, (), _GA_BAND_RECS[band]
     
     score = 0
     factors = []
     recs = []
     
-    if ga >= 37:
-        if hb and hb < 10.0:
-            factors.append("Anemia at term increases labor complications")
-            score += 1
-        if bp_systolic and bp_systolic >= 140:
-            factors.append("Hypertension at term - delivery may be indicated")
-            recs.append("Discuss timing of delivery with obstetrician")
-            score += 1
-    elif ga >= 34:
-        recs.append("Late preterm - monitor for preterm labor signs")
-    elif ga < 28:
-        recs.append("Early pregnancy - ensure adequate nutrition, rest, and iron supplementation")
+    if hb and hb < 10.0:
+        factors.append("Anemia at term increases labor complications")
+        score += 1
+    if bp_systolic and bp_systolic >= 140:
+        factors.append("Hypertension at term - delivery may be indicated")
+        recs.append("Discuss timing of delivery with obstetrician")
+        score += 1
     
     return score, factors, recs
 
 
-def _assess_fundal_height(fundal_height: Optional[int], ga: Optional[int]) -> tuple[int, List[str], List[str]]:
+def _assess_fundal_height(fundal_height: Optional[int], ga: Optional[int]) -> tuple[int, Sequence[str], Sequence[str]]:
     if not fundal_height or not ga:
-        return 0, [], []
+        return _NO_FINDING
     
-    expected_fh = ga
-    difference = abs(fundal_height - expected_fh)
+    # Expected fundal height in cm equals gestational age in weeks
+    diff = fundal_height - ga
+    if -3 <= diff <= 3:
+        return _NO_FINDING
     
-    if difference <= 3:
-        return 0, [], []
-    
-    if fundal_height < expected_fh:
-        return (
-            1,
-            [f"Fundal height below expected (FH {fundal_height}cm at {ga}wks)"],
-            ["Consider ultrasound for IUGR (intrauterine growth restriction)"]
-        )
-    else:
-        return (
-            1,
-            [f"Fundal height above expected (FH {fundal_height}cm at {ga}wks)"],
-            ["Consider ultrasound for polyhydramnios or macrosomia"]
-        )
+    factor, recs = _FH_OUTCOMES[diff < 0]
+    return 1, (factor.format(fundal_height=fundal_height, ga=ga),), recs
 
 
-def _assess_combined_risks(hb: Optional[float], bp_systolic: Optional[int]) -> tuple[int, List[str], List[str]]:
+def _assess_combined_risks(hb: Optional[float], bp_systolic: Optional[int]) -> tuple[int, Sequence[str], Sequence[str]]:
     if hb and hb < 9.0 and bp_systolic and bp_systolic >= 140:
-        return (
-            1,
-            ["Combined anemia + hypertension increases maternal morbidity"],
-            ["Hospital delivery with high-risk obstetric care recommended"]
-        )
+        return _COMBINED_ANEMIA_HYPERTENSION
     
-    return 0, [], []
+    return _NO_FINDING
+
+
+_Visit = namedtuple('_Visit', (
+    'hb', 'bp_sys', 'bp_dia', 'ga', 'proteinuria', 'fundal_height', 'edema',
+    'symptoms_mask', 'trend_summary'
+))
+
+# Rule table: (priority, guard, assessor). Every assessor returns a
+# (score, factors, recommendations) triple. Rules run in priority order,
+# which is also the order findings are reported in. A rule whose guard
+# fails cannot fire and is skipped. Hb and BP have no guard because they
+# recommend measuring a missing value.
+_RISK_RULES = tuple(sorted((
+    (10, None, lambda v: _assess_hemoglobin(v.hb)),
+    (20, None, lambda v: _assess_blood_pressure(v.bp_sys, v.bp_dia)),
+    (30, lambda v: v.proteinuria, lambda v: _assess_proteinuria(v.proteinuria)),
+    (40, lambda v: v.edema, lambda v: _EDEMA_OUTCOME),
+    (50, lambda v: v.symptoms_mask, lambda v: _assess_symptoms(v.symptoms_mask)),
+    (60, lambda v: v.bp_sys,
+     lambda v: _assess_preeclampsia_triad(v.bp_sys, v.proteinuria, v.symptoms_mask)),
+    (70, lambda v: v.ga is not None,
+     lambda v: _assess_gestational_context(v.ga, v.hb, v.bp_sys)),
+    (80, lambda v: v.fundal_height and v.ga,
+     lambda v: _assess_fundal_height(v.fundal_height, v.ga)),
+    (90, lambda v: v.hb and v.bp_sys, lambda v: _assess_combined_risks(v.hb, v.bp_sys)),
+    (100, lambda v: v.trend_summary, lambda v: _assess_trends(v.trend_summary)),
+), key=lambda rule: rule[0]))
@@ -10,226 +10,316 @@ from datetime import datetime
 import json
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
-class SymptomIntake:
+# WHO/ACOG recognized maternal warning symptoms
+VALID_SYMPTOMS = frozenset({
+    'headache',
+    'blurred_vision',
+    'facial_edema',
+    'pedal_edema',
+    'dizziness',
+    'breathlessness',
+    'reduced_fetal_movement',
+    'abdominal_pain',
+    'nausea_vomiting'
+})
+
+# Clinical symptom categories (evidence-based grouping)
+NEUROLOGICAL_SYMPTOMS = frozenset({'headache', 'blurred_vision', 'dizziness'})
+EDEMA_SYMPTOMS = frozenset({'facial_edema', 'pedal_edema'})
+RESPIRATORY_SYMPTOMS = frozenset({'breathlessness'})
+FETAL_CONCERN_SYMPTOMS = frozenset({'reduced_fetal_movement'})
+GI_SYMPTOMS = frozenset({'nausea_vomiting', 'abdominal_pain'})
+
+# One bit per symptom, assigned in alphabetical order so that walking the
+# set bits from lowest to highest yields sorted symptom names.
+_SYMPTOM_NAMES = tuple(sorted(VALID_SYMPTOMS))
+_SYMPTOM_BITS = {name: 1 << i for i, name in enumerate(_SYMPTOM_NAMES)}
+
+
+def _symptom_mask(names) -> int:
+    mask = 0
+    for name in names:
+        mask |= _SYMPTOM_BITS[name]
+    return mask
+
+
+_NEUROLOGICAL_MASK = _symptom_mask(NEUROLOGICAL_SYMPTOMS)
+_EDEMA_MASK = _symptom_mask(EDEMA_SYMPTOMS)
+_RESPIRATORY_MASK = _symptom_mask(RESPIRATORY_SYMPTOMS)
+_FETAL_CONCERN_MASK = _symptom_mask(FETAL_CONCERN_SYMPTOMS)
+_GI_MASK = _symptom_mask(GI_SYMPTOMS)
+
+
+def _symptom_names(mask: int) -> List[str]:
+    """Expand a symptom bitmask into its sorted list of symptom names."""
+    names = []
+    while mask:
+        low_bit = mask & -mask
+        names.append(_SYMPTOM_NAMES[low_bit.bit_length() - 1])
+        mask ^= low_bit
+    return names
+
+
+def validate_symptoms(symptom_data: Dict) -> Tuple[bool, Optional[str]]:
     """
-    Structured symptom capture interface for maternal risk assessment.
+    Validate symptom input structure and data types.
     
-    Validates and processes 9 clinical symptom fields with categorization
-    for integration with temporal risk escalation engine.
-    
-    Thread-safe and stateless for production deployment.
+    Args:
+        symptom_data: Dictionary containing 'symptoms' key with boolean values
+        
+    Returns:
+        Tuple of (is_valid: bool, error_message: Optional[str])
+        
+    Example:
+        >>> valid, error = validate_symptoms({
+        ...     'symptoms': {'headache': True, 'blurred_vision': False}
+        ... })
+        >>> valid
+        True
     """
+    # Type validation
+    if not isinstance(symptom_data, dict):
+        return False, "Input must be a dictionary"
     
-    # WHO/ACOG recognized maternal warning symptoms
-    VALID_SYMPTOMS = {
-        'headache',
-        'blurred_vision',
-        'facial_edema',
-        'pedal_edema',
-        'dizziness',
-        'breathlessness',
-        'reduced_fetal_movement',
-        'abdominal_pain',
-        'nausea_vomiting'
-    }
+    if 'symptoms' not in symptom_data:
+        return False, "Missing required 'symptoms' key"
     
-    # Clinical symptom categories (evidence-based grouping)
-    NEUROLOGICAL_SYMPTOMS = {'headache', 'blurred_vision', 'dizziness'}
-    EDEMA_SYMPTOMS = {'facial_edema', 'pedal_edema'}
-    RESPIRATORY_SYMPTOMS = {'breathlessness'}
-    FETAL_CONCERN_SYMPTOMS = {'reduced_fetal_movement'}
-    GI_SYMPTOMS = {'nausea_vomiting', 'abdominal_pain'}
+    symptoms = symptom_data['symptoms']
+    if not isinstance(symptoms, dict):
+        return False, "'symptoms' value must be a dictionary"
     
-    def __init__(self):
-        """Initialize symptom intake module"""
-        logger.info("SymptomIntake module initialized")
-    
-    def validate_symptoms(self, symptom_data: Dict) -> Tuple[bool, Optional[str]]:
-        """
-        Validate symptom input structure and data types.
-        
-        Args:
-            symptom_data: Dictionary containing 'symptoms' key with boolean values
-            
-        Returns:
-            Tuple of (is_valid: bool, error_message: Optional[str])
-            
-        Example:
-            >>> intake = SymptomIntake()
-            >>> valid, error = intake.validate_symptoms({
-            ...     'symptoms': {'headache': True, 'blurred_vision': False}
-            ... })
-            >>> valid
-            True
-        """
-        # Type validation
-        if not isinstance(symptom_data, dict):
-            return False, "Input must be a dictionary"
-        
-        if 'symptoms' not in symptom_data:
-            return False, "Missing required 'symptoms' key"
-        
-        symptoms = symptom_data['symptoms']
-        if not isinstance(symptoms, dict):
-            return False, "'symptoms' value must be a dictionary"
-        
-        # Empty symptoms allowed (no symptoms reported)
-        if len(symptoms) == 0:
-            logger.warning("Empty symptom dictionary provided")
-            return True, None
-        
-        # Validate symptom keys
-        invalid_keys = set(symptoms.keys()) - self.VALID_SYMPTOMS
-        if invalid_keys:
-            return False, f"Invalid symptom keys: {sorted(invalid_keys)}"
-        
-        # Validate boolean values
-        for key, value in symptoms.items():
-            if not isinstance(value, bool):
-                return False, f"Symptom '{key}' must be boolean, got {type(value).__name__}"
-        
+    # Empty symptoms allowed (no symptoms reported)
+    if len(symptoms) == 0:
+        logger.warning("Empty symptom dictionary provided")
         return True, None
     
-    def capture_symptoms(self, symptom_data: Dict, visit_id: Optional[str] = None) -> Dict:
-        """
-        Capture and structure symptom data with clinical categorization.
-        
-        Args:
-            symptom_data: Validated symptom dictionary
-            visit_id: Optional visit identifier for tracking
-            
-        Returns:
-            Structured symptom record with categories and metadata
-            
-        Raises:
-            ValueError: If symptom data validation fails
-            
-        Example:
-            >>> intake = SymptomIntake()
-            >>> record = intake.capture_symptoms({
-            ...     'symptoms': {
-            ...         'headache': True,
-            ...         'blurred_vision': True,
-            ...         'pedal_edema': False
-            ...     }
-            ... }, visit_id='V001')
-        """
-        # Validate input
-        is_valid, error = self.validate_symptoms(symptom_data)
-        if not is_valid:
-            logger.error(f"Symptom validation failed: {error}")
-            raise ValueError(f"Invalid symptom data: {error}")
-        
-        symptoms = symptom_data.get('symptoms', {})
-        
-        # Extract present symptoms (True values only)
-        present_symptoms = sorted([k for k, v in symptoms.items() if v])
-        
-        # Categorize symptoms
-        neurological = sorted(list(self.NEUROLOGICAL_SYMPTOMS & set(present_symptoms)))
-        edema = sorted(list(self.EDEMA_SYMPTOMS & set(present_symptoms)))
-        respiratory = sorted(list(self.RESPIRATORY_SYMPTOMS & set(present_symptoms)))
-        fetal_concern = sorted(list(self.FETAL_CONCERN_SYMPTOMS & set(present_symptoms)))
-        gi = sorted(list(self.GI_SYMPTOMS & set(present_symptoms)))
-        
-        # Count active categories
-        active_categories = sum([
-            len(neurological) > 0,
-            len(edema) > 0,
-            len(respiratory) > 0,
-            len(fetal_concern) > 0,
-            len(gi) > 0
-        ])
-        
-        symptom_record = {
-            'visit_id': visit_id,
-            'timestamp': datetime.now().isoformat(),
-            'raw_symptoms': symptoms,
-            'present_symptoms': present_symptoms,
-            'symptom_count': len(present_symptoms),
-            'categories': {
-                'neurological': neurological,
-                'edema': edema,
-                'respiratory': respiratory,
-                'fetal_concern': fetal_concern,
-                'gi': gi
-            },
-            'has_neurological': len(neurological) > 0,
-            'has_edema': len(edema) > 0,
-            'has_respiratory': len(respiratory) > 0,
-            'has_fetal_concern': len(fetal_concern) > 0,
-            'has_gi': len(gi) > 0,
-            'multiple_categories': active_categories >= 2,
-            'category_count': active_categories
-        }
-        
-        logger.info(f"Captured {len(present_symptoms)} symptoms across {active_categories} categories")
-        return symptom_record
+    # Validate symptom keys (subset test avoids building a difference set)
+    keys = symptoms.keys()
+    if not keys <= VALID_SYMPTOMS:
+        return False, f"Invalid symptom keys: {sorted(keys - VALID_SYMPTOMS)}"
     
-    def attach_to_visit(self, visit_record: Dict, symptom_record: Dict) -> Dict:
-        """
-        Attach symptom data to an existing visit record.
-        
-        Args:
-            visit_record: Existing clinical visit data
-            symptom_record: Captured symptom data from capture_symptoms()
-            
-        Returns:
-            Enhanced visit record with symptoms attached
-        """
-        if not isinstance(visit_record, dict):
-            raise ValueError("visit_record must be a dictionary")
+    # Validate boolean values (bool cannot be subclassed)
+    for key, value in symptoms.items():
+        if value.__class__ is not bool:
+            return False, f"Symptom '{key}' must be boolean, got {type(value).__name__}"
+    
+    return True, None
+
+
+def capture_symptoms(
+    symptom_data: Dict,
+    visit_id: Optional[str] = None,
+    timestamp: Optional[str] = None
+) -> Dict:
+    """
+    Capture and structure symptom data with clinical categorization.
+    
+    Args:
+        symptom_data: Validated symptom dictionary
+        visit_id: Optional visit identifier for tracking
+        timestamp: Optional ISO timestamp for the record; defaults to now
         
-        if not isinstance(symptom_record, dict):
-            raise ValueError("symptom_record must be a dictionary")
+    Returns:
+        Structured symptom record with categories and metadata
         
-        enhanced_visit = visit_record.copy()
-        enhanced_visit['symptoms'] = symptom_record
+    Raises:
+        ValueError: If symptom data validation fails
         
-        logger.debug(f"Attached symptoms to visit {visit_record.get('date', 'unknown')}")
-        return enhanced_visit
+    Example:
+        >>> record = capture_symptoms({
+        ...     'symptoms': {
+        ...         'headache': True,
+        ...         'blurred_vision': True,
+        ...         'pedal_edema': False
+        ...     }
+        ... }, visit_id='V001')
+    """
+    # Validate input
+    is_valid, error = validate_symptoms(symptom_data)
+    if not is_valid:
+        logger.error("Symptom validation failed: %s", error)
+        raise ValueError(f"Invalid symptom data: {error}")
     
-    def get_symptom_summary(self, symptom_record: Dict) -> str:
-        """
-        Generate human-readable symptom summary for clinical display.
-        
-        Args:
-            symptom_record: Symptom record from capture_symptoms()
-            
-        Returns:
-            Formatted string summary
-        """
-        if not symptom_record or symptom_record.get('symptom_count', 0) == 0:
-            return "No symptoms reported"
-        
-        count = symptom_record['symptom_count']
-        present = symptom_record['present_symptoms']
+    symptoms = symptom_data.get('symptoms', {})
+    
+    # Encode present symptoms (True values only) as a bitmask
+    mask = 0
+    for name, present in symptoms.items():
+        if present:
+            mask |= _SYMPTOM_BITS[name]
+    present_symptoms = _symptom_names(mask)
+    
+    # Categorize symptoms
+    neurological_mask = mask & _NEUROLOGICAL_MASK
+    edema_mask = mask & _EDEMA_MASK
+    respiratory_mask = mask & _RESPIRATORY_MASK
+    fetal_concern_mask = mask & _FETAL_CONCERN_MASK
+    gi_mask = mask & _GI_MASK
+    neurological = _symptom_names(neurological_mask)
+    edema = _symptom_names(edema_mask)
+    respiratory = _symptom_names(respiratory_mask)
+    fetal_concern = _symptom_names(fetal_concern_mask)
+    gi = _symptom_names(gi_mask)
+    
+    # Count active categories
+    active_categories = (
+        bool(neurological_mask)
+        | bool(edema_mask) << 1
+        | bool(respiratory_mask) << 2
+        | bool(fetal_concern_mask) << 3
+        | bool(gi_mask) << 4
+    ).bit_count()
+    
+    symptom_record = {
+        'visit_id': visit_id,
+        'timestamp': timestamp if timestamp is not None else datetime.now().isoformat(),
+        'raw_symptoms': symptoms,
+        'present_symptoms': present_symptoms,
+        'symptom_count': len(present_symptoms),
+        'categories': {
+            'neurological': neurological,
+            'edema': edema,
+            'respiratory': respiratory,
+            'fetal_concern': fetal_concern,
+            'gi': gi
+        },
+        'has_neurological': bool(neurological_mask),
+        'has_edema': bool(edema_mask),
+        'has_respiratory': bool(respiratory_mask),
+        'has_fetal_concern': bool(fetal_concern_mask),
+        'has_gi': bool(gi_mask),
+        'multiple_categories': active_categories >= 2,
+        'category_count': active_categories
+    }
+    
+    logger.info("Captured %d symptoms across %d categories", len(present_symptoms), active_categories)
+    return symptom_record
+
+
+def attach_to_visit(visit_record: Dict, symptom_record: Dict) -> Dict:
+    """
+    Attach symptom data to an existing visit record.
+    
+    Args:
+        visit_record: Existing clinical visit data
+        symptom_record: Captured symptom data from capture_symptoms()
         
-        if count <= 3:
-            return f"{', '.join(present)}"
-        else:
-            return f"{count} symptoms: {', '.join(present[:3])}..."
-    
-    def export_to_json(self, symptom_record: Dict, filepath: str) -> None:
-        """
-        Export symptom record to JSON file.
+    Returns:
+        Enhanced visit record with symptoms attached
+    """
+    if not isinstance(visit_record, dict):
+        raise ValueError("visit_record must be a dictionary")
+    
+    if not isinstance(symptom_record, dict):
+        raise ValueError("symptom_record must be a dictionary")
+    
+    enhanced_visit = visit_record.copy()
+    enhanced_visit['symptoms'] = symptom_record
+    
+    logger.debug("Attached symptoms to visit %s", visit_record.get('date', 'unknown'))
+    return enhanced_visit
+
+
+def get_symptom_summary(symptom_record: Dict) -> str:
+    """
+    Generate human-readable symptom summary for clinical display.
+    
+    Args:
+        symptom_record: Symptom record from capture_symptoms()
         
-        Args:
-            symptom_record: Symptom record to export
-            filepath: Destination file path
-        """
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(symptom_record, f, indent=2, ensure_ascii=False)
-            logger.info(f"Symptom record exported to {filepath}")
-        except Exception as e:
-            logger.error(f"Failed to export symptom record: {e}")
-            raise
+    Returns:
+        Formatted string summary
+    """
+    if not symptom_record or symptom_record.get('symptom_count', 0) == 0:
+        return "No symptoms reported"
+    
+    count = symptom_record['symptom_count']
+    present = symptom_record['present_symptoms']
+    
+    if count <= 3:
+        return f"{', '.join(present)}"
+    else:
+        return f"{count} symptoms: {', '.join(present[:3])}..."
+
+
+def _dumps_bytes(obj, pretty: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def export_to_json(symptom_record: Dict, filepath: str, pretty: bool = False) -> None:
+    """
+    Export symptom record to JSON file.
+    
+    Args:
+        symptom_record: Symptom record to export
+        filepath: Destination file path
+        pretty: Indent the output for reading; compact output is faster
+    """
+    try:
+        with open(filepath, 'wb') as f:
+            f.write(_dumps_bytes(symptom_record, pretty))
+        logger.info("Symptom record exported to %s", filepath)
+    except Exception as e:
+        logger.error("Failed to export symptom record: %s", e)
+        raise
+
+
+def export_many(symptom_records: List[Dict], filepath: str) -> None:
+    """
+    Export symptom records as newline-delimited JSON in a single write.
+    
+    Args:
+        symptom_records: Symptom records to export, one per line
+        filepath: Destination file path
+    """
+    try:
+        with open(filepath, 'wb') as f:
+            f.write(b''.join(_dumps_bytes(record) + b'\n' for record in symptom_records))
+        logger.info("Exported %d symptom records to %s", len(symptom_records), filepath)
+    except Exception as e:
+        logger.error("Failed to export symptom records: %s", e)
+        raise
+
+
+class SymptomIntake:
+    """
+    Structured symptom capture interface for maternal risk assessment.
+    
+    Validates and processes 9 clinical symptom fields with categorization
+    for integration with temporal risk escalation engine.
+    
+    Thread-safe and stateless for production deployment. The work is done
+    by the module-level functions; this class keeps the original
+    instance-based interface for existing callers.
+    """
+    
+    VALID_SYMPTOMS = VALID_SYMPTOMS
+    NEUROLOGICAL_SYMPTOMS = NEUROLOGICAL_SYMPTOMS
+    EDEMA_SYMPTOMS = EDEMA_SYMPTOMS
+    RESPIRATORY_SYMPTOMS = RESPIRATORY_SYMPTOMS
+    FETAL_CONCERN_SYMPTOMS = FETAL_CONCERN_SYMPTOMS
+    GI_SYMPTOMS = GI_SYMPTOMS
+    
+    validate_symptoms = staticmethod(validate_symptoms)
+    capture_symptoms = staticmethod(capture_symptoms)
+    attach_to_visit = staticmethod(attach_to_visit)
+    get_symptom_summary = staticmethod(get_symptom_summary)
+    export_to_json = staticmethod(export_to_json)
+    export_many = staticmethod(export_many)
 
 
 # Quick validation function for external use
@@ -243,8 +333,7 @@ def validate_symptom_input(data: Dict) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    intake = SymptomIntake()
-    is_valid, _ = intake.validate_symptoms(data)
+    is_valid, _ = validate_symptoms(data)
     return is_valid
 
 
@@ -5,16 +5,45 @@ Author: PregnancyBridge Development Team
 Version: 1.0.0
 """
 
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from types import MappingProxyType
 from datetime import datetime
 import logging
+import math
+import time
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+    _jit = numba.njit(cache=True, error_model='numpy')
+    _jit_parallel = numba.njit(parallel=True, cache=True, error_model='numpy')
+    _prange = numba.prange
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def _jit(func):
+        return func
+    
+    _jit_parallel = _jit
+    _prange = range
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # ── Human-readable labels for raw symptom keys ────────────────────────────────
-_SYMPTOM_LABELS: Dict[str, str] = {
+class _LabelMap(dict):
+    """Label lookup that falls back to the key itself for unknown symptoms."""
+    __slots__ = ()
+    
+    def __missing__(self, key):
+        return key
+
+
+_SYMPTOM_LABELS: Dict[str, str] = _LabelMap({
     'headache':               'Headache',
     'blurred_vision':         'Blurred Vision',
     'pedal_edema':            'Foot/Leg Swelling',
@@ -24,11 +53,345 @@ _SYMPTOM_LABELS: Dict[str, str] = {
     'reduced_fetal_movement': 'Reduced Fetal Movement',
     'abdominal_pain':         'Abdominal Pain',
     'nausea_vomiting':        'Nausea / Vomiting',
-}
+})
+
+# Human-readable label for a symptom key, falling back to the key itself
+_label = _SYMPTOM_LABELS.__getitem__
+
+
+def _join_labels(keys) -> str:
+    """Comma-join the labels for a sequence of symptom keys."""
+    return ', '.join(map(_label, keys))
+
+
+# Ordering of component risk levels when picking the primary lab concern
+_RISK_CODE = MappingProxyType({'HIGH': 3, 'MODERATE': 2, 'LOW': 1, 'UNKNOWN': 0})
+
+
+# Assessment timestamps have one-second resolution; the formatted string is
+# reused for every assessment within the same second. Stored as one tuple so
+# concurrent readers never see a mismatched pair.
+_TS_CACHE = (0, "")
+
+
+def _iso_now() -> str:
+    global _TS_CACHE
+    now_s = int(time.time())
+    cached_s, cached_iso = _TS_CACHE
+    if now_s != cached_s:
+        cached_iso = datetime.fromtimestamp(now_s).isoformat()
+        _TS_CACHE = (now_s, cached_iso)
+    return cached_iso
+
+
+# ── Scalar decision kernels ───────────────────────────────────────────────────
+# Pure numeric threshold logic shared by the per-visit assessors and the
+# batch paths. Compiled with numba when it is installed.
+_BP_HIGH_SBP = 140      # mmHg
+_BP_HIGH_DBP = 90       # mmHg
+_BP_SEVERE_SBP = 160    # mmHg
+_BP_SEVERE_DBP = 110    # mmHg
+
+_HB_MODERATE_ANEMIA = 9.0   # g/dL
+_HB_SEVERE_ANEMIA = 7.0     # g/dL
+
+# Kernel outcomes (finer than risk levels so the caller can pick the reason)
+_NORMAL = 1
+_ELEVATED = 2
+_SEVERE = 3
+_PERSISTENT = 4
+
+
+@_jit
+def _bp_decision(sys_now, dia_now, sys_prev, dia_prev):
+    """Classify the latest BP; a zero previous reading counts as absent."""
+    if sys_now >= _BP_SEVERE_SBP or dia_now >= _BP_SEVERE_DBP:
+        return _SEVERE
+    if sys_now >= _BP_HIGH_SBP or dia_now >= _BP_HIGH_DBP:
+        if sys_prev != 0 and dia_prev != 0 and (sys_prev >= _BP_HIGH_SBP or dia_prev >= _BP_HIGH_DBP):
+            return _PERSISTENT
+        return _ELEVATED
+    return _NORMAL
+
+
+@_jit
+def _hb_decision(hb_now, hb_prev):
+    """Classify the latest Hb; _PERSISTENT marks a moderate anemia that is falling."""
+    if hb_now < _HB_SEVERE_ANEMIA:
+        return _SEVERE
+    if hb_now < _HB_MODERATE_ANEMIA:
+        if hb_prev != 0 and hb_prev > hb_now:
+            return _PERSISTENT
+        return _ELEVATED
+    return _NORMAL
+
+
+# Integer codes for dipstick proteinuria readings; unrecognised values count as nil
+_PROTEINURIA_CODE = {'nil': 0, 'trace': 1, '+1': 2, '+2': 3, '+3': 4, '+4': 5}
+_PROTEINURIA_NAMES = tuple(_PROTEINURIA_CODE)   # code -> canonical reading
+_PROTEINURIA_SIGNIFICANT = 3                     # '+2' and above
+
+
+def _proteinuria_code(reading) -> int:
+    """Map a proteinuria reading to its code, lower-casing only when needed."""
+    code = _PROTEINURIA_CODE.get(reading)
+    if code is None:
+        code = _PROTEINURIA_CODE.get(reading.lower(), 0) if isinstance(reading, str) else 0
+    return code
+
+
+@_jit
+def _proteinuria_decision(now_code, prev_code):
+    """Classify the latest dipstick code; _PERSISTENT marks mild-but-repeated."""
+    if now_code >= _PROTEINURIA_SIGNIFICANT:
+        return _SEVERE
+    if now_code >= 1:
+        if prev_code >= 1:
+            return _PERSISTENT
+        return _ELEVATED
+    return _NORMAL
+
+
+@dataclass
+class VisitBatch:
+    """
+    Column-wise lab values for many patients, for batch triage.
+    
+    Each array has shape (n_patients, 2): column 0 is the previous visit,
+    column 1 the latest. Missing BP/Hb values are NaN; proteinuria holds
+    _PROTEINURIA_CODE values. visit_count is the number of visits each
+    patient actually has (0, 1 or more).
+    """
+    systolic: Any       # float32
+    diastolic: Any      # float32
+    hemoglobin: Any     # float64 (float32 could round 6.99999 up to 7.0)
+    proteinuria: Any    # int8
+    visit_count: Any    # int32
+    
+    @classmethod
+    def from_visits(cls, patients: List[List[Dict]]) -> 'VisitBatch':
+        """Pack per-patient visit lists (oldest to newest) into columns."""
+        import numpy as np
+        
+        n = len(patients)
+        systolic = np.full((n, 2), np.nan, dtype=np.float32)
+        diastolic = np.full((n, 2), np.nan, dtype=np.float32)
+        hemoglobin = np.full((n, 2), np.nan, dtype=np.float64)
+        proteinuria = np.zeros((n, 2), dtype=np.int8)
+        visit_count = np.zeros(n, dtype=np.int32)
+        
+        for i, visits in enumerate(patients):
+            visit_count[i] = len(visits)
+            for col, visit in zip((1, 0), reversed(visits[-2:])):
+                bp = visit.get('bp') or {}
+                if bp.get('systolic') is not None:
+                    systolic[i, col] = bp['systolic']
+                if bp.get('diastolic') is not None:
+                    diastolic[i, col] = bp['diastolic']
+                if visit.get('hemoglobin') is not None:
+                    hemoglobin[i, col] = visit['hemoglobin']
+                proteinuria[i, col] = _proteinuria_code(visit.get('proteinuria', 'nil'))
+        
+        return cls(systolic, diastolic, hemoglobin, proteinuria, visit_count)
+
+
+# ── Escalation rule table ─────────────────────────────────────────────────────
+# combine_with_symptoms reduces its inputs to a small integer key
+# (lab risk level, what the lab reason is about, which symptom flags are set)
+# and looks up the number of the first escalation rule that fires.
+# Rule 0 means "no escalation; keep the laboratory risk".
+_LAB_RISK_INDEX = {'LOW': 1, 'MODERATE': 2, 'HIGH': 3}  # anything else -> 0
+
+_LAB_BP = 1
+_LAB_ANEMIA = 2
+_LAB_PROTEINURIA = 4
+
+_SYM_NEURO = 1
+_SYM_EDEMA = 2
+_SYM_RESPIRATORY = 4
+_SYM_FETAL_CONCERN = 8
+_SYM_MULTIPLE_CATEGORIES = 16
+_SYM_TWO_OR_MORE = 32
+
 
-def _label(key: str) -> str:
-    """Return a human-readable label for a symptom key, falling back to the key itself."""
-    return _SYMPTOM_LABELS.get(key, key)
+def _lab_flags(lab_reason: Optional[str]) -> int:
+    """Classify a lab reason by the findings it mentions (for callers that pass no lab_category)."""
+    if not lab_reason:
+        return 0
+    text = lab_reason.lower()
+    flags = 0
+    if "bp" in text or "hypertension" in text:
+        flags |= _LAB_BP
+    if "anemia" in text:
+        flags |= _LAB_ANEMIA
+    if "proteinuria" in text:
+        flags |= _LAB_PROTEINURIA
+    return flags
+
+
+def _symptom_flags(symptom_data: Dict, present_symptoms: List[str]) -> int:
+    return (
+        bool(symptom_data.get('has_neurological', False)) * _SYM_NEURO
+        | bool(symptom_data.get('has_edema', False)) * _SYM_EDEMA
+        | bool(symptom_data.get('has_respiratory', False)) * _SYM_RESPIRATORY
+        | bool(symptom_data.get('has_fetal_concern', False)) * _SYM_FETAL_CONCERN
+        | bool(symptom_data.get('multiple_categories', False)) * _SYM_MULTIPLE_CATEGORIES
+        | (len(present_symptoms) >= 2) * _SYM_TWO_OR_MORE
+    )
+
+
+def _rule_key(lab_risk: str, lab_flags: int, symptom_data: Dict, present_symptoms: List[str]) -> int:
+    symptoms = _symptom_flags(symptom_data, present_symptoms)
+    return _LAB_RISK_INDEX.get(lab_risk, 0) << 9 | lab_flags << 6 | symptoms
+
+
+def _select_rule(risk_index: int, lab: int, symptoms: int) -> int:
+    """Rule precedence, evaluated once per key when the table is built."""
+    elevated = risk_index >= 2
+    if elevated and lab & _LAB_BP and symptoms & _SYM_NEURO:
+        return 1
+    if lab & _LAB_PROTEINURIA and symptoms & _SYM_NEURO:
+        return 2
+    if elevated and lab & _LAB_ANEMIA and symptoms & _SYM_RESPIRATORY:
+        return 3
+    if symptoms & _SYM_FETAL_CONCERN:
+        return 4
+    if risk_index == 3:
+        return 5
+    if risk_index == 2 and symptoms & _SYM_MULTIPLE_CATEGORIES:
+        return 6
+    if risk_index == 2 and symptoms & _SYM_EDEMA:
+        return 7
+    if risk_index == 1 and symptoms & _SYM_TWO_OR_MORE:
+        return 8
+    return 0
+
+
+_RULE_TABLE = tuple(
+    _select_rule(risk_index, lab, symptoms)
+    for risk_index in range(4)
+    for lab in range(8)
+    for symptoms in range(64)
+)
+
+# Risk code produced by each rule number (rule 0 keeps the laboratory risk)
+_RULE_RISK_CODE = (0, 3, 3, 3, 3, 3, 3, 2, 2)
+
+
+# ── Cohort kernel ─────────────────────────────────────────────────────────────
+# Primary-concern priority for each kernel decision, indexed by decision code:
+# risk code * 8 + rank. The rank reproduces evaluate_visit's tie-break between
+# equally risky components (the lexicographically greater reason wins), e.g.
+# "Significant proteinuria" > "Severe hypertension" > "Severe anemia".
+_BP_PRIORITY = (0, 8, 17, 27, 25)           # Elevated BP / Severe / Persistent hypertension
+_HB_PRIORITY = (0, 8, 18, 26, 21)           # Moderate / Severe / Worsening anemia
+_PROTEINURIA_PRIORITY = (0, 8, 19, 28, 20)  # New / Significant / Persistent proteinuria
+
+
+@_jit_parallel
+def _assess_cohort(systolic, diastolic, hemoglobin, proteinuria, visit_count, lab_risk, lab_flags):
+    """Fill the primary lab risk code and _LAB_* flag of each VisitBatch patient."""
+    for i in _prange(visit_count.shape[0]):
+        count = visit_count[i]
+        if count == 0:
+            continue
+        
+        best = 0
+        flags = 0
+        
+        sys_now = systolic[i, 1]
+        dia_now = diastolic[i, 1]
+        if not (math.isnan(sys_now) or math.isnan(dia_now)):
+            sys_prev = 0.0
+            dia_prev = 0.0
+            if count >= 2:
+                if not math.isnan(systolic[i, 0]):
+                    sys_prev = systolic[i, 0]
+                if not math.isnan(diastolic[i, 0]):
+                    dia_prev = diastolic[i, 0]
+            best = _BP_PRIORITY[_bp_decision(sys_now, dia_now, sys_prev, dia_prev)]
+            flags = _LAB_BP
+        
+        hb_now = hemoglobin[i, 1]
+        if not math.isnan(hb_now):
+            hb_prev = 0.0
+            if count >= 2 and not math.isnan(hemoglobin[i, 0]):
+                hb_prev = hemoglobin[i, 0]
+            priority = _HB_PRIORITY[_hb_decision(hb_now, hb_prev)]
+            if priority > best:
+                best = priority
+                flags = _LAB_ANEMIA
+        
+        prev_code = proteinuria[i, 0] if count >= 2 else 0
+        priority = _PROTEINURIA_PRIORITY[_proteinuria_decision(proteinuria[i, 1], prev_code)]
+        if priority > best:
+            best = priority
+            flags = _LAB_PROTEINURIA
+        
+        lab_risk[i] = best >> 3
+        # A LOW finding has no reason text, so it carries no lab flags
+        if best >> 3 >= 2:
+            lab_flags[i] = flags
+
+
+class RiskResult(NamedTuple):
+    """Outcome of one component assessor; unpacks as (level, reason, visit)."""
+    level: str
+    reason: Optional[str]
+    visit: Optional[int]
+    
+    @property
+    def code(self) -> int:
+        """Ordering of the risk level (0 UNKNOWN .. 3 HIGH)."""
+        return _RISK_CODE[self.level]
+
+
+# Findings without a reason are shared rather than rebuilt per call
+_UNKNOWN_RESULT = RiskResult("UNKNOWN", None, None)
+_LOW_RESULT = RiskResult("LOW", None, None)
+
+
+@dataclass(slots=True)
+class RiskAssessment:
+    """
+    Result of SymptomRiskEngine.assess_visit().
+    
+    A flat, slotted record; to_dict() produces the nested dictionary layout
+    returned by evaluate_visit() for API and serialization callers.
+    """
+    risk_category: str
+    referral_required: bool
+    trigger_reason: str
+    trigger_visit: Optional[int]
+    timestamp: str
+    bp_risk: str
+    bp_reason: Optional[str]
+    bp_visit: Optional[int]
+    anemia_risk: str
+    anemia_reason: Optional[str]
+    anemia_visit: Optional[int]
+    proteinuria_risk: str
+    proteinuria_reason: Optional[str]
+    proteinuria_visit: Optional[int]
+    symptoms_present: int
+    visit_count: int
+    
+    def to_dict(self) -> Dict:
+        """Return the assessment as the evaluate_visit() dictionary."""
+        return {
+            'risk_category': self.risk_category,
+            'referral_required': self.referral_required,
+            'trigger_reason': self.trigger_reason,
+            'trigger_visit': self.trigger_visit,
+            'timestamp': self.timestamp,
+            'component_risks': {
+                'blood_pressure': {'risk': self.bp_risk, 'reason': self.bp_reason, 'visit': self.bp_visit},
+                'anemia': {'risk': self.anemia_risk, 'reason': self.anemia_reason, 'visit': self.anemia_visit},
+                'proteinuria': {'risk': self.proteinuria_risk, 'reason': self.proteinuria_reason, 'visit': self.proteinuria_visit}
+            },
+            'symptoms_present': self.symptoms_present,
+            'visit_count': self.visit_count
+        }
 
 
 class SymptomRiskEngine:
@@ -46,14 +409,15 @@ class SymptomRiskEngine:
     Safety-Critical: All decisions are deterministic and rule-based.
     """
     
-    # Clinical thresholds (evidence-based)
-    BP_HIGH_SBP = 140  # mmHg
-    BP_HIGH_DBP = 90   # mmHg
-    BP_SEVERE_SBP = 160  # mmHg
-    BP_SEVERE_DBP = 110  # mmHg
+    # Clinical thresholds (evidence-based); the decision kernels read the
+    # module-level copies
+    BP_HIGH_SBP = _BP_HIGH_SBP
+    BP_HIGH_DBP = _BP_HIGH_DBP
+    BP_SEVERE_SBP = _BP_SEVERE_SBP
+    BP_SEVERE_DBP = _BP_SEVERE_DBP
     
-    HB_MODERATE_ANEMIA = 9.0  # g/dL
-    HB_SEVERE_ANEMIA = 7.0    # g/dL
+    HB_MODERATE_ANEMIA = _HB_MODERATE_ANEMIA
+    HB_SEVERE_ANEMIA = _HB_SEVERE_ANEMIA
     
     PROTEINURIA_TRACE = 'trace'
     PROTEINURIA_POSITIVE_1 = '+1'
@@ -61,17 +425,18 @@ class SymptomRiskEngine:
     PROTEINURIA_POSITIVE_3 = '+3'
     PROTEINURIA_POSITIVE_4 = '+4'
     
-    def __init__(self, log_assessments: bool = True):
+    def __init__(self, log_assessments: bool = True, history_size: int = 10000):
         """
         Initialize risk engine.
         
         Args:
             log_assessments: Whether to maintain assessment history
+            history_size: Maximum assessments kept; the oldest are dropped first
         """
-        self.risk_history = [] if log_assessments else None
+        self.risk_history = deque(maxlen=history_size) if log_assessments else None
         logger.info("SymptomRiskEngine initialized")
     
-    def assess_bp_risk(self, visits: List[Dict]) -> Tuple[str, Optional[str], Optional[int]]:
+    def assess_bp_risk(self, visits: List[Dict]) -> RiskResult:
         """
         Assess blood pressure risk with temporal trend analysis.
         
@@ -79,129 +444,234 @@ class SymptomRiskEngine:
             visits: List of visit records with BP measurements
             
         Returns:
-            Tuple of (risk_level, reason, trigger_visit_index)
+            RiskResult of (risk_level, reason, trigger_visit_index)
             risk_level: 'LOW' | 'MODERATE' | 'HIGH' | 'UNKNOWN'
         """
         if not visits:
-            return "UNKNOWN", None, None
-        
-        latest_visit = visits[-1]
-        bp = latest_visit.get('bp', {})
-        systolic = bp.get('systolic')
-        diastolic = bp.get('diastolic')
+            return _UNKNOWN_RESULT
         
-        if systolic is None or diastolic is None:
-            logger.warning("BP data missing in latest visit")
-            return "UNKNOWN", None, None
+        return self._bp_result(visits[-1], visits[-2] if len(visits) >= 2 else None, len(visits) - 1)
+    
+    def assess_anemia_risk(self, visits: List[Dict]) -> RiskResult:
+        """
+        Assess hemoglobin risk with trend detection.
         
-        # Severe hypertension (immediate HIGH risk)
-        if systolic >= self.BP_SEVERE_SBP or diastolic >= self.BP_SEVERE_DBP:
-            reason = f"Severe hypertension: {systolic}/{diastolic} mmHg (≥160/110)"
-            logger.warning(f"SEVERE HYPERTENSION DETECTED: {reason}")
-            return "HIGH", reason, len(visits) - 1
-        
-        # Elevated BP (requires trend analysis)
-        if systolic >= self.BP_HIGH_SBP or diastolic >= self.BP_HIGH_DBP:
-            # Check for persistence across visits
-            if len(visits) >= 2:
-                prev_bp = visits[-2].get('bp', {})
-                prev_systolic = prev_bp.get('systolic')
-                prev_diastolic = prev_bp.get('diastolic')
-                
-                if prev_systolic and prev_diastolic:
-                    if prev_systolic >= self.BP_HIGH_SBP or prev_diastolic >= self.BP_HIGH_DBP:
-                        reason = f"Persistent hypertension: {systolic}/{diastolic} mmHg (2+ visits ≥140/90)"
-                        logger.warning(f"PERSISTENT HYPERTENSION: {reason}")
-                        return "HIGH", reason, len(visits) - 1
+        Args:
+            visits: List of visit records with Hb measurements
             
-            reason = f"Elevated BP: {systolic}/{diastolic} mmHg (≥140/90)"
-            return "MODERATE", reason, len(visits) - 1
+        Returns:
+            RiskResult of (risk_level, reason, trigger_visit_index)
+        """
+        if not visits:
+            return _UNKNOWN_RESULT
         
-        return "LOW", None, None
+        return self._anemia_result(visits[-1], visits[-2] if len(visits) >= 2 else None, len(visits) - 1)
     
-    def assess_anemia_risk(self, visits: List[Dict]) -> Tuple[str, Optional[str], Optional[int]]:
+    def assess_proteinuria_risk(self, visits: List[Dict]) -> RiskResult:
         """
-        Assess hemoglobin risk with trend detection.
+        Assess proteinuria risk with persistence detection.
         
         Args:
-            visits: List of visit records with Hb measurements
+            visits: List of visit records with proteinuria measurements
             
         Returns:
-            Tuple of (risk_level, reason, trigger_visit_index)
+            RiskResult of (risk_level, reason, trigger_visit_index)
         """
         if not visits:
-            return "UNKNOWN", None, None
+            return _UNKNOWN_RESULT
         
-        latest_visit = visits[-1]
+        return self._proteinuria_result(visits[-1], visits[-2] if len(visits) >= 2 else None, len(visits) - 1)
+    
+    def _bp_result(self, latest_visit: Dict, previous_visit: Optional[Dict], visit_index: int) -> RiskResult:
+        """assess_bp_risk on the latest and previous visit records."""
+        bp = latest_visit.get('bp', {})
+        systolic = bp.get('systolic')
+        diastolic = bp.get('diastolic')
+        
+        if systolic is None or diastolic is None:
+            logger.warning("BP data missing in latest visit")
+            return _UNKNOWN_RESULT
+        
+        sys_prev = dia_prev = 0
+        if previous_visit is not None:
+            prev_bp = previous_visit.get('bp') or {}
+            sys_prev = prev_bp.get('systolic') or 0
+            dia_prev = prev_bp.get('diastolic') or 0
+        
+        decision = _bp_decision(float(systolic), float(diastolic), float(sys_prev), float(dia_prev))
+        
+        # Severe hypertension (immediate HIGH risk)
+        if decision == _SEVERE:
+            reason = f"Severe hypertension: {systolic}/{diastolic} mmHg (≥160/110)"
+            logger.warning("SEVERE HYPERTENSION DETECTED: %s", reason)
+            return RiskResult("HIGH", reason, visit_index)
+        
+        # Elevated BP persisting across visits
+        if decision == _PERSISTENT:
+            reason = f"Persistent hypertension: {systolic}/{diastolic} mmHg (2+ visits ≥140/90)"
+            logger.warning("PERSISTENT HYPERTENSION: %s", reason)
+            return RiskResult("HIGH", reason, visit_index)
+        
+        if decision == _ELEVATED:
+            reason = f"Elevated BP: {systolic}/{diastolic} mmHg (≥140/90)"
+            return RiskResult("MODERATE", reason, visit_index)
+        
+        return _LOW_RESULT
+    
+    def _anemia_result(self, latest_visit: Dict, previous_visit: Optional[Dict], visit_index: int) -> RiskResult:
+        """assess_anemia_risk on the latest and previous visit records."""
         hb = latest_visit.get('hemoglobin')
         
         if hb is None:
             logger.debug("Hemoglobin data not available")
-            return "UNKNOWN", None, None
+            return _UNKNOWN_RESULT
+        
+        prev_hb = (previous_visit.get('hemoglobin') or 0) if previous_visit is not None else 0
+        decision = _hb_decision(float(hb), float(prev_hb))
         
         # Severe anemia
-        if hb < self.HB_SEVERE_ANEMIA:
+        if decision == _SEVERE:
             reason = f"Severe anemia: Hb {hb} g/dL (<7.0)"
-            logger.warning(f"SEVERE ANEMIA DETECTED: {reason}")
-            return "HIGH", reason, len(visits) - 1
-        
-        # Moderate anemia with trend analysis
-        if hb < self.HB_MODERATE_ANEMIA:
-            # Check for worsening trend
-            if len(visits) >= 2:
-                prev_hb = visits[-2].get('hemoglobin')
-                if prev_hb and prev_hb > hb:
-                    decline = prev_hb - hb
-                    reason = f"Worsening anemia: Hb {hb} g/dL (declined {decline:.1f} from previous visit)"
-                    logger.warning(f"DECLINING HEMOGLOBIN: {reason}")
-                    return "MODERATE", reason, len(visits) - 1
-            
+            logger.warning("SEVERE ANEMIA DETECTED: %s", reason)
+            return RiskResult("HIGH", reason, visit_index)
+        
+        # Moderate anemia, worsening since the previous visit
+        if decision == _PERSISTENT:
+            decline = prev_hb - hb
+            reason = f"Worsening anemia: Hb {hb} g/dL (declined {decline:.1f} from previous visit)"
+            logger.warning("DECLINING HEMOGLOBIN: %s", reason)
+            return RiskResult("MODERATE", reason, visit_index)
+        
+        if decision == _ELEVATED:
             reason = f"Moderate anemia: Hb {hb} g/dL (<9.0)"
-            return "MODERATE", reason, len(visits) - 1
+            return RiskResult("MODERATE", reason, visit_index)
+        
+        return _LOW_RESULT
+    
+    def _proteinuria_result(self, latest_visit: Dict, previous_visit: Optional[Dict], visit_index: int) -> RiskResult:
+        """assess_proteinuria_risk on the latest and previous visit records."""
+        now_code = _proteinuria_code(latest_visit.get('proteinuria', 'nil'))
+        prev_code = _proteinuria_code(previous_visit.get('proteinuria', 'nil')) if previous_visit is not None else 0
+        decision = _proteinuria_decision(now_code, prev_code)
+        proteinuria = _PROTEINURIA_NAMES[now_code]
+        
+        # Significant proteinuria
+        if decision == _SEVERE:
+            reason = f"Significant proteinuria: {proteinuria}"
+            logger.warning("SIGNIFICANT PROTEINURIA: %s", reason)
+            return RiskResult("HIGH", reason, visit_index)
+        
+        # Mild proteinuria seen on consecutive visits
+        if decision == _PERSISTENT:
+            reason = f"Persistent proteinuria: {proteinuria} (2+ visits)"
+            logger.info("PERSISTENT PROTEINURIA: %s", reason)
+            return RiskResult("MODERATE", reason, visit_index)
         
-        return "LOW", None, None
+        if decision == _ELEVATED:
+            reason = f"New proteinuria detected: {proteinuria}"
+            return RiskResult("MODERATE", reason, visit_index)
+        
+        return _LOW_RESULT
     
-    def assess_proteinuria_risk(self, visits: List[Dict]) -> Tuple[str, Optional[str], Optional[int]]:
+    def assess_bp_risk_batch(self, batch: VisitBatch):
         """
-        Assess proteinuria risk with persistence detection.
+        Vectorised assess_bp_risk over a VisitBatch.
         
-        Args:
-            visits: List of visit records with proteinuria measurements
-            
         Returns:
-            Tuple of (risk_level, reason, trigger_visit_index)
+            int8 array of _RISK_CODE values (0 UNKNOWN .. 3 HIGH)
         """
-        if not visits:
-            return "UNKNOWN", None, None
+        import numpy as np
+        
+        sys_now, sys_prev = batch.systolic[:, 1], batch.systolic[:, 0]
+        dia_now, dia_prev = batch.diastolic[:, 1], batch.diastolic[:, 0]
+        
+        recorded = ~np.isnan(sys_now) & ~np.isnan(dia_now)
+        severe = (sys_now >= self.BP_SEVERE_SBP) | (dia_now >= self.BP_SEVERE_DBP)
+        elevated = (sys_now >= self.BP_HIGH_SBP) | (dia_now >= self.BP_HIGH_DBP)
+        # Previous reading must be present and non-zero, as in assess_bp_risk
+        prev_recorded = (batch.visit_count >= 2) & (np.nan_to_num(sys_prev) != 0) & (np.nan_to_num(dia_prev) != 0)
+        persistent = elevated & prev_recorded & (
+            (sys_prev >= self.BP_HIGH_SBP) | (dia_prev >= self.BP_HIGH_DBP)
+        )
         
-        latest_visit = visits[-1]
-        proteinuria = latest_visit.get('proteinuria', 'nil').lower()
+        codes = np.select([severe | persistent, elevated], [3, 2], 1).astype(np.int8)
+        codes[~recorded] = 0
+        return codes
+    
+    def assess_anemia_risk_batch(self, batch: VisitBatch):
+        """Vectorised assess_anemia_risk; returns int8 _RISK_CODE values."""
+        import numpy as np
+        
+        hb = batch.hemoglobin[:, 1]
+        codes = np.select(
+            [hb < self.HB_SEVERE_ANEMIA, hb < self.HB_MODERATE_ANEMIA], [3, 2], 1
+        ).astype(np.int8)
+        codes[np.isnan(hb)] = 0
+        return codes
+    
+    def assess_proteinuria_risk_batch(self, batch: VisitBatch):
+        """Vectorised assess_proteinuria_risk; returns int8 _RISK_CODE values."""
+        import numpy as np
+        
+        code = batch.proteinuria[:, 1]
+        codes = np.select(
+            [code >= _PROTEINURIA_SIGNIFICANT, code >= 1], [3, 2], 1
+        ).astype(np.int8)
+        codes[batch.visit_count == 0] = 0
+        return codes
+    
+    def evaluate_cohort(self, patients: List[List[Dict]], symptoms: Optional[List[Optional[Dict]]] = None):
+        """
+        Final risk category for many patients at once, for population triage.
         
-        # Significant proteinuria
-        if proteinuria in ['+2', '+3', '+4']:
-            reason = f"Significant proteinuria: {proteinuria}"
-            logger.warning(f"SIGNIFICANT PROTEINURIA: {reason}")
-            return "HIGH", reason, len(visits) - 1
-        
-        # Mild proteinuria with persistence check
-        if proteinuria in ['+1', 'trace']:
-            if len(visits) >= 2:
-                prev_proteinuria = visits[-2].get('proteinuria', 'nil').lower()
-                if prev_proteinuria in ['+1', '+2', '+3', '+4', 'trace']:
-                    reason = f"Persistent proteinuria: {proteinuria} (2+ visits)"
-                    logger.info(f"PERSISTENT PROTEINURIA: {reason}")
-                    return "MODERATE", reason, len(visits) - 1
+        Lab thresholds run in a parallel numba kernel over a VisitBatch; the
+        escalation rules are then applied as a vectorised _RULE_TABLE lookup.
+        Matches evaluate_visit()'s risk_category per patient, without building
+        reasons or recording history.
+        
+        Args:
+            patients: Per-patient visit lists (oldest to newest)
+            symptoms: Optional per-patient symptom records for the latest
+                visit; otherwise each latest visit's 'symptoms' entry is used
             
-            reason = f"New proteinuria detected: {proteinuria}"
-            return "MODERATE", reason, len(visits) - 1
+        Returns:
+            int8 array of _RISK_CODE values (0 UNKNOWN .. 3 HIGH); referral is
+            required exactly where the code is 3
+        """
+        import numpy as np
+        
+        batch = VisitBatch.from_visits(patients)
+        lab_risk = np.zeros(len(patients), dtype=np.int8)
+        lab_flags = np.zeros(len(patients), dtype=np.int8)
+        _assess_cohort(
+            batch.systolic, batch.diastolic, batch.hemoglobin, batch.proteinuria, batch.visit_count,
+            lab_risk, lab_flags
+        )
         
-        return "LOW", None, None
+        # Symptom flags per patient; -1 where no symptoms were reported
+        symptom_flags = np.full(len(patients), -1, dtype=np.int16)
+        for i, visits in enumerate(patients):
+            record = symptoms[i] if symptoms is not None else None
+            if not record and visits and visits[-1].get('symptoms'):
+                record = visits[-1]['symptoms']
+            if record and record.get('symptom_count', 0) != 0:
+                symptom_flags[i] = _symptom_flags(record, record.get('present_symptoms', []))
+        
+        reported = symptom_flags >= 0
+        keys = lab_risk.astype(np.int16) << 9 | lab_flags.astype(np.int16) << 6 | np.where(reported, symptom_flags, 0)
+        rules = np.asarray(_RULE_TABLE, dtype=np.int8)[keys]
+        escalated = np.asarray(_RULE_RISK_CODE, dtype=np.int8)[rules]
+        
+        codes = np.where(reported & (rules != 0), escalated, lab_risk).astype(np.int8)
+        codes[batch.visit_count == 0] = 0
+        return codes
     
     def combine_with_symptoms(self, 
                               lab_risk: str, 
                               lab_reason: Optional[str], 
                               symptom_data: Optional[Dict], 
-                              visit_index: Optional[int]) -> Tuple[str, str, bool]:
+                              visit_index: Optional[int],
+                              lab_category: Optional[int] = None) -> Tuple[str, str, bool]:
         """
         Apply evidence-based escalation rules combining lab + symptom data.
         
@@ -212,6 +682,9 @@ class SymptomRiskEngine:
             lab_reason: Laboratory risk explanation
             symptom_data: Structured symptom record from SymptomIntake
             visit_index: Index of triggering visit
+            lab_category: _LAB_BP / _LAB_ANEMIA / _LAB_PROTEINURIA for the
+                assessor that produced lab_reason (0 when there is no reason);
+                when omitted it is inferred from the reason text
             
         Returns:
             Tuple of (final_risk_level, combined_reason, referral_required)
@@ -221,82 +694,68 @@ class SymptomRiskEngine:
             referral = lab_risk == "HIGH"
             return lab_risk, lab_reason or "No clinical abnormalities detected", referral
         
-        # Extract symptom flags
-        has_neuro = symptom_data.get('has_neurological', False)
-        has_edema = symptom_data.get('has_edema', False)
-        has_respiratory = symptom_data.get('has_respiratory', False)
-        has_fetal_concern = symptom_data.get('has_fetal_concern', False)
-        has_gi = symptom_data.get('has_gi', False)
-        multiple_categories = symptom_data.get('multiple_categories', False)
-        
         present_symptoms = symptom_data.get('present_symptoms', [])
         categories = symptom_data.get('categories', {})
         
         # EVIDENCE-BASED ESCALATION RULES
+        # The firing rule is looked up in _RULE_TABLE (built from
+        # _select_rule at import); the branches below only format its outcome.
+        lab_flags = _lab_flags(lab_reason) if lab_category is None else lab_category
+        rule = _RULE_TABLE[_rule_key(lab_risk, lab_flags, symptom_data, present_symptoms)]
         
         # RULE 1: BP elevation + Neurological symptoms → HIGH (Preeclampsia)
-        if lab_risk in ["MODERATE", "HIGH"]:
-            if "bp" in (lab_reason or "").lower() or "hypertension" in (lab_reason or "").lower():
-                if has_neuro:
-                    neuro_list = ', '.join(_label(s) for s in categories.get('neurological', []))
-                    reason = f"{lab_reason} WITH neurological symptoms ({neuro_list}) - PREECLAMPSIA SUSPECTED"
-                    logger.critical(f"ESCALATION RULE 1: {reason}")
-                    return "HIGH", reason, True
-        
         # RULE 2: Proteinuria + Visual/Neurological → HIGH (Preeclampsia)
-        if "proteinuria" in (lab_reason or "").lower():
-            if has_neuro:
-                neuro_list = ', '.join(_label(s) for s in categories.get('neurological', []))
-                reason = f"{lab_reason} WITH neurological symptoms ({neuro_list}) - PREECLAMPSIA SUSPECTED"
-                logger.critical(f"ESCALATION RULE 2: {reason}")
-                return "HIGH", reason, True
+        if rule == 1 or rule == 2:
+            neuro_list = _join_labels(categories.get('neurological', []))
+            reason = f"{lab_reason} WITH neurological symptoms ({neuro_list}) - PREECLAMPSIA SUSPECTED"
+            logger.critical("ESCALATION RULE %d: %s", rule, reason)
+            return "HIGH", reason, True
         
         # RULE 3: Anemia + Respiratory symptoms → HIGH (Cardiopulmonary)
-        if lab_risk in ["MODERATE", "HIGH"]:
-            if "anemia" in (lab_reason or "").lower() and has_respiratory:
-                reason = f"{lab_reason} WITH breathlessness - CARDIOPULMONARY COMPROMISE SUSPECTED"
-                logger.critical(f"ESCALATION RULE 3: {reason}")
-                return "HIGH", reason, True
+        if rule == 3:
+            reason = f"{lab_reason} WITH breathlessness - CARDIOPULMONARY COMPROMISE SUSPECTED"
+            logger.critical("ESCALATION RULE 3: %s", reason)
+            return "HIGH", reason, True
         
         # RULE 4: Fetal concern symptoms → Always HIGH (Urgent assessment)
-        if has_fetal_concern:
+        if rule == 4:
             reason = "Reduced fetal movement reported - URGENT FETAL ASSESSMENT REQUIRED"
-            logger.critical(f"ESCALATION RULE 4: {reason}")
+            logger.critical("ESCALATION RULE 4: %s", reason)
             return "HIGH", reason, True
         
         # RULE 5: HIGH lab + Any symptoms → HIGH (Compounded risk)
-        if lab_risk == "HIGH":
-            symptom_list = ', '.join(_label(s) for s in present_symptoms[:3])
+        if rule == 5:
+            symptom_list = _join_labels(islice(present_symptoms, 3))
             if len(present_symptoms) > 3:
                 symptom_list += f" (+{len(present_symptoms)-3} more)"
             reason = f"{lab_reason} WITH symptoms ({symptom_list})"
-            logger.critical(f"ESCALATION RULE 5: {reason}")
+            logger.critical("ESCALATION RULE 5: %s", reason)
             return "HIGH", reason, True
         
         # RULE 6: MODERATE lab + Multiple symptom categories → HIGH
-        if lab_risk == "MODERATE" and multiple_categories:
-            symptom_list = ', '.join(_label(s) for s in present_symptoms)
+        if rule == 6:
+            symptom_list = _join_labels(present_symptoms)
             reason = f"{lab_reason} WITH multiple symptom categories ({symptom_list})"
-            logger.warning(f"ESCALATION RULE 6: {reason}")
+            logger.warning("ESCALATION RULE 6: %s", reason)
             return "HIGH", reason, True
         
         # RULE 7: MODERATE lab + Edema → Maintain MODERATE with note
-        if lab_risk == "MODERATE" and has_edema:
-            edema_list = ', '.join(_label(s) for s in categories.get('edema', []))
+        if rule == 7:
+            edema_list = _join_labels(categories.get('edema', []))
             reason = f"{lab_reason} with edema ({edema_list})"
             return "MODERATE", reason, False
         
         # RULE 8: LOW lab + Multiple symptoms → MODERATE (Clinical concern)
-        if lab_risk == "LOW" and len(present_symptoms) >= 2:
-            symptom_list = ', '.join(_label(s) for s in present_symptoms)
+        if rule == 8:
+            symptom_list = _join_labels(present_symptoms)
             reason = f"Multiple symptoms present ({symptom_list}) despite normal laboratory values"
-            logger.info(f"ESCALATION RULE 8: {reason}")
+            logger.info("ESCALATION RULE 8: %s", reason)
             return "MODERATE", reason, False
         
         # Default: Maintain laboratory risk level
         referral = lab_risk == "HIGH"
         if present_symptoms:
-            symptom_labels = ', '.join(_label(s) for s in present_symptoms)
+            symptom_labels = _join_labels(present_symptoms)
             count          = len(present_symptoms)
             symptom_note   = (
                 f"Single symptom reported: {symptom_labels}. No critical combinations detected."
@@ -326,66 +785,94 @@ class SymptomRiskEngine:
                 'referral_required': False,
                 'trigger_reason': 'No visit data available',
                 'trigger_visit': None,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _iso_now(),
                 'component_risks': {}
             }
         
-        logger.info(f"Evaluating {len(visits)} visits with temporal reasoning")
+        return self.assess_visit(visits, current_visit_symptoms).to_dict()
+    
+    def assess_visit(self, 
+                     visits: List[Dict], 
+                     current_visit_symptoms: Optional[Dict] = None) -> RiskAssessment:
+        """
+        Comprehensive temporal risk assessment as a RiskAssessment record.
         
-        # Assess individual risk components
-        bp_risk, bp_reason, bp_visit = self.assess_bp_risk(visits)
-        anemia_risk, anemia_reason, anemia_visit = self.assess_anemia_risk(visits)
-        proteinuria_risk, proteinuria_reason, proteinuria_visit = self.assess_proteinuria_risk(visits)
+        Same evaluation as evaluate_visit() without building the nested
+        dictionary; visits must be non-empty.
         
-        # Determine primary laboratory concern
-        risk_levels = {'HIGH': 3, 'MODERATE': 2, 'LOW': 1, 'UNKNOWN': 0}
+        Args:
+            visits: List of visit records (oldest to newest)
+            current_visit_symptoms: Symptom record for latest visit
+            
+        Returns:
+            RiskAssessment with decision rationale
+        """
+        logger.info("Evaluating %d visits with temporal reasoning", len(visits))
         
-        primary_risk = max([
-            (risk_levels[bp_risk], bp_risk, bp_reason, bp_visit),
-            (risk_levels[anemia_risk], anemia_risk, anemia_reason, anemia_visit),
-            (risk_levels[proteinuria_risk], proteinuria_risk, proteinuria_reason, proteinuria_visit)
-        ])
+        latest_visit = visits[-1]
+        if 'bp' not in latest_visit and 'hemoglobin' not in latest_visit and 'proteinuria' not in latest_visit:
+            # No laboratory values at all (e.g. first-visit intake): BP and Hb
+            # are unknown and proteinuria reads as nil, so LOW with no reason
+            logger.warning("BP data missing in latest visit")
+            bp = anemia = _UNKNOWN_RESULT
+            proteinuria = primary = _LOW_RESULT
+            lab_category = 0
+        else:
+            # Assess individual risk components on the shared visit records
+            previous_visit = visits[-2] if len(visits) >= 2 else None
+            visit_index = len(visits) - 1
+            bp = self._bp_result(latest_visit, previous_visit, visit_index)
+            anemia = self._anemia_result(latest_visit, previous_visit, visit_index)
+            proteinuria = self._proteinuria_result(latest_visit, previous_visit, visit_index)
+            
+            # Determine primary laboratory concern: highest risk code wins; on a
+            # tie between two reported findings the lexicographically greater
+            # reason wins, as the original max() over (code, risk, reason) did.
+            primary, lab_code, lab_category = bp, bp.code, _LAB_BP
+            
+            code = anemia.code
+            if code > lab_code or (code == lab_code and anemia.reason and anemia.reason > primary.reason):
+                primary, lab_code, lab_category = anemia, code, _LAB_ANEMIA
+            
+            code = proteinuria.code
+            if code > lab_code or (code == lab_code and proteinuria.reason and proteinuria.reason > primary.reason):
+                primary, lab_category = proteinuria, _LAB_PROTEINURIA
+            
+            if not primary.reason:
+                lab_category = 0
         
-        lab_risk = primary_risk[1]
-        lab_reason = primary_risk[2]
-        trigger_visit = primary_risk[3]
+        lab_risk, lab_reason, trigger_visit = primary
         
         # Get symptoms for latest visit
         latest_symptoms = current_visit_symptoms
-        if not latest_symptoms and visits[-1].get('symptoms'):
-            latest_symptoms = visits[-1]['symptoms']
+        if not latest_symptoms and latest_visit.get('symptoms'):
+            latest_symptoms = latest_visit['symptoms']
         
         # Apply symptom-aware escalation rules
         final_risk, combined_reason, referral_required = self.combine_with_symptoms(
-            lab_risk, lab_reason, latest_symptoms, trigger_visit
+            lab_risk, lab_reason, latest_symptoms, trigger_visit, lab_category
         )
         
         # Construct comprehensive assessment
-        assessment = {
-            'risk_category': final_risk,
-            'referral_required': referral_required,
-            'trigger_reason': combined_reason,
-            'trigger_visit': trigger_visit,
-            'timestamp': datetime.now().isoformat(),
-            'component_risks': {
-                'blood_pressure': {'risk': bp_risk, 'reason': bp_reason, 'visit': bp_visit},
-                'anemia': {'risk': anemia_risk, 'reason': anemia_reason, 'visit': anemia_visit},
-                'proteinuria': {'risk': proteinuria_risk, 'reason': proteinuria_reason, 'visit': proteinuria_visit}
-            },
-            'symptoms_present': latest_symptoms.get('symptom_count', 0) if latest_symptoms else 0,
-            'visit_count': len(visits)
-        }
+        assessment = RiskAssessment(
+            final_risk, referral_required, combined_reason, trigger_visit, _iso_now(),
+            *bp, *anemia, *proteinuria,
+            latest_symptoms.get('symptom_count', 0) if latest_symptoms else 0,
+            len(visits)
+        )
         
         # Log assessment history if enabled
         if self.risk_history is not None:
             self.risk_history.append(assessment)
         
-        logger.info(f"Assessment complete: {final_risk} risk, referral={'YES' if referral_required else 'NO'}")
+        logger.info("Assessment complete: %s risk, referral=%s", final_risk, 'YES' if referral_required else 'NO')
         return assessment
     
     def get_assessment_history(self) -> List[Dict]:
-        """Return all stored risk assessments"""
-        return self.risk_history if self.risk_history is not None else []
+        """Return the stored risk assessments, oldest first"""
+        if self.risk_history is None:
+            return []
+        return [assessment.to_dict() for assessment in self.risk_history]
     
     def clear_history(self) -> None:
         """Clear assessment history"""
@@ -6,11 +6,258 @@ Version: 1.0.0
 Date: 2026-02-04
 """
 
-from typing import Dict, List, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import logging
+import math
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Thresholds for significant first-to-last changes
+_BP_SYS_THRESH = 10         # mmHg
+_BP_DIA_THRESH = 5          # mmHg
+_HB_THRESH = 0.8            # g/dL
+_PLT_THRESH = 30000         # per uL
+_WEIGHT_THRESH = 2.0        # kg
+_WBC_RISE_THRESH = 5000     # per uL, rises only
+
+# Severity suffixes, bucketed by bisecting the latest value into the
+# thresholds: bisect_right for "< limit" / ">= limit" bands, bisect_left for
+# "> limit" bands
+_BP_SEVERITY_LIMITS = (140, 160)                # systolic, >=
+_BP_SEVERITY = ("", " (hypertensive range)", " (severe hypertension range)")
+_HB_SEVERITY_LIMITS = (7.0, 9.0, 11.0)          # <
+_HB_SEVERITY = (
+    " (critical anemia - transfusion may be required)",
+    " (severe anemia)",
+    " (moderate anemia)",
+    "",
+)
+_PLT_SEVERITY_LIMITS = (50000, 100000, 150000)  # <
+_PLT_SEVERITY = (
+    " (critical - HELLP syndrome risk)",
+    " (severe thrombocytopenia)",
+    " (mild thrombocytopenia)",
+    "",
+)
+_WEIGHT_GAIN_LIMITS = (3.0, 4.0)                # kg gained, >=
+_WEIGHT_SEVERITY = ("", " (rapid gain - monitor for edema)", " (excessive - possible fluid retention)")
+_WBC_SEVERITY_LIMITS = (15000, 20000)           # >
+_WBC_SEVERITY = ("", " (leukocytosis - infection suspected)", " (severe leukocytosis - sepsis concern)")
+# Full highlight sentences per severity bucket, so the analyzers only fill in
+# the numbers; "%" formats are used where the spec allows (fastest), while
+# thousands separators need str.format
+_HB_DECLINE_TEMPLATES = tuple(
+    "Hemoglobin declined from %.1f to %.1f g/dL (loss of %.1f g/dL)" + suffix for suffix in _HB_SEVERITY
+)
+_PLT_DECLINE_TEMPLATES = tuple(
+    "Platelet count declined from {:,} to {:,} per uL (drop of {:,})" + suffix for suffix in _PLT_SEVERITY
+)
+_WEIGHT_GAIN_TEMPLATES = tuple(
+    "Rapid weight gain: %.1f to %.1f kg (gained %.1f kg)" + suffix for suffix in _WEIGHT_SEVERITY
+)
+_WBC_RISE_TEMPLATES = tuple(
+    "White blood cell count increased from {:,} to {:,} per uL" + suffix for suffix in _WBC_SEVERITY
+)
+# Indexed directly by the latest proteinuria score (0-4)
+_PROTEIN_TREND_SEVERITY = (
+    "",
+    "",
+    " (mild proteinuria - monitor for preeclampsia)",
+    " (significant proteinuria - preeclampsia concern)",
+    " (severe proteinuria - preeclampsia highly likely)",
+)
+
+# Dipstick proteinuria readings mapped to severity scores; unlisted readings score 0
+_PROTEIN_SEVERITY = {
+    'nil': 0, 'negative': 0, 'trace': 1,
+    '+1': 2, '+': 2, '1+': 2,
+    '+2': 3, '++': 3, '2+': 3,
+    '+3': 4, '+++': 4, '3+': 4
+}
+
+
+# Symptom-onset categories in reporting order: (symptom record flag, label)
+_ONSET_CATEGORIES = (
+    ('has_neurological', 'neurological symptoms'),
+    ('has_respiratory', 'respiratory symptoms'),
+    ('has_fetal_concern', 'fetal concerns'),
+    ('has_gi', 'gastrointestinal symptoms'),
+)
+
+# Symptom name -> (index into _ONSET_CATEGORIES, display label)
+_SYMPTOM_CATEGORY = {
+    name: (index, name.replace('_', ' '))
+    for index, names in enumerate((
+        ('headache', 'blurred_vision', 'visual_disturbance', 'dizziness'),
+        ('breathlessness', 'chest_pain'),
+        ('reduced_fetal_movement', 'absent_fetal_movement'),
+        ('nausea_vomiting', 'abdominal_pain', 'epigastric_pain'),
+    ))
+    for name in names
+}
+
+
+def _protein_score(reading) -> int:
+    """Severity score of a proteinuria reading (case-insensitive)."""
+    if isinstance(reading, str):
+        # Readings are usually already lower-case; only lower() on a miss
+        score = _PROTEIN_SEVERITY.get(reading)
+        return score if score is not None else _PROTEIN_SEVERITY.get(reading.lower(), 0)
+    return _PROTEIN_SEVERITY.get(str(reading), 0)
+
+
+class _VisitSeries(NamedTuple):
+    """Recorded values of each trended parameter, in visit order."""
+    bp: List[Tuple]         # (systolic, diastolic) where both are recorded
+    hemoglobin: List
+    platelets: List
+    proteinuria: List
+    weight: List
+    wbc: List
+    bp_systolic: List       # systolic of every visit with BP, for severity scoring
+
+# Leading _VisitSeries fields that have a trend analyzer
+_TRENDED_FIELDS = 6
+
+
+def _extract_series(visits: List[Dict]) -> _VisitSeries:
+    """Collect every trended parameter in a single pass over the visits."""
+    bp_values = []
+    hb_values = []
+    plt_values = []
+    protein_values = []
+    weight_values = []
+    wbc_values = []
+    bp_sys_values = []
+    
+    for v in visits:
+        get = v.get
+        bp = get('bp')
+        if bp:
+            sys = bp.get('systolic')
+            dia = bp.get('diastolic')
+            bp_sys_values.append(sys)
+            if sys is not None and dia is not None:
+                bp_values.append((sys, dia))
+        value = get('hemoglobin')
+        if value is not None:
+            hb_values.append(value)
+        value = get('platelets')
+        if value is not None:
+            plt_values.append(value)
+        value = get('proteinuria')
+        if value is not None:
+            protein_values.append(value)
+        value = get('weight')
+        if value is not None:
+            weight_values.append(value)
+        value = get('wbc')
+        if value is not None:
+            wbc_values.append(value)
+    
+    return _VisitSeries(bp_values, hb_values, plt_values, protein_values, weight_values, wbc_values, bp_sys_values)
+
+
+# ── Batch numeric core ────────────────────────────────────────────────────────
+# ends has shape (patients, _TRENDED_FIELDS, 2): first and last reading of each
+# trended series, NaN when a patient has fewer than two readings. Fills
+# trending[i, j] when analyzer j can fire for patient i.
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True, error_model='numpy')
+    def _trend_flags(ends, trending):
+        for i in range(ends.shape[0]):
+            trending[i, 0] = abs(ends[i, 0, 1] - ends[i, 0, 0]) >= _BP_SYS_THRESH
+            trending[i, 1] = abs(ends[i, 1, 1] - ends[i, 1, 0]) >= _HB_THRESH
+            trending[i, 2] = abs(ends[i, 2, 1] - ends[i, 2, 0]) >= _PLT_THRESH
+            trending[i, 3] = not math.isnan(ends[i, 3, 0])
+            trending[i, 4] = ends[i, 4, 1] - ends[i, 4, 0] >= _WEIGHT_THRESH
+            trending[i, 5] = ends[i, 5, 1] - ends[i, 5, 0] > _WBC_RISE_THRESH
+else:
+    def _trend_flags(ends, trending):
+        import numpy as np
+        
+        change = ends[:, :, 1] - ends[:, :, 0]
+        trending[:, 0] = np.abs(change[:, 0]) >= _BP_SYS_THRESH
+        trending[:, 1] = np.abs(change[:, 1]) >= _HB_THRESH
+        trending[:, 2] = np.abs(change[:, 2]) >= _PLT_THRESH
+        trending[:, 3] = ~np.isnan(change[:, 3])
+        trending[:, 4] = change[:, 4] >= _WEIGHT_THRESH
+        trending[:, 5] = change[:, 5] > _WBC_RISE_THRESH
+
+
+def _value_ends(visits: List[Dict], key: str) -> Tuple:
+    """First and last recorded value of a visit field, or () with fewer than two."""
+    n = len(visits)
+    for i in range(n):
+        first = visits[i].get(key)
+        if first is not None:
+            break
+    else:
+        return ()
+    for j in range(n - 1, i, -1):
+        last = visits[j].get(key)
+        if last is not None:
+            return (first, last)
+    return ()
+
+
+def _systolic_ends(visits: List[Dict]) -> Tuple:
+    """First and last systolic reading among visits with BP, or () with fewer than two."""
+    n = len(visits)
+    for i in range(n):
+        first = visits[i].get('bp')
+        if first:
+            break
+    else:
+        return ()
+    for j in range(n - 1, i, -1):
+        last = visits[j].get('bp')
+        if last:
+            return (first.get('systolic'), last.get('systolic'))
+    return ()
+
+
+def _both(first, last) -> Tuple:
+    return (first, last) if first is not None and last is not None else ()
+
+
+def _extract_pair(first: Dict, last: Dict) -> _VisitSeries:
+    """
+    _extract_series for the common two-visit timeline.
+    
+    Reads each parameter straight from the two visits. A parameter missing
+    from either visit gets an empty series, which the analyzers treat the
+    same as a single reading (no trend).
+    """
+    bp = bp_systolic = ()
+    bp_first = first.get('bp')
+    bp_last = last.get('bp')
+    if bp_first and bp_last:
+        sys_first, dia_first = bp_first.get('systolic'), bp_first.get('diastolic')
+        sys_last, dia_last = bp_last.get('systolic'), bp_last.get('diastolic')
+        bp_systolic = (sys_first, sys_last)
+        if sys_first is not None and dia_first is not None and sys_last is not None and dia_last is not None:
+            bp = ((sys_first, dia_first), (sys_last, dia_last))
+    
+    return _VisitSeries(
+        bp,
+        _both(first.get('hemoglobin'), last.get('hemoglobin')),
+        _both(first.get('platelets'), last.get('platelets')),
+        _both(first.get('proteinuria'), last.get('proteinuria')),
+        _both(first.get('weight'), last.get('weight')),
+        _both(first.get('wbc'), last.get('wbc')),
+        bp_systolic,
+    )
+
 
 class TemporalHighlightGenerator:
     """
@@ -26,13 +273,17 @@ class TemporalHighlightGenerator:
         - Highlights concerning patterns
     """
     
-    # Thresholds for significant changes
+    # Stateless: instances carry no attributes of their own
+    __slots__ = ()
+    
+    # Thresholds for significant changes (kept for external readers; the
+    # analyzers use the module-level constants)
     SIGNIFICANT_CHANGES = {
-        'bp_systolic': 10,      # mmHg
-        'bp_diastolic': 5,      # mmHg
-        'hemoglobin': 0.8,      # g/dL
-        'platelets': 30000,     # per uL
-        'weight': 2.0           # kg
+        'bp_systolic': _BP_SYS_THRESH,
+        'bp_diastolic': _BP_DIA_THRESH,
+        'hemoglobin': _HB_THRESH,
+        'platelets': _PLT_THRESH,
+        'weight': _WEIGHT_THRESH
     }
     
     def __init__(self):
@@ -55,63 +306,136 @@ class TemporalHighlightGenerator:
         if len(visits) < 2:
             return self._single_visit_message()
         
-        highlights = []
-        
-        # Analyze each parameter for trends
-        bp_highlight = self._analyze_bp_trend(visits)
-        if bp_highlight:
-            highlights.append(bp_highlight)
-        
-        hb_highlight = self._analyze_hemoglobin_trend(visits)
-        if hb_highlight:
-            highlights.append(hb_highlight)
+        return self._highlight(visits, self._series(visits), symptoms)
+    
+    def analyze(self,
+                visits: List[Dict],
+                symptoms: Optional[Dict] = None) -> Tuple[str, str]:
+        """
+        Temporal highlight and trend severity from a single pass over visits.
         
-        plt_highlight = self._analyze_platelet_trend(visits)
-        if plt_highlight:
-            highlights.append(plt_highlight)
+        Args:
+            visits: List of visit records in chronological order
+            symptoms: Current symptom data
+            
+        Returns:
+            Tuple of (generate_highlight() string, get_trend_severity() level)
+        """
+        if len(visits) < 2:
+            return self._single_visit_message(), "insufficient_data"
         
-        protein_highlight = self._analyze_proteinuria_trend(visits)
-        if protein_highlight:
-            highlights.append(protein_highlight)
+        series = self._series(visits)
+        severity = self._trend_severity(series.bp_systolic, series.hemoglobin, series.platelets)
+        return self._highlight(visits, series, symptoms), severity
+    
+    def _series(self, visits: List[Dict]) -> _VisitSeries:
+        """Extract the parameter series of a timeline with at least two visits."""
+        if len(visits) == 2:
+            return _extract_pair(visits[0], visits[1])
+        return _extract_series(visits)
+    
+    def _highlight(self, visits: List[Dict], series: _VisitSeries, symptoms: Optional[Dict]) -> str:
+        """Build the highlight string from extracted series."""
+        # Analyze each parameter for trends, then symptom onset; keep the
+        # ones that produced a highlight
+        highlights = [highlight for highlight in (
+            self._analyze_bp_trend(series.bp),
+            self._analyze_hemoglobin_trend(series.hemoglobin),
+            self._analyze_platelet_trend(series.platelets),
+            self._analyze_proteinuria_trend(series.proteinuria),
+            self._analyze_weight_trend(series.weight),
+            self._analyze_wbc_trend(series.wbc),
+            self._analyze_symptom_onset(symptoms),
+        ) if highlight]
         
-        weight_highlight = self._analyze_weight_trend(visits)
-        if weight_highlight:
-            highlights.append(weight_highlight)
+        # Construct final highlight
+        return self._construct_highlight(highlights, visits)
+    
+    def generate_highlights(self,
+                           timelines: List[List[Dict]],
+                           symptoms: Optional[List[Optional[Dict]]] = None) -> List[str]:
+        """
+        Vectorised generate_highlight over many patients' visit timelines.
         
-        wbc_highlight = self._analyze_wbc_trend(visits)
-        if wbc_highlight:
-            highlights.append(wbc_highlight)
+        The first-to-last change of every numeric series is checked for all
+        patients at once (numba-compiled when available, NumPy otherwise);
+        analyzers (and their string formatting) only run for the parameters
+        whose threshold actually trips.
         
-        # Add symptom onset information
-        symptom_highlight = self._analyze_symptom_onset(symptoms)
-        if symptom_highlight:
-            highlights.append(symptom_highlight)
+        Args:
+            timelines: Per-patient visit lists in chronological order
+            symptoms: Optional per-patient symptom data, aligned with timelines
+            
+        Returns:
+            One highlight string per patient, as generate_highlight returns
+        """
+        import numpy as np
+        
+        n = len(timelines)
+        all_series = [_extract_series(visits) for visits in timelines]
+        
+        # First and last value per patient and _VisitSeries field (NaN when
+        # fewer than two readings); BP is tracked by its systolic value and
+        # proteinuria only needs to be present, its scoring stays per patient
+        ends = np.full((n, _TRENDED_FIELDS, 2), np.nan)
+        for i, series in enumerate(all_series):
+            for j in range(_TRENDED_FIELDS):
+                values = series[j]
+                if len(values) >= 2:
+                    if j == 0:
+                        ends[i, j] = values[0][0], values[-1][0]
+                    elif j == 3:
+                        ends[i, j] = 0.0
+                    else:
+                        ends[i, j] = values[0], values[-1]
+        
+        trending = np.empty((n, _TRENDED_FIELDS), dtype=bool)
+        _trend_flags(ends, trending)
+        
+        analyzers = (
+            self._analyze_bp_trend,
+            self._analyze_hemoglobin_trend,
+            self._analyze_platelet_trend,
+            self._analyze_proteinuria_trend,
+            self._analyze_weight_trend,
+            self._analyze_wbc_trend,
+        )
+        
+        results = []
+        for i, (visits, series, flags) in enumerate(zip(timelines, all_series, trending.tolist())):
+            if len(visits) < 2:
+                results.append(self._single_visit_message())
+                continue
+            
+            highlights = []
+            for analyze, values, flagged in zip(analyzers, series, flags):
+                if flagged:
+                    highlight = analyze(values)
+                    if highlight:
+                        highlights.append(highlight)
+            
+            symptom_highlight = self._analyze_symptom_onset(symptoms[i] if symptoms is not None else None)
+            if symptom_highlight:
+                highlights.append(symptom_highlight)
+            
+            results.append(self._construct_highlight(highlights, visits))
         
-        # Construct final highlight
-        return self._construct_highlight(highlights, visits)
+        return results
     
     def _single_visit_message(self) -> str:
         """Message for single visit assessments"""
         return "Single visit assessment - no temporal trend data available"
     
-    def _analyze_bp_trend(self, visits: List[Dict]) -> Optional[str]:
+    def _analyze_bp_trend(self, bp_values: List[Tuple]) -> Optional[str]:
         """
         Analyze blood pressure trend across visits.
         
         Args:
-            visits: List of visit records
+            bp_values: Recorded (systolic, diastolic) readings in visit order
             
         Returns:
             Highlight string if significant trend detected
         """
-        bp_values = []
-        for v in visits:
-            if v.get('bp'):
-                sys = v['bp'].get('systolic')
-                dia = v['bp'].get('diastolic')
-                if sys is not None and dia is not None:
-                    bp_values.append((sys, dia))
-        
         if len(bp_values) < 2:
             return None
         
@@ -119,221 +443,137 @@ class TemporalHighlightGenerator:
         sys_last, dia_last = bp_values[-1]
         
         sys_change = sys_last - sys_first
-        dia_change = dia_last - dia_first
         
         # Check for significant change
-        if abs(sys_change) >= self.SIGNIFICANT_CHANGES['bp_systolic']:
+        if abs(sys_change) >= _BP_SYS_THRESH:
             direction = "increased" if sys_change > 0 else "decreased"
             
-            # Format BP progression
-            bp_progression = " → ".join([f"{s}/{d}" for s, d in bp_values])
-            
             # Assess severity
-            if sys_last >= 160:
-                severity = " (severe hypertension range)"
-            elif sys_last >= 140:
-                severity = " (hypertensive range)"
-            else:
-                severity = ""
+            severity = _BP_SEVERITY[bisect_right(_BP_SEVERITY_LIMITS, sys_last)]
             
             return f"Blood pressure {direction} from {sys_first}/{dia_first} to {sys_last}/{dia_last} mmHg{severity}"
         
         return None
     
-    def _analyze_hemoglobin_trend(self, visits: List[Dict]) -> Optional[str]:
+    def _analyze_hemoglobin_trend(self, hb_values: List) -> Optional[str]:
         """
         Analyze hemoglobin trend across visits.
         
         Args:
-            visits: List of visit records
+            hb_values: Recorded hemoglobin values in visit order
             
         Returns:
             Highlight string if significant trend detected
         """
-        hb_values = [v.get('hemoglobin') for v in visits if v.get('hemoglobin') is not None]
-        
         if len(hb_values) < 2:
             return None
         
         hb_change = hb_values[-1] - hb_values[0]
         
-        if abs(hb_change) >= self.SIGNIFICANT_CHANGES['hemoglobin']:
-            direction = "declined" if hb_change < 0 else "increased"
-            
-            # Format progression
-            hb_progression = " → ".join([f"{h:.1f}" for h in hb_values])
-            
-            # Calculate rate of decline
-            visits_span = len(hb_values)
-            rate = abs(hb_change) / visits_span
-            
-            # Assess severity
-            if hb_values[-1] < 7.0:
-                severity = " (critical anemia - transfusion may be required)"
-            elif hb_values[-1] < 9.0:
-                severity = " (severe anemia)"
-            elif hb_values[-1] < 11.0:
-                severity = " (moderate anemia)"
-            else:
-                severity = ""
-            
+        if abs(hb_change) >= _HB_THRESH:
             if hb_change < 0:
-                return f"Hemoglobin {direction} from {hb_values[0]:.1f} to {hb_values[-1]:.1f} g/dL (loss of {abs(hb_change):.1f} g/dL){severity}"
+                # Assess severity (only reported for a decline)
+                template = _HB_DECLINE_TEMPLATES[bisect_right(_HB_SEVERITY_LIMITS, hb_values[-1])]
+                return template % (hb_values[0], hb_values[-1], -hb_change)
             else:
-                return f"Hemoglobin improved from {hb_values[0]:.1f} to {hb_values[-1]:.1f} g/dL"
+                return "Hemoglobin improved from %.1f to %.1f g/dL" % (hb_values[0], hb_values[-1])
         
         return None
     
-    def _analyze_platelet_trend(self, visits: List[Dict]) -> Optional[str]:
+    def _analyze_platelet_trend(self, plt_values: List) -> Optional[str]:
         """
         Analyze platelet count trend across visits.
         
         Args:
-            visits: List of visit records
+            plt_values: Recorded platelet counts in visit order
             
         Returns:
             Highlight string if significant trend detected
         """
-        plt_values = [v.get('platelets') for v in visits if v.get('platelets') is not None]
-        
         if len(plt_values) < 2:
             return None
         
         plt_change = plt_values[-1] - plt_values[0]
         
-        if abs(plt_change) >= self.SIGNIFICANT_CHANGES['platelets']:
-            direction = "declined" if plt_change < 0 else "increased"
-            
-            # Format progression
-            plt_progression = " → ".join([f"{p:,}" for p in plt_values])
-            
-            # Assess severity
-            if plt_values[-1] < 50000:
-                severity = " (critical - HELLP syndrome risk)"
-            elif plt_values[-1] < 100000:
-                severity = " (severe thrombocytopenia)"
-            elif plt_values[-1] < 150000:
-                severity = " (mild thrombocytopenia)"
-            else:
-                severity = ""
-            
+        if abs(plt_change) >= _PLT_THRESH:
             if plt_change < 0:
-                return f"Platelet count {direction} from {plt_values[0]:,} to {plt_values[-1]:,} per uL (drop of {abs(plt_change):,}){severity}"
+                # Assess severity (only reported for a decline)
+                template = _PLT_DECLINE_TEMPLATES[bisect_right(_PLT_SEVERITY_LIMITS, plt_values[-1])]
+                return template.format(plt_values[0], plt_values[-1], -plt_change)
             else:
                 return f"Platelet count improved from {plt_values[0]:,} to {plt_values[-1]:,} per uL"
         
         return None
     
-    def _analyze_proteinuria_trend(self, visits: List[Dict]) -> Optional[str]:
+    def _analyze_proteinuria_trend(self, protein_values: List) -> Optional[str]:
         """
         Analyze proteinuria progression across visits.
         
         Args:
-            visits: List of visit records
+            protein_values: Recorded proteinuria readings in visit order
             
         Returns:
             Highlight string if significant trend detected
         """
-        protein_values = [v.get('proteinuria') for v in visits if v.get('proteinuria') is not None]
-        
         if len(protein_values) < 2:
             return None
         
-        # Map proteinuria to severity scores
-        severity_map = {
-            'nil': 0, 'negative': 0, 'trace': 1,
-            '+1': 2, '+': 2, '1+': 2,
-            '+2': 3, '++': 3, '2+': 3,
-            '+3': 4, '+++': 4, '3+': 4
-        }
-        
-        protein_scores = []
-        for p in protein_values:
-            score = severity_map.get(p.lower() if isinstance(p, str) else str(p), 0)
-            protein_scores.append(score)
-        
-        score_change = protein_scores[-1] - protein_scores[0]
+        # Only the first and last readings decide the trend
+        last_score = _protein_score(protein_values[-1])
+        score_change = last_score - _protein_score(protein_values[0])
         
         if score_change > 0:
-            # Worsening proteinuria
-            progression = " → ".join(protein_values)
-            
-            # Assess clinical significance
-            if protein_scores[-1] >= 4:
-                severity = " (severe proteinuria - preeclampsia highly likely)"
-            elif protein_scores[-1] >= 3:
-                severity = " (significant proteinuria - preeclampsia concern)"
-            elif protein_scores[-1] >= 2:
-                severity = " (mild proteinuria - monitor for preeclampsia)"
-            else:
-                severity = ""
+            # Worsening proteinuria - assess clinical significance
+            severity = _PROTEIN_TREND_SEVERITY[last_score]
             
             return f"Proteinuria worsened from {protein_values[0]} to {protein_values[-1]}{severity}"
         
         return None
     
-    def _analyze_weight_trend(self, visits: List[Dict]) -> Optional[str]:
+    def _analyze_weight_trend(self, weight_values: List) -> Optional[str]:
         """
         Analyze weight gain pattern across visits.
         
         Args:
-            visits: List of visit records
+            weight_values: Recorded weights in visit order
             
         Returns:
             Highlight string if significant trend detected
         """
-        weight_values = [v.get('weight') for v in visits if v.get('weight') is not None]
-        
         if len(weight_values) < 2:
             return None
         
         weight_change = weight_values[-1] - weight_values[0]
         
-        if abs(weight_change) >= self.SIGNIFICANT_CHANGES['weight']:
+        if abs(weight_change) >= _WEIGHT_THRESH:
             # Rapid weight gain can indicate fluid retention
             if weight_change > 0:
-                # Calculate weeks if dates available
-                weeks_span = len(visits) - 1
-                rate_per_visit = weight_change / weeks_span if weeks_span > 0 else weight_change
-                
-                if weight_change >= 4.0:
-                    severity = " (excessive - possible fluid retention)"
-                elif weight_change >= 3.0:
-                    severity = " (rapid gain - monitor for edema)"
-                else:
-                    severity = ""
+                template = _WEIGHT_GAIN_TEMPLATES[bisect_right(_WEIGHT_GAIN_LIMITS, weight_change)]
                 
-                return f"Rapid weight gain: {weight_values[0]:.1f} to {weight_values[-1]:.1f} kg (gained {weight_change:.1f} kg){severity}"
+                return template % (weight_values[0], weight_values[-1], weight_change)
         
         return None
     
-    def _analyze_wbc_trend(self, visits: List[Dict]) -> Optional[str]:
+    def _analyze_wbc_trend(self, wbc_values: List) -> Optional[str]:
         """
         Analyze white blood cell count trend across visits.
         
         Args:
-            visits: List of visit records
+            wbc_values: Recorded white blood cell counts in visit order
             
         Returns:
             Highlight string if significant trend detected
         """
-        wbc_values = [v.get('wbc') for v in visits if v.get('wbc') is not None]
-        
         if len(wbc_values) < 2:
             return None
         
         wbc_change = wbc_values[-1] - wbc_values[0]
         
-        if wbc_change > 5000:
+        if wbc_change > _WBC_RISE_THRESH:
             # Rising WBC suggests infection
-            if wbc_values[-1] > 20000:
-                severity = " (severe leukocytosis - sepsis concern)"
-            elif wbc_values[-1] > 15000:
-                severity = " (leukocytosis - infection suspected)"
-            else:
-                severity = ""
+            template = _WBC_RISE_TEMPLATES[bisect_left(_WBC_SEVERITY_LIMITS, wbc_values[-1])]
             
-            return f"White blood cell count increased from {wbc_values[0]:,} to {wbc_values[-1]:,} per uL{severity}"
+            return template.format(wbc_values[0], wbc_values[-1])
         
         return None
     
@@ -350,31 +590,18 @@ class TemporalHighlightGenerator:
         if not symptoms or symptoms.get('symptom_count', 0) == 0:
             return None
         
-        symptom_categories = []
+        # Group present symptoms by category in one pass, keeping report order
+        grouped = defaultdict(list)
+        for name in symptoms.get('present_symptoms') or ():
+            entry = _SYMPTOM_CATEGORY.get(name)
+            if entry is not None:
+                grouped[entry[0]].append(entry[1])
         
-        if symptoms.get('has_neurological'):
-            neuro_symptoms = [s for s in symptoms.get('present_symptoms', []) 
-                            if s in ['headache', 'blurred_vision', 'visual_disturbance', 'dizziness']]
-            if neuro_symptoms:
-                symptom_categories.append(f"neurological symptoms ({', '.join(neuro_symptoms).replace('_', ' ')})")
-        
-        if symptoms.get('has_respiratory'):
-            resp_symptoms = [s for s in symptoms.get('present_symptoms', [])
-                           if s in ['breathlessness', 'chest_pain']]
-            if resp_symptoms:
-                symptom_categories.append(f"respiratory symptoms ({', '.join(resp_symptoms).replace('_', ' ')})")
-        
-        if symptoms.get('has_fetal_concern'):
-            fetal_symptoms = [s for s in symptoms.get('present_symptoms', [])
-                            if s in ['reduced_fetal_movement', 'absent_fetal_movement']]
-            if fetal_symptoms:
-                symptom_categories.append(f"fetal concerns ({', '.join(fetal_symptoms).replace('_', ' ')})")
-        
-        if symptoms.get('has_gi'):
-            gi_symptoms = [s for s in symptoms.get('present_symptoms', [])
-                         if s in ['nausea_vomiting', 'abdominal_pain', 'epigastric_pain']]
-            if gi_symptoms:
-                symptom_categories.append(f"gastrointestinal symptoms ({', '.join(gi_symptoms).replace('_', ' ')})")
+        symptom_categories = []
+        for index, (flag, label) in enumerate(_ONSET_CATEGORIES):
+            names = grouped.get(index)
+            if names and symptoms.get(flag):
+                symptom_categories.append(f"{label} ({', '.join(names)})")
         
         if symptom_categories:
             if len(symptom_categories) > 1:
@@ -453,25 +680,31 @@ class TemporalHighlightGenerator:
         if len(visits) < 2:
             return "insufficient_data"
         
+        # Scoring only needs the first and last reading of each parameter
+        return self._trend_severity(
+            _systolic_ends(visits), _value_ends(visits, 'hemoglobin'), _value_ends(visits, 'platelets')
+        )
+    
+    def _trend_severity(self, sys_values, hb_values, plt_values) -> str:
+        """
+        Score trend severity; each argument holds the readings of one
+        parameter in visit order (only the first and last are used).
+        """
         severity_score = 0
         
         # Check each parameter
-        bp_values = [(v['bp']['systolic'], v['bp']['diastolic']) 
-                    for v in visits if v.get('bp')]
-        if len(bp_values) >= 2:
-            if bp_values[-1][0] >= 160:
+        if len(sys_values) >= 2:
+            if sys_values[-1] >= 160:
                 severity_score += 3
-            elif bp_values[-1][0] >= 140 and bp_values[-1][0] > bp_values[0][0]:
+            elif sys_values[-1] >= 140 and sys_values[-1] > sys_values[0]:
                 severity_score += 2
         
-        hb_values = [v['hemoglobin'] for v in visits if v.get('hemoglobin') is not None]
         if len(hb_values) >= 2:
             if hb_values[-1] < 7.0:
                 severity_score += 3
             elif hb_values[-1] < 9.0 and hb_values[-1] < hb_values[0]:
                 severity_score += 2
         
-        plt_values = [v['platelets'] for v in visits if v.get('platelets') is not None]
         if len(plt_values) >= 2:
             if plt_values[-1] < 50000:
                 severity_score += 3
@@ -489,10 +722,7 @@ class TemporalHighlightGenerator:
             return "stable"
 
 
-# Singleton instance
-_highlight_generator_instance = None
-
-
+@lru_cache(maxsize=None)
 def get_highlight_generator() -> TemporalHighlightGenerator:
     """
     Get singleton instance of TemporalHighlightGenerator.
@@ -500,10 +730,7 @@ def get_highlight_generator() -> TemporalHighlightGenerator:
     Returns:
         TemporalHighlightGenerator instance
     """
-    global _highlight_generator_instance
-    if _highlight_generator_instance is None:
-        _highlight_generator_instance = TemporalHighlightGenerator()
-    return _highlight_generator_instance
+    return TemporalHighlightGenerator()
 
 
 if __name__ == "__main__":
@@ -3,27 +3,325 @@ Temporal Risk Engine - Detects escalation across ANC visits
 Decision authority for PregnancyBridge
 """
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, NamedTuple, Optional
+from dataclasses import dataclass
+from enum import IntEnum
 from datetime import datetime
+from functools import lru_cache
+from itertools import product
+from operator import attrgetter
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+    _jit = numba.njit(cache=True, error_model='numpy')
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+# Clinical thresholds
+_HB_SEVERE = 7.0
+_HB_MODERATE = 9.0
+_HB_MILD = 11.0
+_HB_BORDERLINE = 10.5       # upper bound of a moderate factor in multi-factor risk
+
+_BP_SEVERE_SYS = 160
+_BP_STAGE2_SYS = 150
+_BP_STAGE1_SYS = 140
+
+_PLT_CRITICAL = 50000       # per uL, <=
+_PLT_LOW = 100000           # per uL, <=
+_PLT_NORMAL = 150000        # per uL, a drop only counts below this
+_PLT_DROP_PERCENT = 30
+
+_PREECLAMPSIA_MIN_GA = 20   # weeks
+
+# Dipstick proteinuria levels; readings are matched case-insensitively and
+# unlisted readings count as 0
+_PROTEINURIA_LEVELS = {'negative': 0, 'trace': 1, '+1': 2, '+2': 3, '+3': 4}
+# The same levels keyed by every upper/lower-case spelling of each reading
+# (291 keys), so a single lookup replaces lower() + get. No non-ASCII
+# character lower-cases into these letters, so the table matches exactly the
+# strings whose lower() is a known reading.
+_PROTEINURIA_LOOKUP = {
+    ''.join(spelling): level
+    for reading, level in _PROTEINURIA_LEVELS.items()
+    for spelling in product(*({c.lower(), c.upper()} for c in reading))
+}
+
+
+def _protein_level(reading) -> int:
+    """Level of a proteinuria reading, in any letter case"""
+    return _PROTEINURIA_LOOKUP.get(reading, 0) if isinstance(reading, str) else 0
+
+
+# Series at least this long are compared with NumPy; shorter ones (the usual
+# handful of ANC visits) are cheaper to walk in Python
+_VECTORIZE_MIN_VISITS = 16
+
+
+# ── Numeric rules ─────────────────────────────────────────────────────────────
+# Each rule takes one parameter's recorded readings in visit order and returns
+# which rule fires; the checks turn that code into the escalation text.
+_NO_ESCALATION = 0
+_CRITICAL_ANEMIA = 1
+_PROGRESSIVE_ANEMIA = 2
+_SEVERE_ANEMIA = 3
+_SEVERE_HYPERTENSION = 1
+_BP_ESCALATION = 2
+_STAGE2_HYPERTENSION = 3
+_CRITICAL_THROMBOCYTOPENIA = 1
+_THROMBOCYTOPENIA = 2
+_PLATELET_DROP = 3
+
+# Long series are counted by a compiled loop when numba is installed, or with
+# NumPy otherwise. The usual handful of ANC visits is walked in Python, which
+# beats the array conversion and dispatch either path costs.
+if NUMBA_AVAILABLE:
+    @_jit
+    def _count_declines_kernel(values):
+        declines = 0
+        for i in range(1, len(values)):
+            if values[i] < values[i - 1]:
+                declines += 1
+        return declines
+    
+    @_jit
+    def _count_rises_kernel(values):
+        rises = 0
+        for i in range(1, len(values)):
+            if values[i] > values[i - 1]:
+                rises += 1
+        return rises
+    
+    def _count_long_declines(values: List[float]) -> int:
+        import numpy as np
+        return int(_count_declines_kernel(np.asarray(values, dtype=np.float64)))
+    
+    def _count_long_rises(values: List[float]) -> int:
+        import numpy as np
+        return int(_count_rises_kernel(np.asarray(values, dtype=np.float64)))
+else:
+    def _count_long_declines(values: List[float]) -> int:
+        import numpy as np
+        return int((np.diff(np.asarray(values, dtype=np.float64)) < 0).sum())
+    
+    def _count_long_rises(values: List[float]) -> int:
+        import numpy as np
+        return int((np.diff(np.asarray(values, dtype=np.float64)) > 0).sum())
+
+
+def _count_declines(values: List[float]) -> int:
+    """Number of readings lower than the one before"""
+    if len(values) < _VECTORIZE_MIN_VISITS:
+        return sum(b < a for a, b in zip(values, values[1:]))
+    return _count_long_declines(values)
+
+
+def _count_rises(values: List[float]) -> int:
+    """Number of readings higher than the one before"""
+    if len(values) < _VECTORIZE_MIN_VISITS:
+        return sum(b > a for a, b in zip(values, values[1:]))
+    return _count_long_rises(values)
+
+
+def _anemia_rule(hb: List[float]) -> int:
+    n = len(hb)
+    if n < 2:
+        return _NO_ESCALATION
+    latest = hb[n - 1]
+    if latest < _HB_SEVERE:
+        return _CRITICAL_ANEMIA
+    if latest < _HB_MODERATE:
+        if n >= 3 and _count_declines(hb) >= 2:
+            return _PROGRESSIVE_ANEMIA
+        return _SEVERE_ANEMIA
+    return _NO_ESCALATION
+
+
+def _bp_rule(bp: List[float]) -> int:
+    n = len(bp)
+    if n < 2:
+        return _NO_ESCALATION
+    latest = bp[n - 1]
+    if latest >= _BP_SEVERE_SYS:
+        return _SEVERE_HYPERTENSION
+    if n >= 3 and latest >= _BP_STAGE1_SYS and _count_rises(bp) >= 2:
+        return _BP_ESCALATION
+    if latest >= _BP_STAGE2_SYS:
+        return _STAGE2_HYPERTENSION
+    return _NO_ESCALATION
+
+
+def _platelet_rule(plt: List[float]) -> int:
+    n = len(plt)
+    if n == 0:
+        return _NO_ESCALATION
+    latest = plt[n - 1]
+    if latest <= _PLT_CRITICAL:
+        return _CRITICAL_THROMBOCYTOPENIA
+    if latest <= _PLT_LOW:
+        return _THROMBOCYTOPENIA
+    if n >= 2 and latest < _PLT_NORMAL and (plt[0] - latest) / plt[0] * 100 >= _PLT_DROP_PERCENT:
+        return _PLATELET_DROP
+    return _NO_ESCALATION
+
+
+class Severity(IntEnum):
+    """Escalation severity; the name is the reported risk_category."""
+    UNKNOWN = 0
+    LOW = 1
+    MODERATE = 2
+    HIGH = 3
+
+
+# Trigger names in reporting order: every HIGH trigger, then the MODERATE
+# ones, each group in the order the checks run. assess_batch() reports
+# triggers as indices into this tuple.
+ESCALATION_TRIGGERS = (
+    'critical_anemia', 'progressive_anemia',
+    'severe_hypertension', 'bp_escalation', 'stage2_hypertension',
+    'preeclampsia_criteria',
+    'critical_thrombocytopenia', 'thrombocytopenia', 'platelet_drop',
+    'severe_proteinuria_escalation', 'multi_factor_risk',
+    'severe_anemia',
+    'significant_proteinuria', 'persistent_proteinuria',
+)
+_FIRST_MODERATE_TRIGGER = ESCALATION_TRIGGERS.index('severe_anemia')
+
+
+def _sort_by_ga(visits: List[Dict]) -> List[Dict]:
+    """Order visits by gestational age, unless they already arrive in order"""
+    ages = [v.get('gestational_age', 0) for v in visits]
+    if all(later >= earlier for earlier, later in zip(ages, ages[1:])):
+        return visits
+    return sorted(visits, key=lambda v: v.get('gestational_age', 0))
+
+
+# Visit fields an assessment depends on. A timeline's cache key holds each
+# visit's values of these (_MISSING when absent, which the rules treat
+# differently from None) and their types, since 8 and 8.0 are echoed
+# differently in the reasons and summaries.
+_KEY_FIELDS = ('gestational_age', 'hemoglobin', 'bp_systolic', 'bp_diastolic', 'proteinuria', 'platelets', 'hb')
+_MISSING = object()
+_MISSING_DEFAULTS = (_MISSING,) * len(_KEY_FIELDS)
+
+
+def _timeline_key(visits: List[Dict]) -> tuple:
+    """Content key of a timeline for the assessment cache"""
+    key = []
+    for v in visits:
+        values = tuple(map(v.get, _KEY_FIELDS, _MISSING_DEFAULTS))
+        key.append(values)
+        key.append(tuple(map(type, values)))
+    return tuple(key)
+
+
+# Timeline feature bits: set when a parameter has enough readings for its
+# check to fire (two for the trends, one for platelets)
+_HAS_HB = 1
+_HAS_BP = 2
+_HAS_PROTEIN = 4
+_HAS_PLATELETS = 8
+
+
+@dataclass(slots=True)
+class Escalation:
+    """
+    An escalation pattern found by one of the timeline checks.
+    
+    The reason is kept as a format string and the values it names, so only
+    the escalation that gets reported is ever formatted.
+    """
+    severity: Severity
+    escalation_trigger: str
+    trigger_visit: int
+    reason_format: str
+    reason_args: Dict
+    
+    @property
+    def rule_reason(self) -> str:
+        return self.reason_format.format_map(self.reason_args)
+    
+    def to_dict(self, visit_summaries: List[Dict]) -> Dict:
+        """Return the escalation as the assess_timeline() dictionary."""
+        return {
+            'risk_category': self.severity.name,
+            'escalation_trigger': self.escalation_trigger,
+            'trigger_visit': self.trigger_visit,
+            'rule_reason': self.rule_reason,
+            'visit_summaries': visit_summaries
+        }
+
+
+class _TimelineSeries(NamedTuple):
+    """
+    Recorded readings of a sorted timeline, gathered in a single pass.
+    
+    Each list holds the recorded (non-empty) values in visit order; the rules
+    only ever report the latest reading, so just its visit index and
+    gestational age are kept alongside. latest is the most recent visit
+    itself, for the rules that look at it as a whole. features holds the
+    _HAS_* bits of the parameters that can escalate.
+    """
+    summaries: List[Dict]               # the result's visit_summaries
+    latest: Dict
+    latest_visit: int
+    latest_protein: int                 # level of the latest visit's reading, 0 if none
+    features: int
+    hb: List[float]
+    hb_visit: Optional[int]
+    bp: List[float]
+    bp_visit: Optional[int]
+    bp_ga: Optional[float]
+    protein: List[int]                  # _PROTEINURIA_LEVELS values
+    protein_visit: Optional[int]
+    protein_ga: Optional[float]
+    protein_reading: Optional[str]      # latest reading as recorded
+    platelets: List[int]
+    platelet_visit: Optional[int]
+    platelet_ga: Optional[float]
+
 class TemporalRiskEngine:
     """Analyzes risk trends across multiple ANC visits"""
     
-    def __init__(self):
-        # Clinical thresholds
-        self.HB_SEVERE = 7.0
-        self.HB_MODERATE = 9.0
-        self.HB_MILD = 11.0
-        
-        self.BP_SEVERE_SYS = 160
-        self.BP_STAGE2_SYS = 150
-        self.BP_STAGE1_SYS = 140
-        
-        self.PROTEINURIA_LEVELS = {
-            'negative': 0, 'trace': 1, '+1': 2, '+2': 3, '+3': 4
-        }
+    # Escalation reasons, filled in by name when the escalation is reported
+    _REASON_CRITICAL_ANEMIA = 'Critical anemia: Hb {hb} g/dL (< 7.0). Transfusion may be required.'
+    _REASON_PROGRESSIVE_ANEMIA = 'Progressive anemia: Hb declining over {visits} visits ({first} → {hb} g/dL). Current level {hb} < 9.0 g/dL.'
+    _REASON_SEVERE_ANEMIA = 'Severe anemia: Hb {hb} g/dL (< 9.0).'
+    _REASON_SEVERE_HYPERTENSION = 'Severe hypertension: BP {bp} mmHg (≥ 160) at {ga} weeks.'
+    _REASON_BP_ESCALATION = 'Progressive BP rise over {visits} visits ({first} → {bp} mmHg). Now ≥ 140 mmHg.'
+    _REASON_STAGE2_HYPERTENSION = 'Stage 2 hypertension: BP {bp} mmHg (≥ 150).'
+    _REASON_SIGNIFICANT_PROTEINURIA = 'Significant proteinuria: {protein} at {ga} weeks.'
+    _REASON_PERSISTENT_PROTEINURIA = 'Persistent proteinuria over {visits} visits. Current: {protein}.'
+    _REASON_CRITICAL_THROMBOCYTOPENIA = 'Critical thrombocytopenia: platelets {platelets}/µL (≤ 50,000). HELLP risk.'
+    _REASON_THROMBOCYTOPENIA = 'Thrombocytopenia: platelets {platelets}/µL (≤ 100,000) at {ga} weeks.'
+    _REASON_PLATELET_DROP = 'Progressive platelet drop: {drop:.0f}% decline ({first} → {platelets}/µL).'
+    _REASON_SEVERE_PROTEINURIA_ESCALATION = 'Severe proteinuria {protein} with BP {bp} mmHg. Pre-eclampsia risk.'
+    _REASON_MULTI_FACTOR_RISK = 'Multi-factor risk: {factors}. Combined risk escalates to HIGH.'
+    _REASON_PREECLAMPSIA_CRITERIA = 'Pre-eclampsia criteria met: BP {bp} mmHg (≥ 140) + proteinuria {protein} at {ga} weeks.'
+    
+    def __init__(self, cache_size: int = 0):
+        """
+        Args:
+            cache_size: Number of recent timelines whose assessment is
+                memoized by content (0 disables the cache). Keying a timeline
+                costs about half an assessment, so enable it where the same
+                timelines are re-assessed, e.g. batch re-runs or UI re-renders
+        """
+        # Clinical thresholds, kept for callers; the rules read the module constants
+        self.HB_SEVERE = _HB_SEVERE
+        self.HB_MODERATE = _HB_MODERATE
+        self.HB_MILD = _HB_MILD
+        
+        self.BP_SEVERE_SYS = _BP_SEVERE_SYS
+        self.BP_STAGE2_SYS = _BP_STAGE2_SYS
+        self.BP_STAGE1_SYS = _BP_STAGE1_SYS
+        
+        self.PROTEINURIA_LEVELS = dict(_PROTEINURIA_LEVELS)
+        
+        self._assess_cached = lru_cache(maxsize=cache_size)(self._assess_key) if cache_size else None
     
     def assess_timeline(self, visits: List[Dict]) -> Dict:
         """
@@ -49,41 +347,47 @@ class TemporalRiskEngine:
         if not visits or len(visits) == 0:
             return self._unknown_risk("No visit data")
         
-        # Sort by gestational age
-        visits = sorted(visits, key=lambda v: v.get('gestational_age', 0))
-        
-        # Check each escalation pattern
-        escalations = []
-        
-        # Pattern 1: Progressive anemia
-        anemia_risk = self._check_anemia_trend(visits)
-        if anemia_risk:
-            escalations.append(anemia_risk)
+        if self._assess_cached is None:
+            return self._assess(visits)
         
-        # Pattern 2: BP escalation
-        bp_risk = self._check_bp_trend(visits)
-        if bp_risk:
-            escalations.append(bp_risk)
+        key = _timeline_key(visits)
+        try:
+            hash(key)
+        except TypeError:
+            # Unhashable readings: assess without caching
+            return self._assess(visits)
         
-        # Pattern 3: Persistent/worsening proteinuria
-        protein_risk = self._check_proteinuria_trend(visits)
-        if protein_risk:
-            escalations.append(protein_risk)
+        # The cached result is shared, so hand out a copy
+        result = self._assess_cached(key)
+        return {**result, 'visit_summaries': [dict(summary) for summary in result['visit_summaries']]}
+    
+    def _assess_key(self, key: tuple) -> Dict:
+        """Assess the timeline a cache key describes"""
+        visits = [
+            {field: value for field, value in zip(_KEY_FIELDS, values) if value is not _MISSING}
+            for values in key[::2]
+        ]
+        return self._assess(visits)
+    
+    def _assess(self, visits: List[Dict]) -> Dict:
+        """Assess a non-empty visit timeline"""
+        # Sort by gestational age
+        visits = _sort_by_ga(visits)
         
-        # Pattern 4: Pre-eclampsia (BP + proteinuria combined)
-        preeclampsia_risk = self._check_preeclampsia_pattern(visits)
-        if preeclampsia_risk:
-            escalations.append(preeclampsia_risk)
+        series = self._extract_series(visits)
         
-        # Pattern 5: Platelet drop (HELLP risk)
-        platelet_risk = self._check_platelet_trend(visits)
-        if platelet_risk:
-            escalations.append(platelet_risk)
-
-        # Pattern 6: Multi-factor moderate risks
-        multifactor_risk = self._check_multi_factor_risk(visits)
-        if multifactor_risk:
-            escalations.append(multifactor_risk)
+        # Check each escalation pattern (see _CHECKS), skipping those whose
+        # parameter was not recorded often enough, and stop at the first HIGH
+        features = series.features
+        escalations = []
+        for required, check in self._CHECKS:
+            if features & required != required:
+                continue
+            risk = check(self, series)
+            if risk:
+                escalations.append(risk)
+                if risk.severity is Severity.HIGH:
+                    break
         
         # Select highest risk
         if not escalations:
@@ -92,264 +396,405 @@ class TemporalRiskEngine:
                 'escalation_trigger': None,
                 'trigger_visit': None,
                 'rule_reason': 'No escalation patterns detected across visits',
-                'visit_summaries': self._summarize_visits(visits)
+                'visit_summaries': series.summaries
             }
         
-        # Return highest severity escalation
-        escalations.sort(key=lambda x: {'HIGH': 3, 'MODERATE': 2, 'LOW': 1}[x['risk_category']], reverse=True)
-        top_risk = escalations[0]
-        top_risk['visit_summaries'] = self._summarize_visits(visits)
+        # Return highest severity escalation (max keeps the first of equals)
+        if len(escalations) == 1:
+            top_risk = escalations[0]
+        else:
+            top_risk = max(escalations, key=attrgetter('severity'))
         
-        return top_risk
+        return top_risk.to_dict(series.summaries)
     
-    def _check_anemia_trend(self, visits: List[Dict]) -> Optional[Dict]:
-        """Detect progressive anemia (declining Hb)"""
-        hb_values = [(i, v.get('hemoglobin')) for i, v in enumerate(visits) if v.get('hemoglobin')]
+    def assess_batch(self, timelines: List[List[Dict]]):
+        """
+        Vectorised assess_timeline over many patients' visit timelines.
+        
+        Each timeline is reduced to its per-parameter series in Python; every
+        rule is then evaluated for the whole cohort at once, as NumPy
+        comparisons on (patients, readings) arrays padded with NaN.
+        
+        Args:
+            timelines: One visit list per patient, as for assess_timeline
+        
+        Returns:
+            Structured array with one row per timeline: risk_category (a
+            Severity value), trigger (index into ESCALATION_TRIGGERS, -1 for
+            none) and trigger_visit (-1 for none). For the reason and visit
+            summaries of flagged rows, call assess_timeline on them.
+        """
+        import numpy as np
+        
+        n = len(timelines)
+        empty = _TimelineSeries([], {}, -1, 0, 0, [], None, [], None, None,
+                                [], None, None, None, [], None, None)
+        cohort = [self._extract_series(_sort_by_ga(visits)) if visits else empty for visits in timelines]
+        width = max([2] + [max(len(s.hb), len(s.bp), len(s.protein), len(s.platelets)) for s in cohort])
+        rows = np.arange(n)
+        
+        def readings(field):
+            """Left-aligned readings, their count, first and latest value"""
+            values = np.full((n, width), np.nan)
+            count = np.zeros(n, dtype=np.int64)
+            for i, s in enumerate(cohort):
+                recorded = getattr(s, field)
+                if recorded:
+                    values[i, :len(recorded)] = recorded
+                    count[i] = len(recorded)
+            return values, count, values[:, 0], values[rows, np.maximum(count - 1, 0)]
+        
+        def visit_index(field):
+            return np.array([-1 if getattr(s, field) is None else getattr(s, field) for s in cohort])
+        
+        hb, hb_n, _, hb_last = readings('hb')
+        bp, bp_n, _, bp_last = readings('bp')
+        protein, protein_n, _, protein_last = readings('protein')
+        plt, plt_n, plt_first, plt_last = readings('platelets')
+        
+        # Latest-visit readings, with the checks' defaults
+        latest_bp = np.array([s.latest.get('bp_systolic', 0) for s in cohort], dtype=np.float64)
+        latest_ga = np.array([s.latest.get('gestational_age', 0) for s in cohort], dtype=np.float64)
+        latest_hb = np.array([s.latest.get('hb', 12) for s in cohort], dtype=np.float64)
+        latest_protein = np.array([s.latest_protein for s in cohort])
+        
+        declines = (np.diff(hb, axis=1) < 0).sum(axis=1)
+        rises = (np.diff(bp, axis=1) > 0).sum(axis=1)
+        recent = np.arange(width) >= (protein_n - 3)[:, None]
+        persistent = ((protein >= 1) & recent).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            plt_drop = (plt_first - plt_last) / plt_first * 100
+        moderate_factors = (
+            ((latest_bp >= _BP_STAGE1_SYS) & (latest_bp < _BP_SEVERE_SYS)).astype(np.int64)
+            + ((latest_hb >= _HB_MODERATE) & (latest_hb < _HB_BORDERLINE))
+            + (latest_protein == 2)
+        )
+        
+        anemia = hb_n >= 2
+        hypertension = bp_n >= 2
+        proteinuria = protein_n >= 2
+        # One condition per ESCALATION_TRIGGERS entry; the first match wins
+        conditions = [
+            anemia & (hb_last < _HB_SEVERE),
+            anemia & (hb_last < _HB_MODERATE) & (hb_n >= 3) & (declines >= 2),
+            hypertension & (bp_last >= _BP_SEVERE_SYS),
+            hypertension & (bp_n >= 3) & (bp_last >= _BP_STAGE1_SYS) & (rises >= 2),
+            hypertension & (bp_last >= _BP_STAGE2_SYS),
+            (latest_ga >= _PREECLAMPSIA_MIN_GA) & (latest_bp >= _BP_STAGE1_SYS) & (latest_protein >= 2),
+            (plt_n >= 1) & (plt_last <= _PLT_CRITICAL),
+            (plt_n >= 1) & (plt_last <= _PLT_LOW),
+            (plt_n >= 2) & (plt_last < _PLT_NORMAL) & (plt_drop >= _PLT_DROP_PERCENT),
+            latest_protein >= 3,
+            moderate_factors >= 2,
+            anemia & (hb_last < _HB_MODERATE),
+            proteinuria & (protein_last >= 3),
+            proteinuria & (protein_last >= 1) & (persistent >= 2),
+        ]
+        trigger = np.select(conditions, list(range(len(ESCALATION_TRIGGERS))), -1)
+        
+        hb_visit, bp_visit = visit_index('hb_visit'), visit_index('bp_visit')
+        protein_visit, platelet_visit = visit_index('protein_visit'), visit_index('platelet_visit')
+        latest_visit = np.array([s.latest_visit for s in cohort])
+        trigger_visits = np.array(
+            [hb_visit] * 2 + [bp_visit] * 3 + [latest_visit] + [platelet_visit] * 3
+            + [latest_visit] * 2 + [hb_visit] + [protein_visit] * 2
+        )
+        
+        result = np.empty(n, dtype=[('risk_category', 'i1'), ('trigger', 'i1'), ('trigger_visit', 'i4')])
+        result['trigger'] = trigger
+        result['trigger_visit'] = np.where(trigger >= 0, trigger_visits[np.maximum(trigger, 0), rows], -1)
+        result['risk_category'] = np.select(
+            [trigger >= _FIRST_MODERATE_TRIGGER, trigger >= 0, latest_visit >= 0],
+            [Severity.MODERATE, Severity.HIGH, Severity.LOW],
+            Severity.UNKNOWN
+        )
+        return result
+    
+    def _extract_series(self, visits: List[Dict]) -> _TimelineSeries:
+        """Collect every trended parameter from the visits in one pass"""
+        hb, bp, protein, platelets = [], [], [], []
+        hb_visit = bp_visit = bp_ga = None
+        protein_visit = protein_ga = protein_reading = None
+        platelet_visit = platelet_ga = None
+        summaries = []
         
-        if len(hb_values) < 2:
+        for i, v in enumerate(visits):
+            ga = v.get('gestational_age')
+            hb_value = v.get('hemoglobin')
+            bp_value = v.get('bp_systolic')
+            reading = v.get('proteinuria')
+            
+            # Timeline summary for MedGemma prompt
+            summaries.append({
+                'visit_number': i + 1,
+                'gestational_age': ga,
+                'hemoglobin': hb_value,
+                'bp_systolic': bp_value,
+                'bp_diastolic': v.get('bp_diastolic'),
+                'proteinuria': reading
+            })
+            
+            if hb_value:
+                hb.append(hb_value)
+                hb_visit = i
+            if bp_value:
+                bp.append(bp_value)
+                bp_visit, bp_ga = i, ga
+            if reading:
+                protein.append(_protein_level(reading))
+                protein_visit, protein_ga, protein_reading = i, ga, reading
+            value = v.get('platelets')
+            if value:
+                platelets.append(value)
+                platelet_visit, platelet_ga = i, ga
+        
+        features = 0
+        if len(hb) >= 2:
+            features |= _HAS_HB
+        if len(bp) >= 2:
+            features |= _HAS_BP
+        if len(protein) >= 2:
+            features |= _HAS_PROTEIN
+        if platelets:
+            features |= _HAS_PLATELETS
+        
+        latest_visit = len(visits) - 1
+        latest_protein = protein[-1] if protein_visit == latest_visit else 0
+        
+        return _TimelineSeries(summaries, visits[-1], latest_visit, latest_protein, features,
+                               hb, hb_visit, bp, bp_visit, bp_ga,
+                               protein, protein_visit, protein_ga, protein_reading,
+                               platelets, platelet_visit, platelet_ga)
+    
+    def _check_anemia_trend(self, series: _TimelineSeries) -> Optional[Escalation]:
+        """Detect progressive anemia (declining Hb)"""
+        rule = _anemia_rule(series.hb)
+        if rule == _NO_ESCALATION:
             return None
         
-        # Check for decline
-        hb_trend = [hb for _, hb in hb_values]
+        hb_trend = series.hb
         latest_hb = hb_trend[-1]
         
         # Critical anemia (single value)
-        if latest_hb < self.HB_SEVERE:
-            return {
-                'risk_category': 'HIGH',
-                'escalation_trigger': 'critical_anemia',
-                'trigger_visit': hb_values[-1][0],
-                'rule_reason': f'Critical anemia: Hb {latest_hb} g/dL (< 7.0). Transfusion may be required.'
-            }
+        if rule == _CRITICAL_ANEMIA:
+            return Escalation(
+                Severity.HIGH,
+                'critical_anemia',
+                series.hb_visit,
+                self._REASON_CRITICAL_ANEMIA,
+                {'hb': latest_hb}
+            )
         
         # Progressive decline
-        if len(hb_trend) >= 3:
-            decline_count = sum(1 for i in range(1, len(hb_trend)) if hb_trend[i] < hb_trend[i-1])
-            if decline_count >= 2 and latest_hb < self.HB_MODERATE:
-                return {
-                    'risk_category': 'HIGH',
-                    'escalation_trigger': 'progressive_anemia',
-                    'trigger_visit': hb_values[-1][0],
-                    'rule_reason': f'Progressive anemia: Hb declining over {len(hb_trend)} visits ({hb_trend[0]} → {latest_hb} g/dL). Current level {latest_hb} < 9.0 g/dL.'
-                }
+        if rule == _PROGRESSIVE_ANEMIA:
+            return Escalation(
+                Severity.HIGH,
+                'progressive_anemia',
+                series.hb_visit,
+                self._REASON_PROGRESSIVE_ANEMIA,
+                {'visits': len(hb_trend), 'first': hb_trend[0], 'hb': latest_hb}
+            )
         
         # Severe anemia (single point)
-        if latest_hb < self.HB_MODERATE:
-            return {
-                'risk_category': 'MODERATE',
-                'escalation_trigger': 'severe_anemia',
-                'trigger_visit': hb_values[-1][0],
-                'rule_reason': f'Severe anemia: Hb {latest_hb} g/dL (< 9.0).'
-            }
-        
-        return None
+        return Escalation(
+            Severity.MODERATE,
+            'severe_anemia',
+            series.hb_visit,
+            self._REASON_SEVERE_ANEMIA,
+            {'hb': latest_hb}
+        )
     
-    def _check_bp_trend(self, visits: List[Dict]) -> Optional[Dict]:
+    def _check_bp_trend(self, series: _TimelineSeries) -> Optional[Escalation]:
         """Detect BP escalation"""
-        bp_values = [(i, v.get('bp_systolic'), v.get('gestational_age')) 
-                     for i, v in enumerate(visits) if v.get('bp_systolic')]
-        
-        if len(bp_values) < 2:
+        rule = _bp_rule(series.bp)
+        if rule == _NO_ESCALATION:
             return None
         
-        latest_idx, latest_bp, latest_ga = bp_values[-1]
+        bp_trend = series.bp
+        latest_idx, latest_bp, latest_ga = series.bp_visit, bp_trend[-1], series.bp_ga
         
         # Severe hypertension (immediate risk)
-        if latest_bp >= self.BP_SEVERE_SYS:
-            return {
-                'risk_category': 'HIGH',
-                'escalation_trigger': 'severe_hypertension',
-                'trigger_visit': latest_idx,
-                'rule_reason': f'Severe hypertension: BP {latest_bp} mmHg (≥ 160) at {latest_ga} weeks.'
-            }
+        if rule == _SEVERE_HYPERTENSION:
+            return Escalation(
+                Severity.HIGH,
+                'severe_hypertension',
+                latest_idx,
+                self._REASON_SEVERE_HYPERTENSION,
+                {'bp': latest_bp, 'ga': latest_ga}
+            )
         
         # Escalating BP trend
-        if len(bp_values) >= 3:
-            bp_trend = [bp for _, bp, _ in bp_values]
-            rise_count = sum(1 for i in range(1, len(bp_trend)) if bp_trend[i] > bp_trend[i-1])
-            
-            if rise_count >= 2 and latest_bp >= self.BP_STAGE1_SYS:
-                return {
-                    'risk_category': 'HIGH',
-                    'escalation_trigger': 'bp_escalation',
-                    'trigger_visit': latest_idx,
-                    'rule_reason': f'Progressive BP rise over {len(bp_trend)} visits ({bp_trend[0]} → {latest_bp} mmHg). Now ≥ 140 mmHg.'
-                }
+        if rule == _BP_ESCALATION:
+            return Escalation(
+                Severity.HIGH,
+                'bp_escalation',
+                latest_idx,
+                self._REASON_BP_ESCALATION,
+                {'visits': len(bp_trend), 'first': bp_trend[0], 'bp': latest_bp}
+            )
         
         # Stage 2 hypertension
-        if latest_bp >= self.BP_STAGE2_SYS:
-            return {
-                'risk_category': 'HIGH',
-                'escalation_trigger': 'stage2_hypertension',
-                'trigger_visit': latest_idx,
-                'rule_reason': f'Stage 2 hypertension: BP {latest_bp} mmHg (≥ 150).'
-            }
-        
-        return None
+        return Escalation(
+            Severity.HIGH,
+            'stage2_hypertension',
+            latest_idx,
+            self._REASON_STAGE2_HYPERTENSION,
+            {'bp': latest_bp}
+        )
     
-    def _check_proteinuria_trend(self, visits: List[Dict]) -> Optional[Dict]:
+    def _check_proteinuria_trend(self, series: _TimelineSeries) -> Optional[Escalation]:
         """Detect persistent or worsening proteinuria"""
-        protein_values = [(i, v.get('proteinuria'), v.get('gestational_age')) 
-                          for i, v in enumerate(visits) if v.get('proteinuria')]
+        protein_levels = series.protein
         
-        if len(protein_values) < 2:
+        if len(protein_levels) < 2:
             return None
         
-        # Convert to numeric
-        protein_levels = []
-        for idx, p, ga in protein_values:
-            level = self.PROTEINURIA_LEVELS.get(p.lower() if p else 'negative', 0)
-            protein_levels.append((idx, level, ga, p))
-        
-        latest_idx, latest_level, latest_ga, latest_str = protein_levels[-1]
+        latest_idx, latest_level = series.protein_visit, protein_levels[-1]
+        latest_ga, latest_str = series.protein_ga, series.protein_reading
         
         # Significant proteinuria (≥ +2)
         if latest_level >= 3:
-            return {
-                'risk_category': 'MODERATE',
-                'escalation_trigger': 'significant_proteinuria',
-                'trigger_visit': latest_idx,
-                'rule_reason': f'Significant proteinuria: {latest_str} at {latest_ga} weeks.'
-            }
+            return Escalation(
+                Severity.MODERATE,
+                'significant_proteinuria',
+                latest_idx,
+                self._REASON_SIGNIFICANT_PROTEINURIA,
+                {'protein': latest_str, 'ga': latest_ga}
+            )
         
         # Persistent proteinuria (≥ trace for 2+ visits)
         if len(protein_levels) >= 2:
-            persistent_count = sum(1 for _, lvl, _, _ in protein_levels[-3:] if lvl >= 1)
+            persistent_count = sum(1 for lvl in protein_levels[-3:] if lvl >= 1)
             if persistent_count >= 2 and latest_level >= 1:
-                return {
-                    'risk_category': 'MODERATE',
-                    'escalation_trigger': 'persistent_proteinuria',
-                    'trigger_visit': latest_idx,
-                    'rule_reason': f'Persistent proteinuria over {persistent_count} visits. Current: {latest_str}.'
-                }
+                return Escalation(
+                    Severity.MODERATE,
+                    'persistent_proteinuria',
+                    latest_idx,
+                    self._REASON_PERSISTENT_PROTEINURIA,
+                    {'visits': persistent_count, 'protein': latest_str}
+                )
         
         return None
     
-    def _check_platelet_trend(self, visits: List[Dict]) -> Optional[Dict]:
+    def _check_platelet_trend(self, series: _TimelineSeries) -> Optional[Escalation]:
         """Detect platelet drop (thrombocytopenia / HELLP risk)"""
-        platelet_values = [(i, v.get('platelets'), v.get('gestational_age')) 
-                           for i, v in enumerate(visits) if v.get('platelets')]
-        
-        if not platelet_values:
+        rule = _platelet_rule(series.platelets)
+        if rule == _NO_ESCALATION:
             return None
         
-        latest_idx, latest_count, latest_ga = platelet_values[-1]
+        platelet_values = series.platelets
+        latest_idx, latest_count, latest_ga = series.platelet_visit, platelet_values[-1], series.platelet_ga
         
         # Critical thrombocytopenia
-        if latest_count <= 50000:
-            return {
-                'risk_category': 'HIGH',
-                'escalation_trigger': 'critical_thrombocytopenia',
-                'trigger_visit': latest_idx,
-                'rule_reason': f'Critical thrombocytopenia: platelets {latest_count}/µL (≤ 50,000). HELLP risk.'
-            }
+        if rule == _CRITICAL_THROMBOCYTOPENIA:
+            return Escalation(
+                Severity.HIGH,
+                'critical_thrombocytopenia',
+                latest_idx,
+                self._REASON_CRITICAL_THROMBOCYTOPENIA,
+                {'platelets': latest_count}
+            )
         
         # Low platelets
-        if latest_count <= 100000:
-            return {
-                'risk_category': 'HIGH',
-                'escalation_trigger': 'thrombocytopenia',
-                'trigger_visit': latest_idx,
-                'rule_reason': f'Thrombocytopenia: platelets {latest_count}/µL (≤ 100,000) at {latest_ga} weeks.'
-            }
+        if rule == _THROMBOCYTOPENIA:
+            return Escalation(
+                Severity.HIGH,
+                'thrombocytopenia',
+                latest_idx,
+                self._REASON_THROMBOCYTOPENIA,
+                {'platelets': latest_count, 'ga': latest_ga}
+            )
         
         # Progressive platelet drop
-        if len(platelet_values) >= 2:
-            first_count = platelet_values[0][1]
-            drop_percent = ((first_count - latest_count) / first_count) * 100
-            
-            if drop_percent >= 30 and latest_count < 150000:
-                return {
-                    'risk_category': 'HIGH',
-                    'escalation_trigger': 'platelet_drop',
-                    'trigger_visit': latest_idx,
-                    'rule_reason': f'Progressive platelet drop: {drop_percent:.0f}% decline ({first_count} → {latest_count}/µL).'
-                }
-        
-        return None
+        first_count = platelet_values[0]
+        drop_percent = ((first_count - latest_count) / first_count) * 100
+        return Escalation(
+            Severity.HIGH,
+            'platelet_drop',
+            latest_idx,
+            self._REASON_PLATELET_DROP,
+            {'drop': drop_percent, 'first': first_count, 'platelets': latest_count}
+        )
 
-    def _check_multi_factor_risk(self, visits: List[Dict]) -> Optional[Dict]:
+    def _check_multi_factor_risk(self, series: _TimelineSeries) -> Optional[Escalation]:
         """Detect when 2+ moderate factors combine to HIGH risk"""
-        if not visits:
-            return None
-        
-        latest = visits[-1]
-        latest_idx = len(visits) - 1
+        latest = series.latest
+        latest_idx = series.latest_visit
         moderate_factors = []
         
         # Check BP (moderate threshold: 140-159) - CHANGED FROM 135
         bp_sys = latest.get('bp_systolic', 0)
-        if 140 <= bp_sys < 160:  # Changed from 135
+        if _BP_STAGE1_SYS <= bp_sys < _BP_SEVERE_SYS:  # Changed from 135
             moderate_factors.append(f"BP {bp_sys} mmHg")
         
         # Check Hb (moderate: 9.0-10.5)
         hb = latest.get('hb', 12)
-        if 9.0 <= hb < 10.5:
+        if _HB_MODERATE <= hb < _HB_BORDERLINE:
             moderate_factors.append(f"Hb {hb} g/dL")
         
         # Check proteinuria (moderate: +1, severe: +2/+3)
         protein = latest.get('proteinuria', 'nil')
-        protein_level = self.PROTEINURIA_LEVELS.get(protein.lower() if protein else 'negative', 0)
+        protein_level = series.latest_protein
         
         if protein_level == 2:  # +1 only
             moderate_factors.append(f"proteinuria {protein}")
         elif protein_level >= 3:  # +2 or +3 is already significant
             # Severe proteinuria alone should escalate
-            return {
-                'risk_category': 'HIGH',
-                'escalation_trigger': 'severe_proteinuria_escalation',
-                'trigger_visit': latest_idx,
-                'rule_reason': f'Severe proteinuria {protein} with BP {bp_sys} mmHg. Pre-eclampsia risk.'
-            }
+            return Escalation(
+                Severity.HIGH,
+                'severe_proteinuria_escalation',
+                latest_idx,
+                self._REASON_SEVERE_PROTEINURIA_ESCALATION,
+                {'protein': protein, 'bp': bp_sys}
+            )
         
         # If 2+ moderate factors, escalate to HIGH
         if len(moderate_factors) >= 2:
-            return {
-                'risk_category': 'HIGH',
-                'escalation_trigger': 'multi_factor_risk',
-                'trigger_visit': latest_idx,
-                'rule_reason': f'Multi-factor risk: {", ".join(moderate_factors)}. Combined risk escalates to HIGH.'
-            }
+            return Escalation(
+                Severity.HIGH,
+                'multi_factor_risk',
+                latest_idx,
+                self._REASON_MULTI_FACTOR_RISK,
+                {'factors': ", ".join(moderate_factors)}
+            )
         
         return None
     
-    def _check_preeclampsia_pattern(self, visits: List[Dict]) -> Optional[Dict]:
+    def _check_preeclampsia_pattern(self, series: _TimelineSeries) -> Optional[Escalation]:
         """Detect pre-eclampsia (BP + proteinuria combined)"""
-        latest = visits[-1]
+        latest = series.latest
         bp = latest.get('bp_systolic', 0)
         protein = latest.get('proteinuria', 'negative')
         ga = latest.get('gestational_age', 0)
         
-        protein_level = self.PROTEINURIA_LEVELS.get(protein.lower() if protein else 'negative', 0)
+        protein_level = series.latest_protein
         
         # Classic pre-eclampsia criteria: BP ≥ 140 + proteinuria ≥ +1 after 20 weeks
-        if ga >= 20 and bp >= self.BP_STAGE1_SYS and protein_level >= 2:
+        if ga >= _PREECLAMPSIA_MIN_GA and bp >= _BP_STAGE1_SYS and protein_level >= 2:
             # Check if pattern is new or worsening
-            visit_idx = len(visits) - 1
+            visit_idx = series.latest_visit
             
-            return {
-                'risk_category': 'HIGH',
-                'escalation_trigger': 'preeclampsia_criteria',
-                'trigger_visit': visit_idx,
-                'rule_reason': f'Pre-eclampsia criteria met: BP {bp} mmHg (≥ 140) + proteinuria {protein} at {ga} weeks.'
-            }
+            return Escalation(
+                Severity.HIGH,
+                'preeclampsia_criteria',
+                visit_idx,
+                self._REASON_PREECLAMPSIA_CRITERIA,
+                {'bp': bp, 'protein': protein, 'ga': ga}
+            )
         
         return None
     
-    def _summarize_visits(self, visits: List[Dict]) -> List[Dict]:
-        """Create timeline summary for MedGemma prompt"""
-        summaries = []
-        for i, v in enumerate(visits):
-            summary = {
-                'visit_number': i + 1,
-                'gestational_age': v.get('gestational_age'),
-                'hemoglobin': v.get('hemoglobin'),
-                'bp_systolic': v.get('bp_systolic'),
-                'bp_diastolic': v.get('bp_diastolic'),
-                'proteinuria': v.get('proteinuria')
-            }
-            summaries.append(summary)
-        return summaries
+    # (required feature bits, check) in reporting order: the earlier check wins
+    # between equal severities, and nothing after a HIGH can outrank it.
+    # Proteinuria only ever raises MODERATE, so it goes last.
+    _CHECKS = (
+        (_HAS_HB, _check_anemia_trend),             # Progressive anemia
+        (_HAS_BP, _check_bp_trend),                 # BP escalation
+        (0, _check_preeclampsia_pattern),           # Pre-eclampsia (BP + proteinuria combined)
+        (_HAS_PLATELETS, _check_platelet_trend),    # Platelet drop (HELLP risk)
+        (0, _check_multi_factor_risk),              # Multi-factor moderate risks
+        (_HAS_PROTEIN, _check_proteinuria_trend),   # Persistent/worsening proteinuria
+    )
     
     def _unknown_risk(self, reason: str) -> Dict:
         return {
@@ -6,12 +6,62 @@ Version: 1.0.0
 Date: 2026-02-04
 """
 
-from typing import Dict, List
+from bisect import bisect_left
+from functools import lru_cache
+from typing import ClassVar, Dict, List, NamedTuple, Optional
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+# Phrases made of ASCII words, for which a single scan is safe
+_PLAIN_PHRASE_RE = re.compile(r'[A-Za-z0-9_]+(?: [A-Za-z0-9_]+)*')
+
+# Characters a plain phrase can match case-insensitively (includes the few
+# non-ASCII letters that fold to ASCII, such as the Kelvin sign)
+_FOLDS_TO_ASCII_RE = re.compile(r'[a-z0-9_]', re.IGNORECASE)
+
+# Characters that lower-case to an English letter (U+0130 and the Kelvin
+# sign U+212A included), for the translation coverage check
+_ENGLISH_LETTER_RE = re.compile('[A-Za-z\u0130\u212a]')
+_COVERAGE_STOPWORDS = frozenset({'a', 'an', 'the', 'to', 'of'})
+
+# Escaped phrases, kept so add_custom_translation does not re-escape the
+# whole vocabulary each time it recompiles a language
+_escape_phrase = lru_cache(maxsize=None)(re.escape)
+
+
+class _PhraseTable(NamedTuple):
+    """Compiled phrase table for one target language"""
+    pattern: re.Pattern
+    ascii_pattern: re.Pattern
+    replacements: tuple
+    overlap_pattern: Optional[re.Pattern]
+    phrases: tuple
+
+
+def _overlapping_spans(sorted_phrases: List[str]) -> List[str]:
+    """
+    Spell out each way a higher-priority phrase can start at a word inside a
+    lower-priority one and run past its end, e.g. "weak blood" followed by
+    "blood pressure" gives "weak blood pressure".
+    """
+    by_prefix = sorted((phrase.lower(), rank) for rank, phrase in enumerate(sorted_phrases))
+    keys = [lowered for lowered, _ in by_prefix]
+    spans = []
+    for rank, phrase in enumerate(sorted_phrases):
+        start = phrase.find(' ') + 1
+        while start:
+            tail = phrase[start:].lower()
+            i = bisect_left(keys, tail)
+            while i < len(keys) and keys[i].startswith(tail):
+                other_rank = by_prefix[i][1]
+                if other_rank < rank and len(keys[i]) > len(tail):
+                    spans.append(phrase[:start] + sorted_phrases[other_rank])
+                i += 1
+            start = phrase.find(' ', start) + 1
+    return spans
+
 
 class TranslationEngine:
     """
@@ -219,38 +269,92 @@ class TranslationEngine:
         }
     }
     
-    def __init__(self):
-        """Initialize translation engine with controlled vocabularies"""
+    # Compiled phrase tables, built on first use and shared by all instances.
+    # A table is rebuilt when its phrase count no longer matches TRANSLATIONS,
+    # so phrases inserted there directly are picked up; changing the
+    # translation of an existing phrase needs add_custom_translation.
+    _COMPILED: ClassVar[Dict[str, _PhraseTable]] = {}
+    # Bumped whenever a table is rebuilt, so instance caches know to clear
+    _compiled_version: ClassVar[int] = 0
+    
+    def __init__(self, cache_size: int = 512):
+        """
+        Initialize translation engine with controlled vocabularies
+        
+        Args:
+            cache_size: Number of recent (text, language) translations to
+                memoize (0 disables the cache). Explanations are built from
+                a few canned templates, so repeats are common
+        """
         logger.info("TranslationEngine initialized: Telugu, Hindi")
         
-        # Pre-compile regex patterns for performance
-        self._compiled_patterns = {}
-        for lang in self.TRANSLATIONS:
-            self._compiled_patterns[lang] = self._compile_patterns(lang)
+        self._translate_cached = lru_cache(maxsize=cache_size)(self._translate) if cache_size else None
+        self._cache_version = TranslationEngine._compiled_version
+    
+    @classmethod
+    def _ensure_compiled(cls, language: str) -> _PhraseTable:
+        """Get the compiled phrase table for a language, compiling it once"""
+        table = cls._COMPILED.get(language)
+        if table is None:
+            # Concurrent first calls may both compile; the first insert wins
+            table = cls._COMPILED.setdefault(language, cls._compile_patterns(language))
+        elif len(table.phrases) != len(cls.TRANSLATIONS[language]):
+            # TRANSLATIONS was extended directly: rebuild, and clear the
+            # instance caches, which may hold results from the old table
+            table = cls._COMPILED[language] = cls._compile_patterns(language)
+            TranslationEngine._compiled_version += 1
+        return table
     
-    def _compile_patterns(self, language: str) -> List[tuple]:
+    @classmethod
+    def _compile_patterns(cls, language: str) -> _PhraseTable:
         """
-        Compile regex patterns for efficient translation.
+        Compile one alternation pattern covering every phrase of a language.
+        
+        Each phrase gets its own capture group, so the index of the group that
+        matched selects the replacement without re-normalising the match.
         
         Args:
             language: Target language code
             
         Returns:
-            List of (compiled_pattern, replacement) tuples
+            _PhraseTable for single-pass translation
         """
-        translations = self.TRANSLATIONS[language]
+        translations = cls.TRANSLATIONS[language]
         
         # Sort phrases by length (longest first) to avoid partial matches
         sorted_phrases = sorted(translations.keys(), key=len, reverse=True)
+        replacements = (None,) + tuple(translations[phrase] for phrase in sorted_phrases)
+        
+        # Case-insensitive alternation with word boundaries; the regex engine
+        # tries alternatives in order, so the longest phrase at a position wins
+        pattern = re.compile(
+            r'\b(?:' + '|'.join('(' + _escape_phrase(phrase) + ')' for phrase in sorted_phrases) + r')\b',
+            re.IGNORECASE
+        )
+        plain = all(_PLAIN_PHRASE_RE.fullmatch(phrase) for phrase in sorted_phrases)
+        
+        # For ASCII text and ASCII phrases, re.ASCII gives the same matches
+        # with cheaper word-boundary and case checks
+        ascii_pattern = re.compile(pattern.pattern, re.IGNORECASE | re.ASCII) if plain else pattern
         
-        compiled = []
-        for english_phrase in sorted_phrases:
-            local_phrase = translations[english_phrase]
-            # Create case-insensitive pattern with word boundaries
-            pattern = re.compile(r'\b' + re.escape(english_phrase) + r'\b', re.IGNORECASE)
-            compiled.append((pattern, local_phrase))
+        # A left-to-right scan matches the phrase-by-phrase passes except
+        # where a longer phrase starts inside an earlier, shorter match.
+        # Texts containing such a span take the phrase-by-phrase path. Custom
+        # phrases outside the plain word form, or replacements the passes
+        # would rewrite again, send every text that way.
+        if not plain or \
+                any('\\' in replacement or
+                    (_FOLDS_TO_ASCII_RE.search(replacement) and pattern.search(replacement))
+                    for replacement in replacements[1:]):
+            overlap_pattern = pattern
+        else:
+            spans = _overlapping_spans(sorted_phrases)
+            overlap_pattern = re.compile(
+                r'\b(?:' + '|'.join(_escape_phrase(span) for span in spans) + r')\b',
+                re.IGNORECASE
+            ) if spans else None
         
-        return compiled
+        return _PhraseTable(pattern, ascii_pattern, replacements, overlap_pattern, tuple(sorted_phrases))
     
     def translate(self, text: str, target_language: str) -> str:
         """
@@ -267,13 +371,29 @@ class TranslationEngine:
             logger.warning(f"Unsupported language: {target_language}")
             return text
         
-        translated = text
+        if self._translate_cached is None:
+            return self._translate(text, target_language)
+        self._ensure_compiled(target_language)
+        if self._cache_version != TranslationEngine._compiled_version:
+            self._translate_cached.cache_clear()
+            self._cache_version = TranslationEngine._compiled_version
+        return self._translate_cached(text, target_language)
+    
+    def _translate(self, text: str, target_language: str) -> str:
+        """Translate text to a supported language"""
+        table = self._ensure_compiled(target_language)
         
-        # Apply pre-compiled patterns
-        for pattern, replacement in self._compiled_patterns[target_language]:
-            translated = pattern.sub(replacement, translated)
+        if table.overlap_pattern is not None and table.overlap_pattern.search(text):
+            # Apply phrases one at a time, longest first
+            translated = text
+            for phrase, replacement in zip(table.phrases, table.replacements[1:]):
+                translated = re.sub(r'\b' + _escape_phrase(phrase) + r'\b', replacement,
+                                    translated, flags=re.IGNORECASE)
+            return translated
         
-        return translated
+        pattern = table.ascii_pattern if text.isascii() else table.pattern
+        replacements = table.replacements
+        return pattern.sub(lambda match: replacements[match.lastindex], text)
     
     def translate_all(self, text: str) -> Dict[str, str]:
         """
@@ -320,8 +440,9 @@ class TranslationEngine:
         
         self.TRANSLATIONS[language][english_phrase] = translated_phrase
         
-        # Recompile patterns for this language
-        self._compiled_patterns[language] = self._compile_patterns(language)
+        # Recompile patterns for this language, for every instance
+        self._COMPILED[language] = self._compile_patterns(language)
+        TranslationEngine._compiled_version += 1
         
         logger.info(f"Added custom translation for '{english_phrase}' in {language}")
     
@@ -346,19 +467,16 @@ class TranslationEngine:
         translated = self.translate(text, target_language)
         
         # Count how many words remain in English (basic heuristic)
-        words = text.lower().split()
+        words = set(text.lower().split())
         translated_words = translated.split()
         
         # Words that appear in both are likely untranslated
-        english_alphabet = set('abcdefghijklmnopqrstuvwxyz')
-        untranslated_count = 0
-        untranslated_words = []
-        
-        for word in translated_words:
-            if any(c in english_alphabet for c in word.lower()):
-                untranslated_count += 1
-                if word.lower() in words and word.lower() not in ['a', 'an', 'the', 'to', 'of']:
-                    untranslated_words.append(word)
+        english_words = [word for word in translated_words if _ENGLISH_LETTER_RE.search(word)]
+        untranslated_count = len(english_words)
+        untranslated_words = [
+            word for word in english_words
+            if word.lower() in words and word.lower() not in _COVERAGE_STOPWORDS
+        ]
         
         coverage = (1 - (untranslated_count / len(translated_words))) * 100 if translated_words else 0
         
@@ -366,7 +484,7 @@ class TranslationEngine:
             'coverage_percent': round(coverage, 1),
             'total_words': len(translated_words),
             'untranslated_count': untranslated_count,
-            'untranslated_words': list(set(untranslated_words))[:10]
+            'untranslated_words': list(dict.fromkeys(untranslated_words))[:10]
         }
 
 
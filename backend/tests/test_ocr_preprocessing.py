@@ -0,0 +1,109 @@
+"""
+OCR image preprocessing on small synthetic pages (dark ink on white).
+"""
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from pregnancy_bridge.modules import ocr_utils
+from pregnancy_bridge.modules.ocr_utils import OCR_TARGET_SHORT_SIDE, ROI_MARGIN_PX
+
+
+@pytest.fixture
+def cv2():
+    cv2 = pytest.importorskip("cv2")
+    assert ocr_utils._load_cv2()
+    return cv2
+
+
+def _page(height=120, width=160):
+    import numpy as np
+    return np.full((height, width), 255, dtype=np.uint8)
+
+
+def test_crop_keeps_all_ink_plus_margin(cv2):
+    img = _page()
+    img[40:50, 30:60] = 0       # a text row
+    img[80, 100] = 0            # a lone '.' well below it
+
+    out = ocr_utils._crop_to_ink(img)
+
+    # Box spans rows 40..80 and cols 30..100, plus the margin on each side
+    assert out.shape == (80 - 40 + 1 + 2 * ROI_MARGIN_PX, 100 - 30 + 1 + 2 * ROI_MARGIN_PX)
+    assert (out == 0).sum() == (img == 0).sum()
+    assert (out[:ROI_MARGIN_PX] == 255).all()
+    assert (out[-ROI_MARGIN_PX:] == 255).all()
+    assert (out[:, :ROI_MARGIN_PX] == 255).all()
+    assert (out[:, -ROI_MARGIN_PX:] == 255).all()
+
+
+def test_crop_leaves_blank_page_unchanged(cv2):
+    img = _page()
+    out = ocr_utils._crop_to_ink(img)
+    assert out.shape == img.shape
+    assert (out == img).all()
+
+
+def test_crop_clamps_ink_at_the_edges(cv2):
+    img = _page()
+    img[0, 0] = 0
+    img[5, 5] = 0
+    out = ocr_utils._crop_to_ink(img)
+    assert out.shape == (5 + 1 + ROI_MARGIN_PX, 5 + 1 + ROI_MARGIN_PX)
+    assert out[0, 0] == 0
+
+    img = _page()
+    img[-1, -1] = 0
+    out = ocr_utils._crop_to_ink(img)
+    assert out.shape == (1 + ROI_MARGIN_PX, 1 + ROI_MARGIN_PX)
+    assert out[-1, -1] == 0
+
+
+def test_preprocess_blank_page_keeps_its_size(cv2, monkeypatch):
+    monkeypatch.setattr(ocr_utils, "OCR_TARGET_SHORT_SIDE", 1)  # no upscale
+    img = _page()
+    out = ocr_utils._preprocess_cv2(img)
+    assert out.shape == img.shape
+    assert (out == 255).all()
+
+
+def test_preprocess_keeps_thin_strokes(cv2, monkeypatch):
+    monkeypatch.setattr(ocr_utils, "OCR_TARGET_SHORT_SIDE", 1)  # no upscale
+    img = _page(80, 400)
+    cv2.putText(img, "1.5 11.2", (20, 55), cv2.FONT_HERSHEY_PLAIN, 1.5, 0, 1, cv2.LINE_AA)
+    count, labels = cv2.connectedComponents((img < 128).astype("uint8"))
+    assert count - 1 == 7       # one component per glyph, '.' included
+
+    # A frame of ink on the page edge makes the crop a no-op, so output
+    # pixels line up with the glyph labels
+    img[:3, :] = img[-3:, :] = 0
+    img[:, :3] = img[:, -3:] = 0
+    out = ocr_utils._preprocess_cv2(img)
+    assert out.shape == img.shape
+
+    # The median filter must not erase a thin '1' or a '.'
+    for glyph in range(1, count):
+        assert (out[labels == glyph] == 0).any()
+
+
+@pytest.mark.parametrize("size", [
+    (OCR_TARGET_SHORT_SIDE, 2000),
+    (1499, 2000),
+    (1429, 2000),               # scale 1.0497: within the 5% left alone
+    (2000, 1429),
+    (2480, 3508),               # A4 at 300 DPI
+])
+def test_target_size_skips_large_enough_images(size):
+    assert ocr_utils._target_size(*size) is None
+
+
+@pytest.mark.parametrize("size, target", [
+    ((1428, 2000), (1500, 2100)),   # first size past the 5% band
+    ((1000, 1400), (1500, 2100)),   # portrait: width is the short side
+    ((1400, 1000), (2100, 1500)),   # landscape: height is the short side
+    ((500, 700), (1000, 1400)),     # capped at x2
+    ((600, 400), (1200, 800)),
+])
+def test_target_size_upscales_short_side_to_target(size, target):
+    assert ocr_utils._target_size(*size) == target
@@ -0,0 +1,54 @@
+"""
+Platelet unit → multiplier lookup used to convert OCR'd counts to /µL.
+"""
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from pregnancy_bridge.modules.ocr_utils import _platelet_unit_multiplier, extract_lab_values
+
+
+@pytest.mark.parametrize("raw_unit, multiplier", [
+    ("/cumm", 1.0),
+    ("/mm3", 1.0),
+    ("/ul", 1.0),
+    ("cells/ul", 1.0),
+    ("lakh", 100_000.0),
+    ("", None),
+])
+def test_direct_units(raw_unit, multiplier):
+    assert _platelet_unit_multiplier(raw_unit) == multiplier
+
+
+
+@pytest.mark.parametrize("line, value_per_ul", [
+    ("Platelet count: 2.5 lakh", 250_000),
+    ("Platelets 250000 /cumm", 250_000),
+    ("PLT - 2,50,000/cumm", 250_000),
+    ("Platelets 2 50 000 /uL", 250_000),
+    ("Thrombocytes 3.1 lakh/cumm", 310_000),
+    ("PLT 45000 cells/ul", 45_000),
+    ("Hb 11.2 g/dl Platelets 220000", 220_000),
+])
+def test_extract_lab_values_reads_whole_count(line, value_per_ul):
+    platelets = extract_lab_values(line)["platelets"]
+    assert platelets["value_per_ul"] == value_per_ul
+    assert platelets["status"] == "ok"
+
+
+@pytest.mark.parametrize("raw_unit", ["x10^3/ul", "×10^3/ul", "10^3/ul", "k/ul", "thou/ul"])
+def test_thousands_units_resolve_to_own_multiplier(raw_unit):
+    # Not the x1 of the "/ul" these units contain
+    assert _platelet_unit_multiplier(raw_unit) == 1_000.0
+
+
+@pytest.mark.parametrize("line", [
+    "Platelet count 250 x10^3/ul",
+    "PLT: 250 k/ul",
+    "Platelets 250 10^3/ul",
+])
+def test_extract_lab_values_scales_thousands_units(line):
+    platelets = extract_lab_values(line)["platelets"]
+    assert platelets["value_per_ul"] == 250_000
+    assert platelets["status"] == "ok"
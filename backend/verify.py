@@ -5,13 +5,19 @@ Verifies HMAC signatures and SHA256 hashes for immutability
 
 import os
 import sys
-import json
 import hashlib
 import hmac
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from dotenv import load_dotenv
 
-load_dotenv()
+# Only fall back to a .env file when the shell has not set the key
+if not os.getenv('ARTIFACT_HMAC_KEY'):
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        pass
+    else:
+        load_dotenv()
 
 ARTIFACT_HMAC_KEY = os.getenv('ARTIFACT_HMAC_KEY')
 if not ARTIFACT_HMAC_KEY:
@@ -20,8 +26,37 @@ if not ARTIFACT_HMAC_KEY:
 
 ARTIFACT_HMAC_KEY = ARTIFACT_HMAC_KEY.encode()
 
+# Keyed once; each HMAC copies this state instead of re-deriving the pads
+_HMAC_PROTOTYPE = hmac.new(ARTIFACT_HMAC_KEY, b'', hashlib.sha256)
+
 def compute_hmac(data: bytes) -> str:
-    return hmac.new(ARTIFACT_HMAC_KEY, data, hashlib.sha256).hexdigest()
+    mac = _HMAC_PROTOTYPE.copy()
+    mac.update(data)
+    return mac.hexdigest()
+
+def compute_artifact_hash(run_dir: Path) -> str:
+    """SHA256 over the artifact files, streamed into one running hash.
+    
+    The files are read as UTF-8 text, newlines normalised, because that is
+    how the pipeline hashed them when the run was written.
+    """
+    sha256_hash = hashlib.sha256()
+    for fname in ['pipeline_output.json', 'medgemma_raw.txt', 'rule_engine_decision.json']:
+        fpath = run_dir / fname
+        if fpath.exists():
+            with open(fpath, encoding='utf-8') as f:
+                for chunk in iter(lambda: f.read(1 << 16), ''):
+                    sha256_hash.update(chunk.encode())
+    return sha256_hash.hexdigest()
+
+def _existing_names(run_dir: Path) -> set:
+    """Names in run_dir that Path.exists() would report, from one directory scan"""
+    try:
+        with os.scandir(run_dir) as entries:
+            return {entry.name for entry in entries
+                    if not entry.is_symlink() or os.path.exists(entry.path)}
+    except NotADirectoryError:
+        return set()
 
 def verify_run(run_id: str, artifacts_dir: str = 'artifacts/backend_runs'):
     """Verify integrity of a run"""
@@ -35,19 +70,30 @@ def verify_run(run_id: str, artifacts_dir: str = 'artifacts/backend_runs'):
     print(f"Directory: {run_dir}\n")
     
     all_passed = True
+    present = _existing_names(run_dir)
+    
+    # Hash the artifact files on a worker thread while the request HMAC is
+    # checked; the two touch disjoint files and hashlib releases the GIL
+    hash_file = run_dir / 'artifact.sha256'
+    stored_hash = hash_file.read_text().strip() if 'artifact.sha256' in present else None
+    artifact_hash_future = None
+    if stored_hash is not None:
+        executor = ThreadPoolExecutor(max_workers=1)
+        artifact_hash_future = executor.submit(compute_artifact_hash, run_dir)
+        executor.shutdown(wait=False)
     
     # Verify raw request HMAC
     raw_request_file = run_dir / 'raw_request.json'
     hmac_file = run_dir / 'raw_request.hmac'
     
-    if raw_request_file.exists() and hmac_file.exists():
+    if 'raw_request.json' in present and 'raw_request.hmac' in present:
         with open(raw_request_file, 'rb') as f:
             request_data = f.read()
         
         expected_hmac = hmac_file.read_text().strip()
         computed_hmac = compute_hmac(request_data)
         
-        if expected_hmac == computed_hmac:
+        if hmac.compare_digest(expected_hmac.encode(), computed_hmac.encode()):
             print("✓ Raw request HMAC valid")
         else:
             print("✗ Raw request HMAC INVALID - file may have been tampered")
@@ -57,20 +103,11 @@ def verify_run(run_id: str, artifacts_dir: str = 'artifacts/backend_runs'):
         all_passed = False
     
     # Verify artifact hash
-    hash_file = run_dir / 'artifact.sha256'
-    if hash_file.exists():
-        stored_hash = hash_file.read_text().strip()
-        
+    if stored_hash is not None:
         # Recompute hash
-        artifact_content = ''
-        for fname in ['pipeline_output.json', 'medgemma_raw.txt', 'rule_engine_decision.json']:
-            fpath = run_dir / fname
-            if fpath.exists():
-                artifact_content += fpath.read_text()
-        
-        computed_hash = hashlib.sha256(artifact_content.encode()).hexdigest()
+        computed_hash = artifact_hash_future.result()
         
-        if stored_hash == computed_hash:
+        if hmac.compare_digest(stored_hash.encode(), computed_hash.encode()):
             print("✓ Artifact SHA256 hash valid")
         else:
             print("✗ Artifact SHA256 hash INVALID - artifacts may have been modified")
@@ -81,12 +118,11 @@ def verify_run(run_id: str, artifacts_dir: str = 'artifacts/backend_runs'):
     
     # Verify artifact signature
     sig_file = run_dir / 'artifact.signature'
-    if sig_file.exists() and hash_file.exists():
+    if stored_hash is not None and 'artifact.signature' in present:
         stored_sig = sig_file.read_text().strip()
-        artifact_hash = hash_file.read_text().strip()
-        computed_sig = compute_hmac(artifact_hash.encode())
+        computed_sig = compute_hmac(stored_hash.encode())
         
-        if stored_sig == computed_sig:
+        if hmac.compare_digest(stored_sig.encode(), computed_sig.encode()):
             print("✓ Artifact signature valid")
         else:
             print("✗ Artifact signature INVALID - may have been tampered")
@@ -105,7 +141,7 @@ def verify_run(run_id: str, artifacts_dir: str = 'artifacts/backend_runs'):
     
     print("\nRequired files:")
     for fname in required_files:
-        if (run_dir / fname).exists():
+        if fname in present:
             print(f"  ✓ {fname}")
         else:
             print(f"  ✗ {fname} MISSING")
@@ -122,11 +158,23 @@ def verify_run(run_id: str, artifacts_dir: str = 'artifacts/backend_runs'):
     
     return all_passed
 
+def verify_runs(run_ids, artifacts_dir: str = 'artifacts/backend_runs'):
+    """Verify several runs in one process; True only if every run passes"""
+    all_passed = True
+    for run_id in run_ids:
+        if not verify_run(run_id, artifacts_dir):
+            all_passed = False
+        print()
+    return all_passed
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python verify.py <run_id>")
+        print("Usage: python verify.py <run_id> [<run_id> ...]")
         sys.exit(1)
     
-    run_id = sys.argv[1]
-    success = verify_run(run_id)
+    run_ids = sys.argv[1:]
+    if len(run_ids) == 1:
+        success = verify_run(run_ids[0])
+    else:
+        success = verify_runs(run_ids)
     sys.exit(0 if success else 1)